@@ -1,11 +1,24 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime, timezone
+from plotly.subplots import make_subplots
+from functools import partial
+from fetch_pool import FetchExecutor, result_or
+from ohlcv_store import OHLCVStore, DEFAULT_STORE_DIR
+from market_data import make_provider, CoalescingProvider
+from caching import StaleWhileRevalidate, IndicatorMemo, bar_key
+from fx_service import FXService
+from news_feeds import FeedClient, DEFAULT_SOURCES, gather_news
+from symbol_index import SymbolIndex
+from ki_engine import (panel_indicators, compute_indicators, bollinger_bands,
+                       compute_signals, score_signals, get_ki_verdict, plan_factors, signals_cover,
+                       score_series, sensitivity_table, signal_vector, FACTORS, FACTOR_KEYS, TECH_FACTORS,
+                       DEP_NEWS, DEFAULT_WEIGHTS, MAX_BUDGET, weight_budget)
+from streaming_indicators import IndicatorStreams
+from backtest import backtest, BACKTEST_HORIZONS, BACKTEST_THRESHOLDS
+from optimizer import optimize, make_process_pool, OPT_OBJECTIVES
+from scan_jobs import ScanJobManager, WAITING, DONE, CANCELLED, INTERRUPTED, ERROR
+from scanner import ScanCache, SCAN_CUTOFF, SCAN_BARS_MAX_AGE, HIT, BELOW, PRUNED, NO_DATA, LOAD_FAILED, FAILED
 
 # --- 1. UI SETUP & CONFIG ---
 st.set_page_config(page_title="KI-Analyse Intelligence Ultimate", layout="wide", page_icon="📈")
@@ -29,90 +42,183 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 2. SESSION STATE (GEWICHTUNG) ---
-defaults = {
-    'w_t': 15, 'w_r': 10, 'w_v': 5, 'w_m': 10, 'w_c': 5,
-    'w_val': 10, 'w_vol': 10, 'w_np': 5, 'w_sec': 10, 'w_ma': 5, 'w_p': 5, 'w_nn': 7
+# Faktor-Key (ki_engine) -> Session-Key des Sliders
+WEIGHT_STATE_KEYS = {
+    'trend': 'w_t', 'rsi': 'w_r', 'vola': 'w_v', 'margin': 'w_m', 'cash': 'w_c', 'value': 'w_val',
+    'peg': 'w_p', 'volume': 'w_vol', 'sector': 'w_sec', 'macd': 'w_ma', 'news_pos': 'w_np', 'news_neg': 'w_nn'
 }
+# Startwerte wie im Headless-Scanner (ki_engine.DEFAULT_WEIGHTS)
+defaults = {s_key: DEFAULT_WEIGHTS[k] for k, s_key in WEIGHT_STATE_KEYS.items()}
 for key, val in defaults.items():
     if key not in st.session_state:
         st.session_state[key] = val
 
-weights = {
-    'trend': st.session_state.w_t, 'rsi': st.session_state.w_r, 'vola': st.session_state.w_v,
-    'margin': st.session_state.w_m, 'cash': st.session_state.w_c, 'value': st.session_state.w_val,
-    'peg': st.session_state.w_p, 'volume': st.session_state.w_vol, 'sector': st.session_state.w_sec,
-    'macd': st.session_state.w_ma, 'news_pos': st.session_state.w_np, 'news_neg': st.session_state.w_nn
-}
+weights = {k: st.session_state[s_key] for k, s_key in WEIGHT_STATE_KEYS.items()}
+# Slider-Grenzen (min, max) je Faktor, für Optimierer und Sensitivität
+WEIGHT_LIMITS = {k: (0, 20) for k in WEIGHT_STATE_KEYS}
+WEIGHT_LIMITS.update({'trend': (0, 30), 'news_pos': (0, 10), 'news_neg': (0, 15)})
 
-current_budget = sum([v for k,v in weights.items() if k != 'news_neg'])
-MAX_BUDGET = 100
+current_budget = weight_budget(weights)
 valid_config = current_budget <= MAX_BUDGET
 
+# Planer: welche Faktoren sind aktiv und welche Daten brauchen sie (z.B. keine News bei Gewicht 0)?
+factor_plan = plan_factors(weights)
+
 # --- 3. HELFER-FUNKTIONEN ---
 
-# WICHTIG: Ticker-Suche MUSS gecached werden, um API-Calls zu sparen. 
+# Ein Fetch-Pool pro Prozess: alle Sessions teilen sich Threads und Rate-Limits pro Host.
+FETCH_MAX_WORKERS = 8
+
+@st.cache_resource
+def get_fetch_executor():
+    return FetchExecutor(max_workers=FETCH_MAX_WORKERS)
+
+# Live-Kurs (1m-Bars + Quote aus info): sofort den letzten Stand zeigen, nach LIVE_FRESH_SECONDS
+# im Hintergrund nachladen. Erst ab LIVE_MAX_STALE_SECONDS wird wieder blockierend geladen.
+LIVE_FRESH_SECONDS = 15
+LIVE_MAX_STALE_SECONDS = 600
+
+@st.cache_resource
+def get_live_cache():
+    fetcher = get_fetch_executor()
+    host = get_provider().host
+    return StaleWhileRevalidate(
+        fresh_for=LIVE_FRESH_SECONDS, max_stale=LIVE_MAX_STALE_SECONDS,
+        submit=lambda fn, *args: fetcher.submit(host, fn, *args),
+        is_valid=lambda v: v is not None and len(v) > 0)
+
+# Alle Marktdaten laufen über den Provider (yfinance oder Replay, siehe MARKET_DATA_PROVIDER).
+# cache_resource = ein Objekt pro Prozess, d.h. der Coalescing-Layer gilt für alle Sessions.
+@st.cache_resource
+def get_provider():
+    return CoalescingProvider(make_provider())
+
+# Tages-Historie liegt als Parquet auf Disk, nachgeladen werden nur neue Bars.
+@st.cache_resource
+def get_ohlcv_store():
+    return OHLCVStore(DEFAULT_STORE_DIR)
+
+# Laufende Indikatoren pro (Symbol, Intervall): pro Rerun werden nur neue bzw. geänderte Bars
+# eingerechnet (O(1)) statt rolling(200)/ewm über die ganze Historie.
+@st.cache_resource
+def get_indicator_streams():
+    return IndicatorStreams()
+
+# Berechnete Indikatoren (Verdict-Indikatoren, Bollinger, Scanner-Panel) pro Symbol und letztem Bar,
+# LRU mit Speicherlimit. So rechnen Tabs, Sessions und der Scanner jeden Bar nur einmal.
+INDICATOR_MEMO_MB = 64
+
+@st.cache_resource
+def get_indicator_memo():
+    return IndicatorMemo(max_bytes=INDICATOR_MEMO_MB * 2**20)
+
+# Letzter Scan (letzter Bar, info-Hash, Faktor-Zustände je Quelle) als JSON: ein Re-Scan lädt nur neu,
+# was sich geändert hat oder abgelaufen ist (SCAN_TTL in scanner.py). Pfad: SCAN_CACHE_PATH.
+@st.cache_resource
+def get_scan_cache():
+    return ScanCache()
+
+# Prozess-Pool für den Gewichts-Optimierer (große Kandidaten-Raster), einmal pro Prozess gestartet
+@st.cache_resource
+def get_process_pool():
+    return make_process_pool()
+
+# Scan-Jobs laufen in eigenen Threads (scan_jobs.py) und schreiben Checkpoints nach SCAN_JOB_DIR: Reruns, Reloads
+# und Throttling brechen den Scan nicht mehr ab, unterbrochene Jobs laufen beim Prozess-Start weiter.
+@st.cache_resource
+def get_scan_jobs():
+    fetcher, store, provider, memo = get_fetch_executor(), get_ohlcv_store(), get_provider(), get_indicator_memo()
+    return ScanJobManager(
+        load_bars=lambda syms: store.get_history_batch(syms, "6mo", provider.history_batch, max_age=SCAN_BARS_MAX_AGE),
+        fetch_info=lambda s: result_or(fetcher.submit(provider.host, provider.info, s), None),
+        indicators=lambda frames, syms: memo.get(("scan-panel",) + tuple(bar_key(s, "1d", frames[s], "ki") for s in syms),
+                                                 panel_indicators, frames, syms),
+        cache=get_scan_cache())
+
+# Lokaler Symbol-Master (symbol_master.csv) für Namenssuche und Autocomplete ohne Netzwerk.
+@st.cache_resource
+def get_symbol_index():
+    return SymbolIndex.from_csv()
+
+# Handelswährung aus dem Symbol-Master (wenn info nicht geladen wird)
+def symbol_currency(symbol, default="USD"):
+    index = get_symbol_index()
+    rid = index.by_symbol.get(symbol)
+    return (index.records[rid]['currency'] or default) if rid is not None else default
+
+# WICHTIG: Die Netzwerk-Suche MUSS gecached werden, um API-Calls zu sparen (ohne Seiteneffekte).
 @st.cache_data(show_spinner=False)
+def search_symbol(query):
+    try:
+        return get_provider().search_quote(query)
+    except:
+        return None
+
 def get_ticker_from_any(query):
     query = query.strip()
-    # Wenn es wie ein Ticker aussieht (<=5 chars, kein Space), direkt nehmen.
+    index = get_symbol_index()
+    if query.upper() in index.by_symbol: return query.upper()
+    # Wenn es wie ein Ticker aussieht (<=5 chars, kein Space), direkt nehmen. Nur wenn es nicht in
+    # Großbuchstaben getippt ist, darf es exakt ein bekannter Firmenname sein ("Intel" -> INTC, "SAP" bleibt SAP).
     if len(query) <= 5 and " " not in query:
-        return query.upper()
-    try:
-        search = yf.Search(query, max_results=1)
-        if search.quotes:
-            return search.quotes[0]['symbol']
-    except: pass
-    return query.upper()
-
-def get_eur_usd_rate():
-    try:
-        hist = yf.Ticker("EURUSD=X").history(period="1d")
-        if not hist.empty: return 1 / float(hist['Close'].iloc[-1])
-        return 0.92 
-    except: return 0.92
+        symbol = index.resolve(query, allow_prefix=False, allow_fuzzy=False) if query != query.upper() else None
+        return symbol or query.upper()
+    # Erst lokal (Name, Präfix, Tippfehler), die Yahoo-Suche nur noch bei Fehltreffern
+    symbol = index.resolve(query)
+    if symbol: return symbol
+    quote = search_symbol(query)
+    if not quote: return query.upper()
+    # Nachlernen mit dem Firmennamen der Suche (nicht der Eingabe), damit die nächste Anfrage lokal bleibt
+    if quote['name']: index.add(quote['symbol'], quote['name'], quote['exchange'])
+    return quote['symbol']
+
+# Ganze FX-Matrix (EUR, USD, GBP, CHF, JPY, ...) in einem Batch, gecacht für FX_TTL_SECONDS.
+FX_TTL_SECONDS = 900
+
+@st.cache_resource
+def get_fx_service():
+    return FXService(get_provider(), ttl=FX_TTL_SECONDS)
+
+# --- BATCH-LOADER (SCANNER) ---
+# Der Provider bündelt viele Symbole in wenigen Requests (yfinance: yf.download in Chunks).
+@st.cache_data(ttl=900, show_spinner=False)
+def get_batch_history(symbols, period="6mo"):
+    # Über den Store: nur Symbole ohne lokale Historie werden voll geladen, der Rest nur ab dem letzten Bar
+    return get_ohlcv_store().get_history_batch(symbols, period, get_provider().history_batch)
+
+# Eigener Pool (mit den Rate-Limits der RSS-Hosts) für News: wenn Scan, info und SWR den Fetch-Pool
+# füllen, warten Feed-Requests sonst in dessen Queue, bis die News-Deadline abgelaufen ist.
+NEWS_MAX_WORKERS = 8
+
+@st.cache_resource
+def get_news_executor():
+    return FetchExecutor(max_workers=NEWS_MAX_WORKERS)
+
+def submit_news(fn, *args):
+    return get_news_executor().submit(None, fn, *args)
+
+# Eine Session mit Keep-Alive für alle RSS-Calls; 304-Antworten verwenden die geparsten Items weiter.
+@st.cache_resource
+def get_feed_client():
+    return FeedClient(throttle=get_news_executor().throttle)
+
+# Alle Quellen laufen parallel; nach NEWS_DEADLINE_SECONDS wird genommen, was da ist.
+# Zusätzliche Feeds: RSSSource(name, url_template) an NEWS_SOURCES anhängen.
+NEWS_SOURCES = DEFAULT_SOURCES
+NEWS_DEADLINE_SECONDS = 2.5
 
 @st.cache_data(ttl=300) 
+def fetch_alternative_news(ticker):
+    return gather_news(get_feed_client(), ticker, NEWS_SOURCES, submit=submit_news, deadline=NEWS_DEADLINE_SECONDS)
+
 def get_alternative_news(ticker):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    news_items = []
-    try:
-        url_yahoo = f"https://finance.yahoo.com/rss/headline?s={ticker}"
-        response = requests.get(url_yahoo, headers=headers, timeout=3)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
-            for item in root.findall('./channel/item')[:5]:
-                title = item.find('title').text
-                if title: news_items.append({'title': title, 'providerPublishTime': datetime.now().timestamp()})
-    except: pass
-    
-    if len(news_items) < 2:
-        try:
-            url_google = f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
-            response = requests.get(url_google, headers=headers, timeout=3)
-            if response.status_code == 200:
-                root = ET.fromstring(response.content)
-                for item in root.findall('./channel/item')[:5]:
-                    title = item.find('title').text
-                    if title: news_items.append({'title': title, 'providerPublishTime': datetime.now().timestamp()})
-        except: pass
-    return news_items
-
-def analyze_news_sentiment(news_list, w_pos, w_neg):
-    if not news_list: return 0, 0
-    score = 0
-    pos_w_list = ['upgraded', 'buy', 'growth', 'beats', 'profit', 'bull', 'surge', 'soar', 'strong', 'record', 'partnership']
-    neg_w_list = ['risk', 'sell', 'loss', 'misses', 'bear', 'warnung', 'drop', 'fall', 'plunge', 'downgrade', 'weak', 'lawsuit']
-    
-    count = 0
-    for n in news_list[:10]:
-        title = n.get('title', '').lower()
-        if any(w in title for w in pos_w_list): score += w_pos
-        if any(w in title for w in neg_w_list): score -= w_neg
-        count += 1
-    return round(score, 1), count
+    news = fetch_alternative_news(ticker)
+    # Deadline verpasst oder Quelle fehlgeschlagen: nicht 5 Minuten festhalten, der nächste Rerun fragt neu
+    if not news.complete: fetch_alternative_news.clear(ticker)
+    return news
 
 # --- NEUE FUNKTION: SMART PRICE FINDER ---
-def get_best_price_and_currency(ticker_obj, hist_live, hist_1y):
+def get_best_price_and_currency(info, hist_live, hist_1y):
     """
     Versucht den ALLER-aktuellsten Preis zu finden.
     Priorität:
@@ -121,7 +227,6 @@ def get_best_price_and_currency(ticker_obj, hist_live, hist_1y):
     3. Letzter 1m Close (Live History)
     4. Letzter 1y Close (End-of-Day)
     """
-    info = ticker_obj.info
     price = None
     
     # Versuch 1: Info Dictionary (oft am schnellsten)
@@ -142,107 +247,22 @@ def get_best_price_and_currency(ticker_obj, hist_live, hist_1y):
     if price is None:
         price = 0.0
         
-    currency = info.get('currency', 'USD')
+    currency = info.get('currency') or 'USD'
     return price, currency
 
 # --- 4. KI-ENGINE ---
-def get_ki_verdict(ticker_obj, info_dict, hist_df, news_list, w):
-    try:
-        if len(hist_df) < 50: return "➡️ Neutral", "Zu wenig Daten (unter 50 Tage).", 0, 0, 50, {}, {}
-        
-        details = {}
-        radar_scores = {} 
-        curr_p = float(hist_df['Close'].iloc[-1])
-        score = 50 
-        reasons = []
-        
-        # 1. Trend
-        s200 = hist_df['Close'].rolling(200).mean().iloc[-1]
-        s50 = hist_df['Close'].rolling(50).mean().iloc[-1]
-        details['sma200'] = s200
-        details['sma50'] = s50
-        details['curr_p'] = curr_p
-        
-        if not pd.isna(s50) and not pd.isna(s200):
-            if curr_p > s50 > s200: score += w['trend']; reasons.append(f"🧭 Trend: Stark Bullish (über SMA 50/200) [+{w['trend']}]"); radar_scores['Trend'] = 1.0
-            elif curr_p < s200: score -= w['trend']; reasons.append(f"🧭 Trend: Bearish (unter SMA 200) [-{w['trend']}]"); radar_scores['Trend'] = 0.0
-            else: reasons.append("🧭 Trend: Neutral (Konsolidierung)"); radar_scores['Trend'] = 0.5
-        else: reasons.append(f"🧭 Trend: Daten unvollständig"); radar_scores['Trend'] = 0.5
-
-        # 2. RSI
-        delta = hist_df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs.iloc[-1]))
-        details['rsi'] = rsi
-        
-        if rsi > 70: score -= w['rsi']; reasons.append(f"⚡ RSI: Überhitzt ({rsi:.1f}) [-{w['rsi']}]"); radar_scores['RSI'] = 0.2
-        elif rsi < 30: score += w['rsi']; reasons.append(f"⚡ RSI: Überverkauft ({rsi:.1f}) [+{w['rsi']}]"); radar_scores['RSI'] = 1.0
-        else: reasons.append(f"⚡ RSI: Neutral ({rsi:.1f})"); radar_scores['RSI'] = 0.5
-
-        # 3. Vola
-        atr = (hist_df['High']-hist_df['Low']).rolling(14).mean().iloc[-1]
-        vola_ratio = (atr / curr_p) * 100
-        details['atr_pct'] = vola_ratio
-        if vola_ratio > 4: score -= w['vola']; reasons.append(f"🎢 Vola: Hoch ({vola_ratio:.1f}%) [-{w['vola']}]"); radar_scores['Stabilität'] = 0.2
-        else: reasons.append(f"🎢 Vola: Angemessen ({vola_ratio:.1f}%)"); radar_scores['Stabilität'] = 1.0
-
-        # 4. Fundamental
-        marge = info_dict.get('operatingMargins', 0)
-        details['margin'] = marge
-        if marge > 0.15: score += w['margin']; reasons.append(f"💎 Marge: Stark ({marge*100:.1f}%) [+{w['margin']}]"); radar_scores['Marge'] = 1.0
-        else: reasons.append(f"💎 Marge: Normal (<15%)"); radar_scores['Marge'] = 0.4
-        
-        cash = info_dict.get('totalCash', 0) or 0
-        debt = info_dict.get('totalDebt', 0) or 0
-        if cash > debt: score += w['cash']; reasons.append(f"🏦 Bilanz: Net-Cash vorhanden [+{w['cash']}]"); radar_scores['Bilanz'] = 1.0
-        else: reasons.append(f"🏦 Bilanz: Net-Debt (Schulden > Cash)"); radar_scores['Bilanz'] = 0.4
-        
-        kgv = info_dict.get('forwardPE', info_dict.get('trailingPE'))
-        details['kgv'] = kgv
-        if kgv and 0 < kgv < 18: score += w['value']; reasons.append(f"🏷️ Bewertung: KGV attraktiv ({kgv:.1f}) [+{w['value']}]"); radar_scores['Value'] = 1.0
-        else: reasons.append(f"🏷️ Bewertung: Neutral/Teuer"); radar_scores['Value'] = 0.4
-        
-        peg = info_dict.get('pegRatio')
-        if peg and 0.5 < peg < 1.5: score += w['peg']; reasons.append(f"⚖️ PEG: Wachstum/Preis optimal ({peg}) [+{w['peg']}]"); radar_scores['Growth'] = 1.0
-        else: reasons.append(f"⚖️ PEG: Neutral/Teuer"); radar_scores['Growth'] = 0.5
-
-        # 5. Volumen & Sektor
-        curr_vol = hist_df['Volume'].iloc[-1]
-        avg_vol = hist_df['Volume'].tail(20).mean()
-        if curr_vol > avg_vol * 1.3: score += w['volume']; reasons.append(f"📶 Volumen: Hohes Interesse [+{w['volume']}]"); radar_scores['Momentum'] = 1.0
-        else: reasons.append(f"📶 Volumen: Normal"); radar_scores['Momentum'] = 0.5
-        
-        start_p = float(hist_df['Close'].iloc[0])
-        sector = info_dict.get('sector', 'N/A')
-        if (curr_p/start_p)-1 > 0.2: score += w['sector']; reasons.append(f"🏅 Sektor: Top-Performer ({sector}) [+{w['sector']}]"); radar_scores['Rel. Stärke'] = 1.0
-        else: reasons.append(f"🏅 Sektor: Normal/Underperf. ({sector})"); radar_scores['Rel. Stärke'] = 0.4
-
-        # 6. MACD & News
-        exp1 = hist_df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = hist_df['Close'].ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        sig = macd.ewm(span=9, adjust=False).mean()
-        if macd.iloc[-1] > sig.iloc[-1]: score += w['macd']; reasons.append(f"🌊 MACD: Bullishes Momentum [+{w['macd']}]"); radar_scores['MACD'] = 1.0
-        else: reasons.append(f"🌊 MACD: Neutral/Bearish"); radar_scores['MACD'] = 0.4
-
-        n_score, n_count = analyze_news_sentiment(news_list, w['news_pos'], w['news_neg'])
-        score += n_score
-        reasons.append(f"📰 News Feed: Score {n_score} (aus {n_count} Quellen)")
-        
-        score = min(100, max(0, score))
-        
-        if score >= 95: verdict = "🌟 STAR AKTIE" 
-        elif score >= 80: verdict = "💎 STRONG BUY"
-        elif score >= 60: verdict = "🚀 BUY"
-        elif score >= 35: verdict = "➡️ HOLD"
-        else: verdict = "🛑 SELL"
-        
-        return verdict, "\n".join(reasons), vola_ratio, s200, score, details, radar_scores
+# Liegt in ki_engine.py: compute_signals (Roh-Signale, gewichtsunabhängig) und score_signals
+# (Gewichtung, Texte, Radar). get_ki_verdict = beides in einem Schritt.
 
-    except Exception as e:
-        return "⚠️ Error", str(e), 0, 0, 50, {}, {}
+# Slider-Änderungen brauchen keine neuen Daten: die Callback-Flag sorgt dafür, dass der
+# nächste Rerun nur neu gewichtet (kein Fetch, keine Indikatoren).
+def mark_rescore_only():
+    st.session_state['_rescore_only'] = True
+
+# Gewichte aus dem Optimierer in die Slider übernehmen (on_click: läuft vor dem Rendern der Slider)
+def apply_weights(new_weights):
+    for k, v in new_weights.items(): st.session_state[WEIGHT_STATE_KEYS[k]] = int(v)
+    mark_rescore_only()
 
 # --- 5. PLOTTING ---
 def plot_radar_chart(radar_scores, ticker_symbol):
@@ -257,15 +277,22 @@ def plot_radar_chart(radar_scores, ticker_symbol):
                       font=dict(color='white'))
     return fig
 
-def plot_chart(hist, symbol, eur_rate):
-    fig = go.Figure()
-    hist_eur = hist * eur_rate
-    fig.add_trace(go.Candlestick(x=hist.index, open=hist_eur['Open'], high=hist_eur['High'], low=hist_eur['Low'], close=hist_eur['Close'], name='Kurs'))
-    sma20 = hist_eur['Close'].rolling(20).mean()
-    std = hist_eur['Close'].rolling(20).std()
-    fig.add_trace(go.Scatter(x=hist.index, y=sma20+2*std, line=dict(color='rgba(255,255,255,0.1)'), hoverinfo='skip', showlegend=False))
-    fig.add_trace(go.Scatter(x=hist.index, y=sma20-2*std, line=dict(color='rgba(255,255,255,0.1)'), fill='tonexty', fillcolor='rgba(255,255,255,0.05)', name='Bollinger', hoverinfo='skip'))
-    fig.update_layout(title=f"Chart: {symbol}", yaxis_title='Preis (€)', xaxis_rangeslider_visible=False, template="plotly_dark", height=500, paper_bgcolor='rgba(0,0,0,0)')
+# `bands`: (obere, untere) Bollinger-Linie, bereits in EUR (kommen aus dem Indikator-Memo)
+# `scores`: Score-Zeitreihe (ki_engine.score_series), wird unter dem Kurs gezeichnet
+def plot_chart(hist_eur, symbol, bands, scores=None):
+    upper, lower = bands
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    fig.add_trace(go.Candlestick(x=hist_eur.index, open=hist_eur['Open'], high=hist_eur['High'], low=hist_eur['Low'], close=hist_eur['Close'], name='Kurs'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=hist_eur.index, y=upper, line=dict(color='rgba(255,255,255,0.1)'), hoverinfo='skip', showlegend=False), row=1, col=1)
+    fig.add_trace(go.Scatter(x=hist_eur.index, y=lower, line=dict(color='rgba(255,255,255,0.1)'), fill='tonexty', fillcolor='rgba(255,255,255,0.05)', name='Bollinger', hoverinfo='skip'), row=1, col=1)
+    if scores is not None:
+        fig.add_trace(go.Scatter(x=scores.index, y=scores['score'], customdata=scores['verdict'], line=dict(color='#3d5afe'), name='KI-Score',
+                                 hovertemplate='%{y:.0f} Pkt – %{customdata}<extra></extra>'), row=2, col=1)
+        fig.add_hline(y=80, line=dict(color='#00b894', dash='dot', width=1), row=2, col=1)
+        fig.add_hline(y=60, line=dict(color='#fdcb6e', dash='dot', width=1), row=2, col=1)
+        fig.update_yaxes(range=[0, 100], title_text='Score', row=2, col=1)
+    fig.update_yaxes(title_text='Preis (€)', row=1, col=1)
+    fig.update_layout(title=f"Chart: {symbol}", xaxis_rangeslider_visible=False, template="plotly_dark", height=650, paper_bgcolor='rgba(0,0,0,0)')
     return fig
 
 # --- 6. MAIN APP ---
@@ -275,20 +302,30 @@ st.title("📈 KI-Analyse Intelligence Ultimate")
 col_search, col_btn = st.columns([4, 1])
 with col_search:
     search_query = st.text_input("Aktie suchen (Ticker bevorzugt, z.B. NVDA):", value="NVDA")
+    if len(search_query.strip()) >= 2 and search_query.strip().upper() not in get_symbol_index().by_symbol:
+        suggestions = get_symbol_index().complete(search_query, limit=5)
+        if suggestions:
+            st.caption("Vorschläge: " + " · ".join(f"**{r['symbol']}** ({r['name']})" for r in suggestions))
 with col_btn:
     st.write("") 
     st.write("") 
     refresh = st.button("🔄 Refresh")
 
 ticker_symbol = get_ticker_from_any(search_query)
-eur_rate = get_eur_usd_rate()
+fx = get_fx_service()
+eur_rate = fx.rate("USD", "EUR", default=0.92)
+fetcher = get_fetch_executor()
+store = get_ohlcv_store()
+provider = get_provider()
+live_cache = get_live_cache()
+memo = get_indicator_memo()
 
 with st.sidebar:
     st.markdown("### ⚙️ System Status")
     if st.button("🔍 Verbindung testen"):
         try:
-            test_ticker = yf.Ticker("AAPL")
-            test_hist = test_ticker.history(period="1d", interval="1m")
+            with fetcher.throttle(provider.host):
+                test_hist = provider.intraday("AAPL")
             if not test_hist.empty:
                 st.markdown("<span class='api-ok'>✅ yfinance Live-API OK</span>", unsafe_allow_html=True)
             else:
@@ -297,36 +334,75 @@ with st.sidebar:
             st.markdown(f"<span class='api-err'>❌ Fehler: {str(e)}</span>", unsafe_allow_html=True)
             
     st.caption(f"EUR/USD: {eur_rate:.4f}")
+    st.caption(f"Faktor-Plan: {len(factor_plan.factors)}/{len(FACTORS)} aktiv · Daten: {', '.join(sorted(factor_plan.deps)) or '-'}")
+    flight = provider.stats()
+    st.caption(f"Coalescing: {flight['saved']} von {flight['requests']} Calls gespart")
     st.caption(f"Symbol: **{ticker_symbol}**")
     st.info("Tipp: Nutze Ticker-Kürzel (NVDA, MSFT), falls die Namenssuche fehlschlägt.")
 
 # LIVE DATA FETCHING
-# Wir nutzen hier KEIN Cache für History, damit Preise LIVE sind.
+# Quote (info) und 1m-Bars kommen aus dem Stale-While-Revalidate-Cache: der letzte Stand wird
+# sofort angezeigt (mit Alter), die Aktualisierung läuft im Hintergrund.
 # Aber wir fangen Fehler ab, falls Yahoo blockiert.
-try:
-    ticker = yf.Ticker(ticker_symbol)
-    with st.spinner(f"Lade Live-Daten für {ticker_symbol}..."):
-        try:
-            current_info = ticker.info 
-        except: 
-            current_info = {} # Info API ist oft flaky, wir machen weiter
-            
-        hist_1y = ticker.history(period="1y") 
-        hist_live = ticker.history(period="1d", interval="1m")
+# Alle Calls starten parallel im Fetch-Pool, RSS läuft derweil im Script-Thread.
+# Reiner Gewichts-Rerun (Slider): Daten und Roh-Signale aus dem letzten Lauf dieser Session.
+bundle = st.session_state.get('_bundle')
+rescore_only = (st.session_state.pop('_rescore_only', False) and not refresh
+                and bundle is not None and bundle['ticker'] == ticker_symbol
+                and signals_cover(bundle['signals'], factor_plan))
+if rescore_only:
+    current_info, hist_1y, hist_live, quote_age, current_news, signals = (
+        bundle[k] for k in ('info', 'hist_1y', 'hist_live', 'quote_age', 'news', 'signals'))
+else:
+    try:
+        with st.spinner(f"Lade Live-Daten für {ticker_symbol}..."):
+            f_info = live_cache.fetch(("info", ticker_symbol), partial(provider.info, ticker_symbol))
+            f_hist_1y = fetcher.submit(provider.host, store.get_history, ticker_symbol, "1y", partial(provider.history, ticker_symbol))
+            f_hist_live = live_cache.fetch(("intraday", ticker_symbol), partial(provider.intraday, ticker_symbol))
+            # News nur, wenn ein News-Gewicht aktiv ist (info braucht das Dashboard ohnehin)
+            load_news = factor_plan.needs(DEP_NEWS)
+            f_news = fetcher.submit(provider.host, provider.news, ticker_symbol) if load_news else None
+            alt_news = get_alternative_news(ticker_symbol) if load_news else []
+
+            current_info, info_age = result_or(f_info, ({}, 0.0)) # Info API ist oft flaky, wir machen weiter
+            hist_1y = f_hist_1y.result()
+            hist_live, live_age = f_hist_live.result()
+            quote_age = max(info_age, live_age)
         
-        yf_news = ticker.news if ticker.news else []
-        alt_news = get_alternative_news(ticker.ticker)
-        current_news = yf_news + alt_news
-except Exception as e:
-    current_info = {}
-    hist_1y = pd.DataFrame()
-    hist_live = pd.DataFrame()
-    current_news = []
-    st.error(f"Kritischer Fehler beim Laden: {e}")
+            yf_news = (result_or(f_news, []) or []) if load_news else []
+            current_news = yf_news + alt_news if load_news else None
+    except Exception as e:
+        current_info = {}
+        hist_1y = pd.DataFrame()
+        hist_live = pd.DataFrame()
+        quote_age = 0.0
+        current_news = []
+        st.error(f"Kritischer Fehler beim Laden: {e}")
+
+    # --- ROH-SIGNALE (gewichtsunabhängig, einmal pro Datenstand) ---
+    signals = None
+    if not hist_1y.empty:
+        try:
+            live_ind = get_indicator_streams().sync(ticker_symbol, "1d", hist_1y)
+            signals = compute_signals(current_info, hist_1y, current_news, ind=live_ind)
+        except Exception as e:
+            signals = {'error': str(e)}
+    st.session_state['_bundle'] = {
+        'ticker': ticker_symbol, 'info': current_info, 'hist_1y': hist_1y, 'hist_live': hist_live,
+        'quote_age': quote_age, 'news': current_news, 'signals': signals,
+    }
+
+# Umrechnungsfaktor Originalwährung -> EUR (auch GBP, CHF, JPY, GBp ...)
+currency_str = current_info.get('currency') or 'USD'
+to_eur = fx.rate(currency_str, "EUR", default=eur_rate)
 
 # --- GLOBALE BERECHNUNG ---
-if not hist_1y.empty and valid_config:
-    verdict, reasons, vola, sma200, ki_score, details, radar = get_ki_verdict(ticker, current_info, hist_1y, current_news, weights)
+# Nur noch die Gewichtung – Millisekunden, auch bei jeder Slider-Bewegung
+if signals is not None and valid_config:
+    try:
+        verdict, reasons, vola, sma200, ki_score, details, radar = score_signals(signals, weights)
+    except Exception as e:
+        verdict, reasons, vola, sma200, ki_score, details, radar = "⚠️ Error", str(e), 0, 0, 50, {}, {}
 else:
     verdict, reasons, vola, sma200, ki_score, details, radar = "N/A", "Keine Daten verfügbar", 0, 0, 0, {}, {}
 
@@ -335,6 +411,9 @@ tab_main, tab_compare, tab_calc, tab_chart, tab_fund, tab_scanner, tab_desc = st
     "🚀 Dashboard", "🆚 Peer-Vergleich", "🧮 Berechnung", "📊 Chart", "🏢 Basisdaten", "🌟 Scanner", "⚙️ Deep Dive & Setup"
 ])
 
+if hist_1y.attrs.get('stale') and not hist_1y.empty:
+    st.warning(f"Kurs-Historie konnte nicht aktualisiert werden – angezeigt wird der gespeicherte Stand bis {hist_1y.index[-1]:%d.%m.%Y}.")
+
 if not valid_config:
     st.error(f"⚠️ **Budget überschritten!** Du hast {current_budget}/100 Punkte vergeben. Bitte korrigiere dies im Tab 'Deep Dive'.")
 
@@ -345,17 +424,11 @@ with tab_main:
     if not hist_1y.empty and valid_config:
         # SMART PRICE LOGIC
         # Wir holen den Preis unabhängig von der History und prüfen die Währung
-        raw_price, currency_str = get_best_price_and_currency(ticker, hist_live, hist_1y)
+        raw_price, currency_str = get_best_price_and_currency(current_info, hist_live, hist_1y)
         
-        # Währungskonvertierung
-        if currency_str == "EUR":
-            curr_eur = raw_price
-            curr_usd = raw_price * (1/eur_rate)
-            currency_symbol = "€"
-        else:
-            curr_eur = raw_price * eur_rate
-            curr_usd = raw_price
-            currency_symbol = "$"
+        # Währungskonvertierung über die FX-Matrix
+        curr_eur = raw_price * to_eur
+        curr_usd = raw_price * fx.rate(currency_str, "USD", default=to_eur / eur_rate)
 
         prev_close = hist_1y['Close'].iloc[-2]
         change_pct = ((raw_price / prev_close) - 1) * 100
@@ -377,6 +450,8 @@ with tab_main:
                 st.caption(f"Originalwährung: {raw_price:.2f} {currency_str}")
             else:
                 st.caption("vs. Vortag")
+            if quote_age > LIVE_FRESH_SECONDS:
+                st.caption(f"⏱️ Stand vor {quote_age:.0f} s (Aktualisierung läuft im Hintergrund)")
 
             # Hinweis bei Währungsverwirrung (z.B. User sucht HIVE US statt HIVE DE)
             if ticker_symbol == "HIVE" and currency_str == "USD":
@@ -394,7 +469,7 @@ with tab_main:
             cr1, cr2 = st.columns(2)
             with cr1:
                 sma200_val = sma200 if not pd.isna(sma200) else 0
-                st.markdown(f"<div class='reversal-box'>🚨 <b>Trend-Umkehr (SMA200)</b><br>{sma200_val * eur_rate:.2f} €</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='reversal-box'>🚨 <b>Trend-Umkehr (SMA200)</b><br>{sma200_val * to_eur:.2f} €</div>", unsafe_allow_html=True)
             
             with cr2:
                 tgt = current_info.get('targetMeanPrice')
@@ -402,7 +477,7 @@ with tab_main:
 
                 if tgt:
                     # Analysten Ziele sind meist in Originalwährung
-                    tgt_eur = tgt * eur_rate if currency_str != "EUR" else tgt
+                    tgt_eur = tgt * to_eur
                     pot = ((tgt/raw_price)-1)*100
                     col = "#00b894" if pot > 0 else "#ff7675"
                     st.markdown(f"<div class='reversal-box'>🎯 <b>Analysten Ziel</b><br>{tgt_eur:.2f} € (<span style='color:{col}'>{pot:+.1f}%</span>)</div>", unsafe_allow_html=True)
@@ -426,11 +501,14 @@ with tab_compare:
     comp_input = st.text_input("Gegner-Ticker:", value="AMD")
     if st.button("Vergleich starten") and valid_config:
         comp_ticker = get_ticker_from_any(comp_input)
-        t2 = yf.Ticker(comp_ticker)
-        h2 = t2.history(period="1y")
+        f_h2 = fetcher.submit(provider.host, store.get_history, comp_ticker, "1y", partial(provider.history, comp_ticker))
+        f_i2 = fetcher.submit(provider.host, provider.info, comp_ticker)
+        h2 = result_or(f_h2, pd.DataFrame())
         if not h2.empty:
-            v1, _, _, _, s1, d1, r1 = get_ki_verdict(ticker, current_info, hist_1y, current_news, weights)
-            v2, _, _, _, s2, d2, r2 = get_ki_verdict(t2, t2.info, h2, [], weights)
+            # Eigene Aktie: Ergebnis der globalen Berechnung, Gegner-Indikatoren aus dem Memo
+            v1, s1, d1, r1 = verdict, ki_score, details, radar
+            ind2 = memo.get(bar_key(comp_ticker, "1d", h2, "ki"), compute_indicators, h2)
+            v2, _, _, _, s2, d2, r2 = get_ki_verdict(comp_ticker, result_or(f_i2, {}), h2, [], weights, ind=ind2)
             
             cc1, cc2 = st.columns(2)
             with cc1:
@@ -496,7 +574,7 @@ with tab_calc:
 
         if calc_rate > 0:
             # Dividende ist meist in Originalwährung, Umrechnung nötig
-            div_val_eur = calc_rate if currency_str == "EUR" else calc_rate * eur_rate
+            div_val_eur = calc_rate * to_eur
             div_ges_eur = div_anzahl * div_val_eur
             c_res_d1, c_res_d2 = st.columns(2)
             c_res_d1.metric("Jährliche Ausschüttung (est.)", f"{div_ges_eur:.2f} €")
@@ -508,7 +586,13 @@ with tab_calc:
 # TAB 4: CHART
 with tab_chart:
     if not hist_1y.empty:
-        st.plotly_chart(plot_chart(hist_1y, ticker_symbol, eur_rate), use_container_width=True)
+        bands = memo.get(bar_key(ticker_symbol, "1d", hist_1y, "bollinger", 20, 2), bollinger_bands, hist_1y)
+        # Score für jeden Tag (Technik + aktuelle Fundamentaldaten, ohne News), vektorisiert in ms
+        score_hist = score_series(hist_1y, weights, current_info) if valid_config else None
+        st.plotly_chart(plot_chart(fx.convert_frame(hist_1y, currency_str, "EUR", default=to_eur), ticker_symbol,
+                                   [b * to_eur for b in bands], score_hist), use_container_width=True)
+        if score_hist is not None:
+            st.caption("Unten: KI-Score je Handelstag (ohne News – historisch nicht verfügbar; Fundamentaldaten = aktueller Stand). Linien: 60 = BUY, 80 = STRONG BUY.")
     else:
         st.warning("Keine Chart-Daten verfügbar.")
 
@@ -524,66 +608,126 @@ with tab_fund:
     cf2.write(f"**Sektor:** {current_info.get('sector', 'N/A')}")
     h52 = current_info.get('fiftyTwoWeekHigh')
     l52 = current_info.get('fiftyTwoWeekLow')
-    val_h52 = f"{h52 * eur_rate:.2f} €" if h52 else "N/A"
-    val_l52 = f"{l52 * eur_rate:.2f} €" if l52 else "N/A"
+    val_h52 = f"{h52 * to_eur:.2f} €" if h52 else "N/A"
+    val_l52 = f"{l52 * to_eur:.2f} €" if l52 else "N/A"
     
     s50_val = details.get('sma50', 0)
     s200_val = details.get('sma200', 0)
-    cf2.write(f"**SMA 50:** {s50_val * eur_rate:.2f} €")
-    cf2.write(f"**SMA 200:** {s200_val * eur_rate:.2f} €")
+    cf2.write(f"**SMA 50:** {s50_val * to_eur:.2f} €")
+    cf2.write(f"**SMA 200:** {s200_val * to_eur:.2f} €")
 
 # TAB 6: SCANNER
 with tab_scanner:
     st.header("🌟 Deep Market Scanner (Live)")
-    st.caption("Scannt vollständige Listen. Da wir Live-Daten nutzen, kann dies einen Moment dauern.")
+    st.caption("Scannt vollständige Listen. Da wir Live-Daten nutzen, kann dies einen Moment dauern. "
+               "Der Scan-Score zählt keine News (nur Kurse und Fundamentaldaten) – die Einzel-Analyse rechnet sie dazu.")
     
     tech_ai = ["NVDA", "MSFT", "AAPL", "GOOGL", "AMD", "TSM", "AVGO", "META", "PLTR", "SMCI", "ARM", "ORCL", "ADBE", "CRM", "AMZN", "NFLX"]
     space = ["RKLB", "SPCE", "ASTS", "LUNR", "SIDU", "VSAT", "GSAT"]
     crypto_mining = ["MARA", "RIOT", "CLSK", "MSTR", "COIN", "CORZ", "IREN", "HUT", "WULF", "BITF", "HIVE"]
     defense = ["LMT", "RTX", "NOC", "GD", "LHX", "AVAV", "KTOS", "RHM.DE", "HENS.DE", "BA", "AIR.PA"]
     
-    full_scan_list = list(set(tech_ai + space + crypto_mining + defense))
-    
+    SCAN_STATUS_LABELS = {HIT: "Treffer", BELOW: "unter Cutoff", PRUNED: "vorgefiltert", NO_DATA: "keine Kurse", LOAD_FAILED: "Kurse nicht geladen", FAILED: "info fehlt"}
+    # So oft fragt die Anzeige den laufenden Scan-Job ab
+    SCAN_POLL_SECONDS = 1.0
+
+    # Sortiert, damit der Batch-Cache bei jedem Lauf denselben Key trifft
+    full_scan_list = sorted(set(tech_ai + space + crypto_mining + defense))
+
+    def scan_category(s_sym):
+        if s_sym in tech_ai: return "Tech/AI"
+        if s_sym in space: return "Space"
+        if s_sym in crypto_mining: return "Crypto"
+        if s_sym in defense: return "Defense"
+        return "Other"
+
+    def render_scan_table(placeholder, results):
+        df_res = pd.DataFrame(results).sort_values(by="Score", ascending=False)
+        # Gemischte Börsenwährungen (USD, EUR, ...) in einem Schritt nach EUR
+        df_res.insert(2, "Preis (€)", fx.convert_column(df_res, "Preis", "Währung", "EUR").round(2))
+        placeholder.dataframe(df_res.drop(columns=["Preis", "Währung"]), use_container_width=True, hide_index=True)
+
+    scan_jobs = get_scan_jobs()
+    scan_reuse = not st.checkbox("Alles neu laden (letzten Scan ignorieren)", value=False)
     if st.button("🚀 VOLLSTÄNDIGEN SCAN STARTEN"):
-        results = []
-        bar = st.progress(0)
-        status = st.empty()
-        
-        for idx, s_sym in enumerate(full_scan_list):
-            bar.progress((idx + 1) / len(full_scan_list))
-            status.text(f"Analysiere {s_sym}...")
-            
-            try:
-                s_obj = yf.Ticker(s_sym)
-                s_hist = s_obj.history(period="6mo")
-                if len(s_hist) > 50:
-                    s_info = s_obj.info
-                    _, _, _, _, s_score, _, _ = get_ki_verdict(s_obj, s_info, s_hist, [], weights)
-                    
-                    if s_score >= 90:
-                        cat = "Other"
-                        if s_sym in tech_ai: cat = "Tech/AI"
-                        elif s_sym in space: cat = "Space"
-                        elif s_sym in crypto_mining: cat = "Crypto"
-                        elif s_sym in defense: cat = "Defense"
-                        
-                        results.append({
-                            "Ticker": s_sym,
-                            "Kategorie": cat,
-                            "Preis (€)": round(s_hist['Close'].iloc[-1] * eur_rate, 2),
-                            "Score": s_score
-                        })
-            except: continue
-        
-        bar.empty()
-        status.empty()
-        
+        st.session_state['scan_job'] = scan_jobs.start(full_scan_list, weights, cutoff=SCAN_CUTOFF, reuse=scan_reuse).id
+    # Eigener Job der Session, sonst der zuletzt gestartete (nach einem Reload oder aus einer anderen Session)
+    scan_job = scan_jobs.get(st.session_state.get('scan_job')) or scan_jobs.latest()
+
+    def render_scan_job(job, polling):
+        # Job im Hintergrund fertig geworden: einmal die ganze App neu laufen lassen (Polling aus, Faktoren übernehmen)
+        if polling and not job.running: st.rerun()
+        prog = job.progress()
+        if job.running:
+            st.progress(prog['done'] / max(1, prog['total']))
+            st.text(f"{prog['done']}/{prog['total']} Symbole fertig · {prog['hits']} Treffer" +
+                    (f" · {prog['retry']} in der Retry-Queue" if prog['retry'] else "") +
+                    (f" · nächster Versuch in {prog['next_retry']:.0f}s" if prog['status'] == WAITING else "") +
+                    (f" · noch ca. {prog['eta']:.0f}s" if prog['eta'] else ""))
+            if st.button("⏹️ Scan abbrechen"): job.cancel()
+        elif prog['status'] in (CANCELLED, INTERRUPTED, ERROR):
+            if prog['error']: st.error(f"Scan abgebrochen: {prog['error']}")
+            st.info(f"Scan unterbrochen bei {prog['done']}/{prog['total']} Symbolen – fertige Symbole sind gespeichert.")
+            if st.button("▶️ Scan fortsetzen"):
+                scan_jobs.start(job.symbols, job.w, job.cutoff)
+                st.rerun()
+
+        results = [{
+            "Ticker": rec['symbol'],
+            "Kategorie": scan_category(rec['symbol']),
+            "Preis": rec['price'],
+            "Währung": rec['currency'] or symbol_currency(rec['symbol']),
+            "Score": rec['score']
+        } for rec in job.records() if rec['status'] == HIT]
+        if results: render_scan_table(st.empty(), results)
+        if job.running: return
+
+        if job.w != weights: st.caption("Hinweis: Der Scan lief mit einer anderen Gewichtung als der aktuellen.")
+        st.caption(f"{prog['total']} Symbole in {prog['elapsed']:.1f}s" +
+                   (f" · erster Treffer nach {prog['first_hit']:.1f}s" if prog['first_hit'] is not None else "") + " · " +
+                   " · ".join(f"{SCAN_STATUS_LABELS[k]}: {v}" for k, v in prog['counts'].items()) +
+                   f" · info neu geladen für {prog['fetched']} · geändert seit letztem Scan: {prog['changed']}")
+        if prog['status'] != DONE: return
         if results:
-            df_res = pd.DataFrame(results).sort_values(by="Score", ascending=False)
             st.success(f"{len(results)} Top-Picks gefunden!")
-            st.dataframe(df_res, use_container_width=True, hide_index=True)
         else:
-            st.warning("Keine Aktien mit Score >= 90 gefunden.")
+            st.warning(f"Keine Aktien mit Score >= {job.cutoff} gefunden.")
+
+    if scan_job is not None:
+        # Läuft der Job, zeichnet nur dieses Fragment alle SCAN_POLL_SECONDS neu; der Rest der App bleibt bedienbar
+        polling = scan_job.running
+        st.fragment(render_scan_job, run_every=SCAN_POLL_SECONDS if polling else None)(scan_job, polling)
+        # Roh-Signale des Universums für die Sensitivitäts-Analyse (Strategie-Tab). Nur voll bewertete Symbole:
+        # bei vorgefilterten/fehlgeschlagenen stehen nicht geladene Quellen als 0 drin, nicht als echter Zustand
+        scan_factors = {rec['symbol']: rec['factors'] for rec in scan_job.records() if rec['status'] in (HIT, BELOW)}
+        st.session_state['_scan_factors'] = pd.DataFrame.from_dict(scan_factors, orient='index', columns=FACTOR_KEYS)
+
+    # Hat sich "🚀 BUY" / "💎 STRONG BUY" in der Vergangenheit gelohnt? Score-Zeitreihe für jeden Tag
+    # der Scan-Liste, daraus Signale, Vorwärts-Renditen und Drawdowns (vektorisiert, ~1 s für 500 Symbole × 10 J.)
+    with st.expander("📈 Backtest der Verdict-Schwellen"):
+        st.caption("Nur Technik-Faktoren: Fundamentaldaten gibt es nur als aktuellen Stand (Look-ahead), News historisch gar nicht. "
+                   "Einstieg am Schlusskurs des Signal-Tages, Depot gleichgewichtet.")
+        bt_period = st.selectbox("Zeitraum", ["2y", "5y", "10y"], index=1)
+        if st.button("Backtest starten"):
+            with st.spinner(f"Lade {bt_period} Kurse für {len(full_scan_list)} Symbole..."):
+                bt_hist = get_batch_history(full_scan_list, bt_period)
+            bt_syms = [s for s in full_scan_list if s in bt_hist and len(bt_hist[s]) > 50]
+            bt_key = ("backtest", tuple(sorted(weights.items()))) + tuple(bar_key(s, "1d", bt_hist[s], "bt") for s in bt_syms)
+            summary, equity = memo.get(bt_key, backtest, bt_hist, weights, None, bt_syms)
+            table = pd.DataFrame({
+                "Signal-Tage": summary['signals'],
+                **{f"Ø Rendite {h}T": (summary[f'ret_{h}'] * 100).round(2) for h in BACKTEST_HORIZONS},
+                **{f"Treffer {h}T": (summary[f'hit_{h}'] * 100).round(1) for h in BACKTEST_HORIZONS},
+                f"Ø Tief {max(BACKTEST_HORIZONS)}T": (summary[f'drop_{max(BACKTEST_HORIZONS)}'] * 100).round(2),
+                "Trades": summary['trades'],
+                "Ø Trade": (summary['trade_ret'] * 100).round(2),
+                "Depot gesamt": (summary['total_return'] * 100).round(1),
+                "Max Drawdown": (summary['max_drawdown'] * 100).round(1),
+                "Investiert": (summary['exposure'] * 100).round(1),
+            })
+            st.write(f"**{len(bt_syms)} Symbole** · Werte in % · Schwellen: " + ", ".join(f"{l} ≥ {t}" for l, t in BACKTEST_THRESHOLDS))
+            st.dataframe(table, use_container_width=True)
+            st.line_chart(equity)
 
 # TAB 7: SETUP & DEEP DIVE
 with tab_desc:
@@ -596,13 +740,71 @@ with tab_desc:
         st.markdown(f"**Budget:** <span class='budget-err'>{current_budget} / {MAX_BUDGET}</span> (Zu viel!)", unsafe_allow_html=True)
         st.error(f"Bitte reduziere die Punkte um {current_budget - MAX_BUDGET}.")
 
+    # Technik-Gewichte per Backtest über die Scan-Liste optimieren. Fundamental- und News-Gewichte bleiben,
+    # ihre Punkte gehen vom Budget ab (Fundamentaldaten gibt es historisch nicht, nur den aktuellen Stand).
+    OPT_BOUNDS = {k: WEIGHT_LIMITS[k] for k in TECH_FACTORS}
+    with st.expander("🧪 Gewichte optimieren (Backtest)"):
+        opt_budget = MAX_BUDGET - sum(v for k, v in weights.items() if k not in OPT_BOUNDS and k != 'news_neg')
+        oc1, oc2, oc3 = st.columns(3)
+        opt_horizon = oc1.selectbox("Haltedauer (Tage)", [5, 20, 60], index=1)
+        opt_objective = oc2.radio("Ziel", list(OPT_OBJECTIVES), format_func=OPT_OBJECTIVES.get, horizontal=True)
+        opt_threshold = oc3.selectbox("Signal", [60, 80], format_func=lambda t: "🚀 BUY (≥ 60)" if t == 60 else "💎 STRONG BUY (≥ 80)")
+        st.caption(f"Budget für Technik-Faktoren: {opt_budget} Punkte · Raster 5 Punkte · 5 Jahre Historie der Scan-Liste, "
+                   "die letzten 25 % nur zur Kontrolle (Test).")
+        st.caption("⚠️ Historisch zählen nur die Technik-Faktoren: Fundamental- und News-Punkte fehlen im Backtest-Score "
+                   "(Signal = 50 + Technik-Punkte ≥ Schwelle). Live kommen sie dazu, Treffer können dort also abweichen.")
+        if st.button("Optimierung starten"):
+            with st.spinner("Lade Historie und bewerte alle Gewichts-Kombinationen..."):
+                opt_hist = get_batch_history(full_scan_list, "5y")
+                opt_syms = [s for s in full_scan_list if s in opt_hist and len(opt_hist[s]) > 50]
+                opt_key = ("optimize", opt_horizon, opt_objective, opt_threshold, tuple(sorted(weights.items()))) + tuple(bar_key(s, "1d", opt_hist[s], "opt") for s in opt_syms)
+                st.session_state['_opt_result'] = memo.get(opt_key, partial(optimize, horizon=opt_horizon, objective=opt_objective,
+                                                                            threshold=opt_threshold, pool=get_process_pool()),
+                                                           opt_hist, weights, OPT_BOUNDS, opt_budget, opt_syms)
+        opt_res = st.session_state.get('_opt_result')
+        if opt_res is not None:
+            show = opt_res.head(11).rename(columns={
+                'signals': "Signale", 'ret': "Ø Rendite %", 'hit': "Treffer %",
+                'signals_test': "Signale (Test)", 'ret_test': "Ø Rendite % (Test)", 'hit_test': "Treffer % (Test)"})
+            for col in ["Ø Rendite %", "Treffer %", "Ø Rendite % (Test)", "Treffer % (Test)"]: show[col] = (show[col] * 100).round(2)
+            st.dataframe(show, use_container_width=True)
+            if len(opt_res) > 1:
+                best_w = opt_res.iloc[1][[k for k in OPT_BOUNDS if k in opt_res.columns]].to_dict()
+                st.button("✅ Beste Gewichte übernehmen", on_click=apply_weights, args=(best_w,))
+
+    # Wie stark verschiebt jeder Punkt auf jedem Gewicht Scores und Verdicts im ganzen Universum?
+    # Rechnet nur auf den gespeicherten Roh-Signalen (letzter Scan + aktueller Ticker), ohne neue Daten.
+    with st.expander("🔬 Sensitivität der Gewichte (Universum)"):
+        sens_factors = st.session_state.get('_scan_factors')
+        sens_factors = sens_factors.copy() if sens_factors is not None else pd.DataFrame(columns=FACTOR_KEYS)
+        if signals is not None and 'states' in signals: sens_factors.loc[ticker_symbol] = signal_vector(signals)
+        if sens_factors.empty:
+            st.info("Noch keine Signale: erst einen Ticker laden oder den Scanner laufen lassen.")
+        else:
+            sens_n = st.slider("± Punkte", 1, 10, 5)
+            deltas = [d for d in range(-sens_n, sens_n + 1) if d]
+            sens = sensitivity_table(sens_factors.to_numpy(dtype=float), weights, list(sens_factors.index), deltas, WEIGHT_LIMITS)
+            key_names = {k: f.name for f in FACTORS for k in f.keys}
+            key_names.update({'news_pos': "News (+)", 'news_neg': "News (−)"})
+            sens['Faktor'] = sens['key'].map(key_names)
+            st.caption(f"{len(sens_factors)} Symbole (voll bewertete aus dem letzten Scan + {ticker_symbol}) · Grenzen wie die Slider, Budget wird nicht geprüft.")
+            edge = sens[sens['delta'].abs() == sens_n]
+            table = edge.pivot(index='Faktor', columns='delta', values=['mean_delta', 'up', 'down'])
+            table.columns = [f"{'Ø Δ Score' if m == 'mean_delta' else ('↑ Verdict' if m == 'up' else '↓ Verdict')} ({d:+d})" for m, d in table.columns]
+            st.dataframe(table.round(2).loc[[key_names[k] for k in FACTOR_KEYS]], use_container_width=True)
+            st.line_chart(sens.assign(Wechsel=sens['up'] + sens['down']).pivot(index='delta', columns='Faktor', values='Wechsel'))
+            sens_key = st.selectbox("Verdict-Wechsel anzeigen für", FACTOR_KEYS, format_func=key_names.get)
+            for d in (-sens_n, sens_n):
+                crossed = sens[(sens['key'] == sens_key) & (sens['delta'] == d)]['crossed'].iloc[0]
+                st.markdown(f"**{key_names[sens_key]} {d:+d} Pkt:** " + (", ".join(crossed) if crossed else "keine Wechsel"))
+
     def create_detailed_input(title, text_html, key, min_v, max_v):
         st.markdown(f"<div class='factor-title'>{title}</div>", unsafe_allow_html=True)
         c1, c2 = st.columns([3, 1])
         with c1: st.markdown(f"<div class='explain-text'>{text_html}</div>", unsafe_allow_html=True)
         with c2: 
             st.markdown(f"<div class='slider-label'>Punkte:</div>", unsafe_allow_html=True)
-            st.slider("Pkt", min_v, max_v, key=key, label_visibility="collapsed")
+            st.slider("Pkt", min_v, max_v, key=key, label_visibility="collapsed", on_change=mark_rescore_only)
 
     # --- 1. TREND ---
     create_detailed_input(
@@ -698,4 +900,4 @@ with tab_desc:
     
     st.divider()
     st.markdown("**Zusatz-Regel (Malus):**")
-    st.slider("Abzug pro negativer News (zählt nicht ins Budget)", 0, 15, key="w_nn")
+    st.slider("Abzug pro negativer News (zählt nicht ins Budget)", 0, 15, key="w_nn", on_change=mark_rescore_only)
@@ -0,0 +1,115 @@
+"""
+Vektorisierter Backtest der Verdict-Schwellen ("🚀 BUY" ab 60, "💎 STRONG BUY" ab 80).
+
+Grundlage ist die Score-Zeitreihe aus ki_engine.score_series_panel (dieselben Faktoren wie
+get_ki_verdict). Alles läuft als Array-Operation über das ganze Panel (Bars × Symbole):
+- Signal-Tage: Score am Schlusskurs ≥ Schwelle -> Rendite über die nächsten N Bars,
+  Trefferquote (Anteil > 0) und tiefster Kurs im Fenster (Max. Rückgang nach dem Signal)
+- Trades: Einstieg, wenn der Score die Schwelle überschreitet, Ausstieg am ersten Bar darunter
+- Strategie: gleichgewichtetes Depot aus allen Symbolen über der Schwelle (Rendite ab dem
+  nächsten Bar, kein Look-ahead), dazu Gesamtrendite und Max. Drawdown
+Die Zeile "Alle Tage" ist die Vergleichsbasis: jeder Tag mit gültigem Score.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ki_engine import PERF_LOOKBACK, build_panel, score_series_panel
+
+BACKTEST_THRESHOLDS = [("🚀 BUY", 60), ("💎 STRONG BUY", 80)]
+BACKTEST_HORIZONS = (5, 20, 60)
+BASELINE_LABEL = "Alle Tage"
+
+
+def forward_returns(close, horizon):
+    """Rendite vom Schlusskurs t bis t+horizon (Bars × Symbole), NaN am Ende."""
+    out = np.full_like(close, np.nan)
+    if horizon < len(close): out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def forward_drawdown(close, horizon):
+    """Tiefster Schlusskurs der nächsten `horizon` Bars relativ zu t (≤ 0), NaN am Ende."""
+    out = np.full_like(close, np.nan)
+    if horizon < len(close):
+        lows = sliding_window_view(close[1:], horizon, axis=0).min(axis=-1)
+        out[:len(lows)] = np.minimum(lows / close[:len(lows)] - 1, 0.0)
+    return out
+
+
+def max_drawdown(equity):
+    """Größter Rückgang vom bisherigen Hoch (≤ 0)."""
+    equity = np.asarray(equity, dtype=float)
+    if not len(equity): return 0.0
+    return float(np.min(equity / np.maximum.accumulate(equity) - 1))
+
+
+def trade_returns(close, pos):
+    """Rendite pro Trade: Einstieg am ersten Bar über der Schwelle, Ausstieg am ersten Bar darunter."""
+    T = len(close)
+    held = np.vstack([np.zeros((1, pos.shape[1]), bool), pos, np.zeros((1, pos.shape[1]), bool)])
+    # symbolweise (transponiert), damit Ein- und Ausstiege paarweise hintereinander liegen
+    entry_j, entry_t = np.nonzero((held[1:-1] & ~held[:-2]).T)
+    exit_j, exit_t = np.nonzero((~held[1:] & held[:-1]).T)
+    exit_t = np.minimum(exit_t, T - 1)   # am Ende noch offen: Bewertung zum letzten Kurs
+    return close[exit_t, exit_j] / close[entry_t, entry_j] - 1
+
+
+def portfolio_returns(close, dates, pos):
+    """
+    Tagesrendite eines gleichgewichteten Depots aus allen Symbolen mit `pos` am Vortag.
+    Gruppiert wird nach Datum, weil das Panel nach Bars (nicht Kalendertagen) ausgerichtet ist.
+    """
+    step = close[1:] / close[:-1] - 1
+    held = pos[:-1] & ~np.isnan(step)
+    when = dates[1:][held]
+    if not len(when): return pd.Series(dtype=float)
+    return pd.Series(step[held], index=pd.DatetimeIndex(when)).groupby(level=0).mean()
+
+
+def backtest_panel(panel, w, infos=None, thresholds=None, horizons=BACKTEST_HORIZONS, scores=None,
+                   perf_lookback=PERF_LOOKBACK):
+    """
+    Backtest aller Schwellen auf einem Panel. Gibt (Kennzahlen, Equity-Kurven) zurück:
+    - Kennzahlen: eine Zeile pro Schwelle plus BASELINE_LABEL
+    - Equity-Kurven: Depotwert (Start 1.0) pro Schwelle, Index = Datum
+    `infos`: aktuelle Fundamentaldaten über die ganze Historie (Look-ahead!), None = nur Technik.
+    `perf_lookback`: Fenster des Performance-Faktors wie in der Einzel-Analyse (1y), nicht ab Panel-Beginn.
+    """
+    thresholds = BACKTEST_THRESHOLDS if thresholds is None else thresholds
+    close = panel.close
+    if scores is None: scores = score_series_panel(panel, w, infos, perf_lookback)
+    scored = ~np.isnan(scores)
+    fwd = {h: forward_returns(close, h) for h in horizons}
+    dd = forward_drawdown(close, max(horizons)) if horizons else None
+
+    rows, curves = [], {}
+    for label, thr in [(BASELINE_LABEL, None)] + list(thresholds):
+        pos = scored if thr is None else scored & (scores >= thr)
+        row = {'label': label, 'threshold': thr, 'signals': int(pos.sum())}
+        for h in horizons:
+            r = fwd[h][pos & ~np.isnan(fwd[h])]
+            row[f'ret_{h}'] = float(r.mean()) if len(r) else np.nan
+            row[f'hit_{h}'] = float((r > 0).mean()) if len(r) else np.nan
+        if dd is not None:
+            d = dd[pos & ~np.isnan(dd)]
+            row[f'drop_{max(horizons)}'] = float(d.mean()) if len(d) else np.nan
+        trades = trade_returns(close, pos)
+        row['trades'] = len(trades)
+        row['trade_ret'] = float(np.nanmean(trades)) if len(trades) else np.nan
+        row['trade_hit'] = float(np.mean(trades > 0)) if len(trades) else np.nan
+        daily = portfolio_returns(close, panel.dates, pos)
+        equity = (1 + daily).cumprod()
+        row['total_return'] = float(equity.iloc[-1] - 1) if len(equity) else 0.0
+        row['max_drawdown'] = max_drawdown(equity.to_numpy())
+        row['exposure'] = float(pos.sum() / max(1, scored.sum()))
+        rows.append(row)
+        curves[label] = equity
+    return pd.DataFrame(rows).set_index('label'), pd.DataFrame(curves).ffill().fillna(1.0)
+
+
+def backtest(frames, w, infos=None, symbols=None, thresholds=None, horizons=BACKTEST_HORIZONS):
+    """{Symbol: OHLCV-DataFrame} -> backtest_panel."""
+    panel = build_panel(frames, symbols)
+    if isinstance(infos, dict): infos = [infos.get(s, {}) for s in panel.symbols]
+    return backtest_panel(panel, w, infos, thresholds, horizons)
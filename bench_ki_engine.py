@@ -0,0 +1,82 @@
+"""
+Benchmark: fusionierter Factor-Kernel vs. ursprüngliche pandas-Indikatoren.
+
+    python bench_ki_engine.py [--bars 252] [--symbols 200] [--repeat 5]
+
+Misst Zeit und Allokationen (tracemalloc-Peak) pro Symbol und prüft, dass beide Varianten
+dieselben Werte liefern.
+"""
+import argparse
+import math
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ki_engine import INDICATOR_FIELDS, compute_indicators, compute_indicators_pandas
+
+
+def synthetic_histories(n_symbols, n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_bars)
+    frames = []
+    for _ in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+        frames.append(pd.DataFrame({
+            'Open': close, 'High': close + spread, 'Low': close - spread, 'Close': close,
+            'Volume': rng.integers(100_000, 5_000_000, n_bars),
+        }, index=idx))
+    return frames
+
+
+def time_per_symbol(fn, frames, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for df in frames: fn(df)
+        best = min(best, (time.perf_counter() - t0) / len(frames))
+    return best
+
+
+def peak_alloc(fn, df):
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def max_rel_diff(frames):
+    worst = 0.0
+    for df in frames:
+        a, b = compute_indicators(df), compute_indicators_pandas(df)
+        for k in INDICATOR_FIELDS:
+            x, y = float(a[k]), float(b[k])
+            if math.isnan(x) and math.isnan(y): continue
+            worst = max(worst, abs(x - y) / max(1.0, abs(y)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = synthetic_histories(args.symbols, args.bars)
+    t_pd = time_per_symbol(compute_indicators_pandas, frames, args.repeat)
+    t_k = time_per_symbol(compute_indicators, frames, args.repeat)
+    m_pd, m_k = peak_alloc(compute_indicators_pandas, frames[0]), peak_alloc(compute_indicators, frames[0])
+
+    print(f"{args.symbols} Symbole × {args.bars} Bars")
+    print(f"pandas:  {t_pd * 1e6:8.1f} µs/Symbol   Peak {m_pd / 1024:7.1f} KiB")
+    print(f"Kernel:  {t_k * 1e6:8.1f} µs/Symbol   Peak {m_k / 1024:7.1f} KiB")
+    print(f"Faktor:  {t_pd / t_k:8.1f}× schneller   {m_pd / max(1, m_k):5.1f}× weniger Speicher")
+    print(f"Max. rel. Abweichung: {max_rel_diff(frames):.2e}")
+
+
+if __name__ == "__main__":
+    main()
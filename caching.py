@@ -0,0 +1,265 @@
+"""
+Prozessweite Caches und Request-Coalescing (geteilt über alle Streamlit-Sessions).
+"""
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Fasst identische Requests zusammen: Key = (Symbol, Endpoint, Parameter, Zeit-Bucket).
+    Der erste Aufrufer holt die Daten, alle gleichzeitigen Aufrufer warten auf genau diesen Fetch.
+    Erfolgreiche Ergebnisse bleiben bis zum Ende ihres Zeit-Buckets stehen, damit leicht
+    versetzte Sessions (z.B. 10 User öffnen NVDA) ebenfalls keinen eigenen Call auslösen.
+    Ergebnisse werden geteilt und dürfen daher nicht verändert werden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._done = {}
+        self._stats = {"requests": 0, "executed": 0, "joined_inflight": 0, "bucket_hits": 0, "errors": 0}
+
+    @staticmethod
+    def bucket(seconds, now=None):
+        return int((now or time.time()) // seconds) if seconds else 0
+
+    def _purge(self, current):
+        # Ergebnisse aus abgelaufenen Buckets verwerfen; Key endet immer mit (bucket_seconds, bucket)
+        stale = [k for k in self._done if k[-1] != self.bucket(k[-2], current)]
+        for k in stale: del self._done[k]
+
+    def do(self, key, bucket_seconds, fn, *args, **kwargs):
+        full_key = tuple(key) + (bucket_seconds, self.bucket(bucket_seconds))
+        with self._lock:
+            self._stats["requests"] += 1
+            if full_key in self._done:
+                self._stats["bucket_hits"] += 1
+                return self._done[full_key]
+            call = self._inflight.get(full_key)
+            leader = call is None
+            if leader:
+                call = self._inflight[full_key] = _Call()
+            else:
+                self._stats["joined_inflight"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+        with self._lock:
+            self._stats["executed"] += 1
+            del self._inflight[full_key]
+            if call.error is None and bucket_seconds:
+                self._purge(time.time())
+                self._done[full_key] = call.result
+            elif call.error is not None:
+                self._stats["errors"] += 1
+        call.event.set()
+        if call.error is not None: raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["saved"] = s["joined_inflight"] + s["bucket_hits"]
+        return s
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class StaleWhileRevalidate:
+    """
+    Liefert sofort den letzten bekannten Wert samt Alter. Ist er älter als `fresh_for`,
+    wird im Hintergrund neu geladen; erst ab `max_stale` (oder ohne Wert) wird gewartet.
+    `submit(fn, *args)` muss ein Future liefern (z.B. der FetchExecutor mit Host-Limit).
+    `is_valid(value)` filtert leere Antworten: dann bleibt der alte Wert stehen.
+    """
+
+    def __init__(self, fresh_for=15, max_stale=None, submit=None, is_valid=None, max_entries=512):
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.is_valid = is_valid
+        self.max_entries = max_entries
+        if submit is None:
+            pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="swr")
+            submit = pool.submit
+        self._submit = submit
+        # RLock: der Done-Callback eines synchron erfüllten Futures läuft noch unter dem Lock von fetch()
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._refreshing = {}
+
+    def _load(self, key, loader):
+        """Lädt neu und gibt (Wert, Abrufzeit) zurück; verworfene Antworten liefern den alten Eintrag."""
+        value = loader()
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None and self.is_valid is not None and not self.is_valid(value):
+                return old.value, old.fetched_at
+            entry = self._entries[key] = _Entry(value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value, entry.fetched_at
+
+    def _forget(self, key, fut):
+        with self._lock:
+            if self._refreshing.get(key) is fut: del self._refreshing[key]
+
+    def _refresh_locked(self, key, loader):
+        fut = self._refreshing.get(key)
+        if fut is not None and not fut.done(): return fut
+        fut = self._refreshing[key] = self._submit(self._load, key, loader)
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def fetch(self, key, loader):
+        """Future mit (Wert, Alter in Sekunden). Bei warmem Cache ist es sofort erfüllt."""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None:
+                age = now - entry.fetched_at
+                if self.max_stale is None or age <= self.max_stale:
+                    if age > self.fresh_for: self._refresh_locked(key, loader)
+                    self._entries.move_to_end(key)
+                    out = Future()
+                    out.set_result((entry.value, age))
+                    return out
+            inner = self._refresh_locked(key, loader)
+
+        out = Future()
+
+        def _done(f):
+            if f.exception() is not None: out.set_exception(f.exception())
+            else:
+                value, fetched_at = f.result()
+                out.set_result((value, max(0.0, time.time() - fetched_at)))
+        inner.add_done_callback(_done)
+        return out
+
+    def get(self, key, loader):
+        return self.fetch(key, loader).result()
+
+    def age(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else time.time() - entry.fetched_at
+
+
+def _sizeof(value):
+    """Grobe Speichergröße in Bytes (Arrays/Frames exakt, Container rekursiv)."""
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if hasattr(value, "nbytes"): return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def bar_key(symbol, interval, df, name, *params):
+    """
+    Memo-Key für einen Indikator: (Symbol, Intervall, erster/letzter Bar, Prüfsumme, Indikator, Parameter).
+    Die CRC32 über alle Closes erkennt den laufenden Bar ebenso wie rückwirkend angepasste Kurse
+    (Splits/Dividenden), bei denen erster und letzter Bar gleich bleiben.
+    """
+    if df is None or not len(df): return (symbol, interval, None, None, None, name) + params
+    crc = zlib.crc32(df['Close'].to_numpy(dtype=float).tobytes())
+    return (symbol, interval, df.index[0], df.index[-1], crc, name) + params
+
+
+class IndicatorMemo:
+    """
+    LRU-Memo für berechnete Indikatoren, begrenzt auf `max_bytes` und `max_entries`.
+    Jeder Indikator wird pro neuem Bar höchstens einmal gerechnet – über Tabs, Sessions und
+    den Scanner hinweg. Gleichzeitige Anfragen für denselben Key warten auf die erste Berechnung.
+    Werte werden geteilt und dürfen nicht verändert werden.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, max_entries=4096):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._inflight = {}
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _evict_locked(self):
+        while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats["evictions"] += 1
+
+    def get(self, key, fn, *args, **kwargs):
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return hit[0]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+        with self._lock:
+            del self._inflight[key]
+            if call.error is None:
+                size = _sizeof(call.result)
+                if size <= self.max_bytes:
+                    self._entries[key] = (call.result, size)
+                    self._bytes += size
+                    self._evict_locked()
+        call.event.set()
+        if call.error is not None: raise call.error
+        return call.result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
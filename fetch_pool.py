@@ -0,0 +1,119 @@
+"""
+Gemeinsamer Fetch-Executor für alle Netzwerk-Calls (yfinance, RSS).
+
+Ein Thread-Pool mit begrenzter Parallelität plus ein Token-Bucket pro Host.
+So überlappen sich die I/O-Wartezeiten, ohne dass wir Yahoo ins Rate-Limit treiben.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+YAHOO_API_HOST = "query1.finance.yahoo.com"
+YAHOO_RSS_HOST = "finance.yahoo.com"
+GOOGLE_NEWS_HOST = "news.google.com"
+
+DEFAULT_MAX_WORKERS = 8
+
+# Host -> (Requests pro Sekunde, Burst)
+DEFAULT_HOST_LIMITS = {
+    YAHOO_API_HOST: (4.0, 8),
+    YAHOO_RSS_HOST: (2.0, 4),
+    GOOGLE_NEWS_HOST: (2.0, 4),
+}
+
+
+def host_of(url):
+    return urlparse(url).hostname or ""
+
+
+class TokenBucket:
+    """Klassischer Token-Bucket: `rate` Tokens pro Sekunde, maximal `capacity` auf Vorrat."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """Blockiert, bis ein Token frei ist. Gibt False zurück, wenn `timeout` abläuft."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now >= deadline: return False
+                wait = min(wait, deadline - now)
+            time.sleep(wait)
+
+
+class FetchExecutor:
+    """
+    Thread-Pool für Netzwerk-Calls mit Rate-Limit pro Host.
+    `submit(host, fn, ...)` liefert ein Future; der Worker wartet vor dem Call auf ein Token des Hosts.
+    Hosts ohne eingetragenes Limit laufen nur durch die Parallelitätsgrenze des Pools.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, host_limits=None):
+        self.max_workers = max_workers
+        limits = DEFAULT_HOST_LIMITS if host_limits is None else host_limits
+        self._buckets = {h: TokenBucket(rate, cap) for h, (rate, cap) in limits.items()}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def bucket(self, host):
+        return self._buckets.get(host)
+
+    @contextmanager
+    def throttle(self, host):
+        """Rate-Limit für Calls, die direkt im aufrufenden Thread laufen."""
+        b = self._buckets.get(host)
+        if b is not None: b.acquire()
+        yield
+
+    def _run(self, host, fn, args, kwargs):
+        with self.throttle(host):
+            return fn(*args, **kwargs)
+
+    def submit(self, host, fn, *args, **kwargs):
+        return self._pool.submit(self._run, host, fn, args, kwargs)
+
+    def map_symbols(self, host, fn, symbols):
+        """Startet fn(symbol) für alle Symbole; liefert (symbol, Ergebnis, Fehler) in Fertigstellungs-Reihenfolge."""
+        futures = {self.submit(host, fn, s): s for s in symbols}
+        for fut in as_completed(futures):
+            sym = futures[fut]
+            try:
+                yield sym, fut.result(), None
+            except Exception as e:
+                yield sym, None, e
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+def result_or(future, default, timeout=None):
+    """Ergebnis eines Futures oder `default`, falls der Call fehlschlägt (flaky APIs)."""
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return default
@@ -0,0 +1,121 @@
+"""
+FX-Matrix für alle relevanten Währungen.
+
+Statt pro Rerun einzeln EURUSD=X abzufragen, holen wir alle Paare gegen USD in einem Batch,
+bauen daraus die komplette Kreuzkurs-Matrix und cachen sie mit TTL. Umrechnungen von
+Skalaren, OHLC-Frames und Ergebnis-Spalten laufen vektorisiert über diese Matrix.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CURRENCIES = ("USD", "EUR", "GBP", "CHF", "JPY", "CAD", "AUD", "HKD", "SEK", "DKK", "NOK")
+PIVOT_CURRENCY = "USD"
+DEFAULT_TTL = 900
+
+# Yahoo notiert manche Börsen in Untereinheiten (London in Pence usw.)
+MINOR_UNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ZAc": ("ZAR", 0.01), "ILA": ("ILS", 0.01)}
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+
+def split_minor_unit(currency):
+    return MINOR_UNITS.get(currency, (currency, 1.0))
+
+
+class FXService:
+    """
+    `matrix()` liefert ein DataFrame M mit M.loc[von, nach] = Einheiten `nach` pro Einheit `von`.
+    Fehlt eine Währung, wird sie einzeln nachgeladen und ab dem nächsten Refresh mitgebatcht.
+    """
+
+    def __init__(self, provider, currencies=DEFAULT_CURRENCIES, ttl=DEFAULT_TTL):
+        self.provider = provider
+        self.currencies = list(dict.fromkeys(currencies))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._fetched_at = 0.0
+        self._missing = set()   # Währungen ohne Kurs: nicht bei jedem Aufruf erneut anfragen
+
+    def _build(self, pivot_rates):
+        ccys = list(pivot_rates)
+        per_pivot = np.array([pivot_rates[c] for c in ccys], dtype=float)
+        return pd.DataFrame(np.outer(per_pivot, 1 / per_pivot), index=ccys, columns=ccys)
+
+    def refresh(self):
+        rates = self.provider.fx_rates(self.currencies, PIVOT_CURRENCY)
+        rates[PIVOT_CURRENCY] = 1.0
+        with self._lock:
+            if self._matrix is not None:
+                # Paare, die diesmal fehlen, behalten ihren letzten Kurs
+                for c in self._matrix.index:
+                    rates.setdefault(c, float(self._matrix.at[c, PIVOT_CURRENCY]))
+            self._matrix = self._build(rates)
+            self._fetched_at = time.time()
+            self._missing.clear()
+            return self._matrix
+
+    def matrix(self):
+        with self._lock:
+            fresh = self._matrix is not None and time.time() - self._fetched_at < self.ttl
+            if fresh: return self._matrix
+        try:
+            return self.refresh()
+        except Exception:
+            with self._lock:
+                if self._matrix is not None: return self._matrix
+            raise
+
+    def _add_currency(self, ccy):
+        with self._lock:
+            if ccy in self._missing: raise KeyError(ccy)
+        try:
+            rate = self.provider.fx_rate(ccy, PIVOT_CURRENCY)
+        except Exception:
+            with self._lock: self._missing.add(ccy)
+            raise
+        with self._lock:
+            if ccy not in self.currencies: self.currencies.append(ccy)
+            rates = {c: float(self._matrix.at[c, PIVOT_CURRENCY]) for c in self._matrix.index}
+            rates[ccy] = rate
+            self._matrix = self._build(rates)
+            return self._matrix
+
+    def rate(self, from_ccy, to_ccy, default=None):
+        """Faktor von `from_ccy` nach `to_ccy` (inkl. Untereinheiten wie GBp)."""
+        if not all(isinstance(c, str) and c for c in (from_ccy, to_ccy)):
+            # Währung unbekannt (z.B. info ohne 'currency'): nicht nachladen und nicht als fehlend merken
+            if default is not None: return default
+            raise ValueError(f"Währung fehlt: {from_ccy!r} -> {to_ccy!r}")
+        (f, f_mult), (t, t_mult) = split_minor_unit(from_ccy), split_minor_unit(to_ccy)
+        if f == t: return f_mult / t_mult
+        try:
+            m = self.matrix()
+            for c in (f, t):
+                if c not in m.index: m = self._add_currency(c)
+            return float(m.at[f, t]) * f_mult / t_mult
+        except Exception:
+            if default is not None: return default
+            raise
+
+    def convert(self, values, from_ccy, to_ccy):
+        """Skalar, Series, Array oder DataFrame als Ganzes umrechnen."""
+        return values * self.rate(from_ccy, to_ccy)
+
+    def convert_frame(self, df, from_ccy, to_ccy, columns=PRICE_COLUMNS, default=None):
+        """Nur die Preisspalten eines OHLC-Frames umrechnen (Volumen bleibt unverändert)."""
+        out = df.copy()
+        cols = [c for c in columns if c in out.columns]
+        out[cols] = out[cols] * self.rate(from_ccy, to_ccy, default=default)
+        return out
+
+    def convert_column(self, df, value_col, currency_col, to_ccy):
+        """
+        Spalte mit gemischten Währungen (z.B. Scanner-Ergebnisse) in eine Zielwährung.
+        Ein Lookup pro Währung, danach eine einzige vektorisierte Multiplikation.
+        """
+        factors = {c: self.rate(c, to_ccy, default=np.nan) for c in pd.unique(df[currency_col])}
+        return df[value_col] * df[currency_col].map(factors).astype(float)
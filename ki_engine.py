@@ -0,0 +1,840 @@
+"""
+Vektorisierte KI-Engine für ganze Universen.
+
+Die Kurse aller Symbole liegen als 2-D-Panel (Bars × Symbole) in NumPy-Arrays. Alle
+Indikatoren werden in einem Durchgang für alle Symbole berechnet und in eine Faktor-Matrix
+übersetzt. Jede Zelle ist der Multiplikator für das zugehörige Gewicht
+(+1 = Bonus, -1 = Malus, 0 = neutral; bei News die Anzahl der Treffer), d.h.
+    Score = clip(50 + Faktoren @ Gewichte, 0, 100)
+– exakt die Punktelogik von get_ki_verdict.
+"""
+import numpy as np
+import pandas as pd
+
+# Reihenfolge der Gewichte (Keys wie im `weights`-Dict der App)
+FACTOR_KEYS = ['trend', 'rsi', 'vola', 'margin', 'cash', 'value', 'peg', 'volume', 'sector', 'macd', 'news_pos', 'news_neg']
+TECH_FACTORS = ['trend', 'rsi', 'vola', 'volume', 'sector', 'macd']
+FUNDAMENTAL_FACTORS = ['margin', 'cash', 'value', 'peg']
+NEWS_FACTORS = ['news_pos', 'news_neg']
+
+MIN_BARS = 50
+BASE_SCORE = 50
+
+# Standard-Gewichtung (Startwerte der Slider) und Punkte-Budget; news_neg zählt nicht zum Budget
+DEFAULT_WEIGHTS = {'trend': 15, 'rsi': 10, 'vola': 5, 'margin': 10, 'cash': 5, 'value': 10, 'peg': 5,
+                   'volume': 10, 'sector': 10, 'macd': 5, 'news_pos': 5, 'news_neg': 7}
+MAX_BUDGET = 100
+
+# Schwellen (identisch zu get_ki_verdict)
+RSI_OVERBOUGHT, RSI_OVERSOLD = 70, 30
+VOLA_MAX_PCT = 4
+MARGIN_MIN = 0.15
+KGV_MAX = 18
+PEG_MIN, PEG_MAX = 0.5, 1.5
+VOLUME_SPIKE = 1.3
+SECTOR_OUTPERF = 0.2
+# Performance-Fenster (Bars) für Zeitreihen: die Einzel-Analyse rechnet auf der 1y-Historie
+PERF_LOOKBACK = 252
+
+VERDICT_LEVELS = [(95, "🌟 STAR AKTIE"), (80, "💎 STRONG BUY"), (60, "🚀 BUY"), (35, "➡️ HOLD")]
+VERDICT_FLOOR = "🛑 SELL"
+
+
+def verdict_for_score(score):
+    for threshold, label in VERDICT_LEVELS:
+        if score >= threshold: return label
+    return VERDICT_FLOOR
+
+
+def weight_vector(w, keys=FACTOR_KEYS):
+    return np.array([w.get(k, 0) for k in keys], dtype=float)
+
+
+def weight_budget(w):
+    """Verbrauchte Punkte (ohne news_neg)."""
+    return sum(v for k, v in w.items() if k != 'news_neg')
+
+
+# =========================================================
+# PANEL
+# =========================================================
+
+class Panel:
+    """
+    Kurse als Arrays (Bars × Symbole), rechtsbündig: die letzte Zeile ist für jedes Symbol
+    dessen letzter Bar, kürzere Historien sind vorne mit NaN aufgefüllt. So bleiben die
+    Rolling-Fenster pro Symbol exakt wie in pandas, auch bei unterschiedlichen Börsenkalendern.
+    """
+
+    def __init__(self, symbols, dates, close, high, low, volume):
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def n_bars(self):
+        return np.sum(~np.isnan(self.close), axis=0)
+
+
+def build_panel(frames, symbols=None, length=None):
+    """{Symbol: OHLCV-DataFrame} -> Panel. `length` begrenzt auf die letzten N Bars."""
+    symbols = [s for s in (frames if symbols is None else symbols)
+               if s in frames and frames[s] is not None and len(frames[s])]
+    T = max((len(frames[s]) for s in symbols), default=0)
+    if length is not None: T = min(T, length)
+    S = len(symbols)
+    close, high, low, volume = (np.full((T, S), np.nan) for _ in range(4))
+    dates = np.full((T, S), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for j, s in enumerate(symbols):
+        df = frames[s]
+        # ein to_numpy pro Frame statt einer Series pro Spalte (spart bei 5000 Symbolen den Großteil)
+        vals = df.to_numpy(dtype=float)[-T:] if T else None
+        n = 0 if vals is None else len(vals)
+        if not n: continue
+        names = list(df.columns)
+        cols = [names.index(c) for c in ('Close', 'High', 'Low', 'Volume')]
+        close[T - n:, j], high[T - n:, j], low[T - n:, j], volume[T - n:, j] = vals[:, cols].T
+        idx = df.index
+        if getattr(idx, 'tz', None) is not None: idx = idx.tz_localize(None)
+        dates[T - n:, j] = np.asarray(idx, dtype="datetime64[ns]")[-n:]
+    return Panel(symbols, dates, close, high, low, volume)
+
+
+# =========================================================
+# INDIKATOREN (ein Symbol)
+# =========================================================
+
+INDICATOR_FIELDS = ('curr_p', 'sma50', 'sma200', 'rsi', 'atr_pct', 'macd', 'macd_signal', 'volume', 'vol_avg20', 'n_bars')
+NAN = float('nan')
+KERNEL_TAIL = 20   # längstes Fenster auf High/Low/Volume (Volumen-Schnitt)
+
+
+def factor_kernel(close, high, low, volume, out=None):
+    """
+    Fusionierter Kernel: ein einziger Durchgang über Close, alle Indikatoren laufen als Skalare
+    mit (EMAs, MACD-Signal, Fenster-Summen für SMA/RSI/ATR/Volumen). High/Low/Volume dürfen auf
+    die letzten KERNEL_TAIL Bars gekürzt sein. Keine Zwischen-Series; das Ergebnis landet in
+    `out` (vorallokiert, Reihenfolge INDICATOR_FIELDS). NaN-Bars wie pandas (ewm ignore_na=False,
+    rolling ohne min_periods).
+    """
+    if out is None: out = np.empty(len(INDICATOR_FIELDS))
+    n = len(close)
+    if n == 0:
+        out[:] = NAN; out[-1] = 0
+        return out
+    a12, a26, a9 = 2 / 13, 2 / 27, 2 / 10
+    e12 = e26 = close[0]
+    sig = 0.0 if e12 == e12 else NAN
+    # Gewicht des bisherigen EMA-Werts wie old_wt in pandas: zerfällt auch über NaN-Bars weiter
+    w12 = w26 = 1.0
+    s50 = s200 = gain = loss = rng = vol = 0.0
+    vol_n = 0
+    w50, w200, w14, w20 = n - 50, n - 200, n - 14, n - 20
+    off = n - len(volume)   # Position von high/low/volume[0] in der Close-Reihe
+    prev = close[0]
+    for i in range(n):
+        c = close[i]
+        if i:
+            if e12 != e12:
+                # vor dem ersten gültigen Close: EMAs starten dort, das Signal mit MACD = 0
+                e12 = e26 = c
+                if c == c: sig = 0.0
+            else:
+                w12 *= 1 - a12
+                w26 *= 1 - a26
+                if c == c:
+                    e12 = (w12 * e12 + a12 * c) / (w12 + a12)
+                    e26 = (w26 * e26 + a26 * c) / (w26 + a26)
+                    w12 = w26 = 1.0
+                sig = ((1 - a9) * sig + a9 * (e12 - e26)) / ((1 - a9) + a9)
+        if i >= w200:
+            s200 += c
+            if i >= w50: s50 += c
+        if i >= w14:
+            d = c - prev
+            if d > 0: gain += d
+            elif d < 0: loss -= d
+            rng += high[i - off] - low[i - off]
+        if i >= w20:
+            v = volume[i - off]
+            if v == v: vol += v; vol_n += 1
+        prev = c
+    curr_p = close[-1]
+    rsi = NAN
+    if n >= 14:
+        if loss: rsi = 100 - 100 / (1 + gain / loss)
+        elif gain: rsi = 100.0
+    out[0] = curr_p
+    out[1] = s50 / 50 if n >= 50 else NAN
+    out[2] = s200 / 200 if n >= 200 else NAN
+    out[3] = rsi
+    out[4] = (rng / 14) / curr_p * 100 if n >= 14 else NAN
+    out[5] = e12 - e26
+    out[6] = sig
+    out[7] = volume[-1]
+    out[8] = vol / vol_n if vol_n else NAN
+    out[9] = n
+    return out
+
+
+def compute_indicators(hist_df, out=None):
+    """Indikatoren von get_ki_verdict für den letzten Bar eines Symbols (gleiche Keys wie das Panel)."""
+    # Nur Close wird komplett durchlaufen; High/Low/Volume braucht der Kernel nur im Fenster am Ende
+    close = hist_df['Close'].to_numpy(dtype=float).tolist()
+    tails = (hist_df[c].to_numpy(dtype=float)[-KERNEL_TAIL:].tolist() for c in ('High', 'Low', 'Volume'))
+    vals = factor_kernel(close, *tails, out=out)
+    ind = dict(zip(INDICATOR_FIELDS, vals.tolist()))
+    ind['n_bars'] = int(ind['n_bars'])
+    return ind
+
+
+def compute_indicators_pandas(hist_df):
+    """Referenz: die ursprüngliche pandas-Variante (Basis für Tests und bench_ki_engine.py)."""
+    close = hist_df['Close']
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rs = gain / loss
+    curr_p = float(close.iloc[-1])
+    atr = (hist_df['High'] - hist_df['Low']).rolling(14).mean().iloc[-1]
+    exp1 = close.ewm(span=12, adjust=False).mean()
+    exp2 = close.ewm(span=26, adjust=False).mean()
+    macd = exp1 - exp2
+    sig = macd.ewm(span=9, adjust=False).mean()
+    return {
+        'curr_p': curr_p,
+        'sma50': close.rolling(50).mean().iloc[-1],
+        'sma200': close.rolling(200).mean().iloc[-1],
+        'rsi': 100 - (100 / (1 + rs.iloc[-1])),
+        'atr_pct': (atr / curr_p) * 100,
+        'macd': macd.iloc[-1],
+        'macd_signal': sig.iloc[-1],
+        'volume': hist_df['Volume'].iloc[-1],
+        'vol_avg20': hist_df['Volume'].tail(20).mean(),
+        'n_bars': len(hist_df),
+    }
+
+
+def bollinger_bands(hist_df, window=20, num_std=2):
+    """Obere/untere Bollinger-Bänder als Series (für den Chart)."""
+    sma = hist_df['Close'].rolling(window).mean()
+    std = hist_df['Close'].rolling(window).std()
+    return sma + num_std * std, sma - num_std * std
+
+
+# =========================================================
+# SIGNALE & SCORING (ein Symbol)
+# =========================================================
+# Stufe 1 (compute_signals): Zustand und Rohwert jedes Faktors – hängt nur von den Daten ab
+# und kann gecacht werden. Stufe 2 (score_signals): Skalarprodukt mit den Gewichten plus
+# Texte/Radar – reine Rechnung, daher bei Slider-Änderungen in Millisekunden fertig.
+
+NEWS_POS_WORDS = ['upgraded', 'buy', 'growth', 'beats', 'profit', 'bull', 'surge', 'soar', 'strong', 'record', 'partnership']
+NEWS_NEG_WORDS = ['risk', 'sell', 'loss', 'misses', 'bear', 'warnung', 'drop', 'fall', 'plunge', 'downgrade', 'weak', 'lawsuit']
+NEWS_MAX_ITEMS = 10
+
+
+def news_hits(news_list):
+    """(positive Treffer, negative Treffer, ausgewertete Schlagzeilen) der ersten NEWS_MAX_ITEMS News."""
+    pos = neg = count = 0
+    for n in (news_list or [])[:NEWS_MAX_ITEMS]:
+        title = (n.get('title') or '').lower()
+        if any(w in title for w in NEWS_POS_WORDS): pos += 1
+        if any(w in title for w in NEWS_NEG_WORDS): neg += 1
+        count += 1
+    return pos, neg, count
+
+
+def analyze_news_sentiment(news_list, w_pos, w_neg):
+    if not news_list: return 0, 0
+    pos, neg, count = news_hits(news_list)
+    return round(pos * w_pos - neg * w_neg, 1), count
+
+
+# ---------------------------------------------------------
+# Faktor-Plugins
+# ---------------------------------------------------------
+# Jeder Faktor deklariert seine Gewichte (keys), seine Datenquellen (deps) und seine Kosten.
+# Der Planer (plan_factors) leitet daraus ab, was für eine Gewichtung geladen/gerechnet werden
+# muss – z.B. kein info-Call, wenn alle Fundamental-Gewichte 0 sind.
+# Neuer Faktor = neues Factor-Objekt in FACTORS (+ Key in FACTOR_KEYS und ein Slider in der App).
+
+DEP_BARS, DEP_INFO, DEP_NEWS = 'bars', 'info', 'news'
+# Relative Kosten einer Datenquelle (lokaler Store vs. Netzwerk-Call)
+FETCH_COST = {DEP_BARS: 1, DEP_INFO: 50, DEP_NEWS: 30}
+# Wertebereich der Multiplikatoren je Gewicht: daraus folgt der höchste/niedrigste noch mögliche
+# Score, solange eine Datenquelle nicht geladen ist (siehe score_bounds)
+FACTOR_RANGES = {
+    'trend': (-1, 1), 'rsi': (-1, 1), 'vola': (-1, 0), 'margin': (0, 1), 'cash': (0, 1), 'value': (0, 1),
+    'peg': (0, 1), 'volume': (0, 1), 'sector': (0, 1), 'macd': (0, 1),
+    'news_pos': (0, NEWS_MAX_ITEMS), 'news_neg': (-NEWS_MAX_ITEMS, 0),
+}
+
+
+def key_spread(keys, w):
+    """Wie viele Score-Punkte hängen höchstens an `keys`? (max - min des Beitrags)"""
+    return sum(abs(w.get(k, 0)) * (FACTOR_RANGES[k][1] - FACTOR_RANGES[k][0]) for k in keys)
+
+
+class Factor:
+    """
+    - `compute(ctx)` -> (states, values): Multiplikator je Gewicht und Rohwerte für Texte
+    - `reason(states, values, w)` -> Zeile für die Begründung
+    - `radar`: (Achse, Wert bei Bonus, neutral, Malus) oder None
+    """
+
+    def __init__(self, name, keys, deps, cost, compute, reason, radar=None, info_fields=()):
+        self.name = name
+        self.keys = tuple(keys)
+        self.deps = frozenset(deps)
+        self.cost = cost
+        self.compute = compute
+        self.reason = reason
+        self.radar = radar
+        self.info_fields = tuple(info_fields)
+
+    def active(self, w):
+        return any(w.get(k, 0) for k in self.keys)
+
+
+class _Context:
+    """Daten für die Plugins; Indikatoren werden erst beim ersten Zugriff gerechnet (ein Kernel-Lauf)."""
+
+    def __init__(self, hist_df, info, news, ind=None):
+        self.hist = hist_df
+        self.info = info
+        self.news = news
+        self._ind = ind
+        self.curr_p = float(hist_df['Close'].iloc[-1])
+
+    @property
+    def ind(self):
+        if self._ind is None: self._ind = compute_indicators(self.hist)
+        return self._ind
+
+
+def _trend(ctx):
+    s50, s200, p = ctx.ind['sma50'], ctx.ind['sma200'], ctx.curr_p
+    sma_ok = not pd.isna(s50) and not pd.isna(s200)
+    state = (1 if p > s50 > s200 else -1 if p < s200 else 0) if sma_ok else 0
+    return {'trend': state}, {'sma50': s50, 'sma200': s200, 'sma_ok': sma_ok}
+
+
+def _trend_reason(s, v, w):
+    if not v['sma_ok']: return "🧭 Trend: Daten unvollständig"
+    if s['trend'] > 0: return f"🧭 Trend: Stark Bullish (über SMA 50/200) [+{w['trend']}]"
+    if s['trend'] < 0: return f"🧭 Trend: Bearish (unter SMA 200) [-{w['trend']}]"
+    return "🧭 Trend: Neutral (Konsolidierung)"
+
+
+def _rsi(ctx):
+    rsi = ctx.ind['rsi']
+    return {'rsi': -1 if rsi > RSI_OVERBOUGHT else 1 if rsi < RSI_OVERSOLD else 0}, {'rsi': rsi}
+
+
+def _rsi_reason(s, v, w):
+    if s['rsi'] < 0: return f"⚡ RSI: Überhitzt ({v['rsi']:.1f}) [-{w['rsi']}]"
+    if s['rsi'] > 0: return f"⚡ RSI: Überverkauft ({v['rsi']:.1f}) [+{w['rsi']}]"
+    return f"⚡ RSI: Neutral ({v['rsi']:.1f})"
+
+
+def _vola(ctx):
+    vola = ctx.ind['atr_pct']
+    return {'vola': -1 if vola > VOLA_MAX_PCT else 0}, {'atr_pct': vola}
+
+
+def _vola_reason(s, v, w):
+    if s['vola'] < 0: return f"🎢 Vola: Hoch ({v['atr_pct']:.1f}%) [-{w['vola']}]"
+    return f"🎢 Vola: Angemessen ({v['atr_pct']:.1f}%)"
+
+
+def _margin(ctx):
+    margin = _num(ctx.info, 'operatingMargins', 0)
+    return {'margin': 1 if margin > MARGIN_MIN else 0}, {'margin': margin}
+
+
+def _cash(ctx):
+    cash, debt = _num(ctx.info, 'totalCash', 0), _num(ctx.info, 'totalDebt', 0)
+    return {'cash': 1 if cash > debt else 0}, {}
+
+
+def _value(ctx):
+    kgv = ctx.info.get('forwardPE', ctx.info.get('trailingPE'))
+    return {'value': 1 if kgv and 0 < kgv < KGV_MAX else 0}, {'kgv': kgv}
+
+
+def _peg(ctx):
+    peg = ctx.info.get('pegRatio')
+    return {'peg': 1 if peg and PEG_MIN < peg < PEG_MAX else 0}, {'peg': peg}
+
+
+def _volume(ctx):
+    return {'volume': 1 if ctx.ind['volume'] > ctx.ind['vol_avg20'] * VOLUME_SPIKE else 0}, {}
+
+
+def _sector(ctx):
+    perf = ctx.curr_p / float(ctx.hist['Close'].iloc[0]) - 1
+    # Sektor-Name nur für den Text: kommt mit, falls info ohnehin geladen ist
+    return {'sector': 1 if perf > SECTOR_OUTPERF else 0}, {'perf': perf, 'sector': (ctx.info or {}).get('sector', 'N/A')}
+
+
+def _macd(ctx):
+    return {'macd': 1 if ctx.ind['macd'] > ctx.ind['macd_signal'] else 0}, {}
+
+
+def _news(ctx):
+    pos, neg, count = news_hits(ctx.news)
+    return {'news_pos': pos, 'news_neg': -neg}, {'news_count': count}
+
+
+def _news_reason(s, v, w):
+    return f"📰 News Feed: Score {_news_score(s, v, w)} (aus {v['news_count']} Quellen)"
+
+
+def _news_score(s, v, w):
+    return round(s['news_pos'] * w['news_pos'] + s['news_neg'] * w['news_neg'], 1) if v['news_count'] else 0
+
+
+FACTORS = [
+    Factor("Trend", ['trend'], [DEP_BARS], 1, _trend, _trend_reason, ('Trend', 1.0, 0.5, 0.0)),
+    Factor("RSI", ['rsi'], [DEP_BARS], 1, _rsi, _rsi_reason, ('RSI', 1.0, 0.5, 0.2)),
+    Factor("Vola", ['vola'], [DEP_BARS], 1, _vola, _vola_reason, ('Stabilität', None, 1.0, 0.2)),
+    Factor("Marge", ['margin'], [DEP_INFO], 1, _margin,
+           lambda s, v, w: f"💎 Marge: Stark ({v['margin']*100:.1f}%) [+{w['margin']}]" if s['margin'] else "💎 Marge: Normal (<15%)",
+           ('Marge', 1.0, 0.4, None), info_fields=['operatingMargins']),
+    Factor("Bilanz", ['cash'], [DEP_INFO], 1, _cash,
+           lambda s, v, w: f"🏦 Bilanz: Net-Cash vorhanden [+{w['cash']}]" if s['cash'] else "🏦 Bilanz: Net-Debt (Schulden > Cash)",
+           ('Bilanz', 1.0, 0.4, None), info_fields=['totalCash', 'totalDebt']),
+    Factor("Bewertung", ['value'], [DEP_INFO], 1, _value,
+           lambda s, v, w: f"🏷️ Bewertung: KGV attraktiv ({v['kgv']:.1f}) [+{w['value']}]" if s['value'] else "🏷️ Bewertung: Neutral/Teuer",
+           ('Value', 1.0, 0.4, None), info_fields=['forwardPE', 'trailingPE']),
+    Factor("PEG", ['peg'], [DEP_INFO], 1, _peg,
+           lambda s, v, w: f"⚖️ PEG: Wachstum/Preis optimal ({v['peg']}) [+{w['peg']}]" if s['peg'] else "⚖️ PEG: Neutral/Teuer",
+           ('Growth', 1.0, 0.5, None), info_fields=['pegRatio']),
+    Factor("Volumen", ['volume'], [DEP_BARS], 1, _volume,
+           lambda s, v, w: f"📶 Volumen: Hohes Interesse [+{w['volume']}]" if s['volume'] else "📶 Volumen: Normal",
+           ('Momentum', 1.0, 0.5, None)),
+    Factor("Sektor", ['sector'], [DEP_BARS], 1, _sector,
+           lambda s, v, w: f"🏅 Sektor: Top-Performer ({v['sector']}) [+{w['sector']}]" if s['sector'] else f"🏅 Sektor: Normal/Underperf. ({v['sector']})",
+           ('Rel. Stärke', 1.0, 0.4, None)),
+    Factor("MACD", ['macd'], [DEP_BARS], 1, _macd,
+           lambda s, v, w: f"🌊 MACD: Bullishes Momentum [+{w['macd']}]" if s['macd'] else "🌊 MACD: Neutral/Bearish",
+           ('MACD', 1.0, 0.4, None)),
+    Factor("News", ['news_pos', 'news_neg'], [DEP_NEWS], 2, _news, _news_reason),
+]
+
+
+class FactorPlan:
+    """Ergebnis des Planers: aktive Faktoren, benötigte Datenquellen, geschätzte Kosten."""
+
+    def __init__(self, factors, skipped):
+        self.factors = factors
+        self.skipped = skipped
+        self.deps = frozenset().union(*(f.deps for f in factors)) if factors else frozenset()
+        self.keys = frozenset(k for f in factors for k in f.keys)
+        self.info_fields = tuple(dict.fromkeys(x for f in factors for x in f.info_fields))
+
+    def needs(self, dep):
+        return dep in self.deps
+
+    @property
+    def cost(self):
+        return sum(FETCH_COST[d] for d in self.deps) + sum(f.cost for f in self.factors)
+
+    def fetch_order(self, w):
+        """
+        Netzwerk-Datenquellen in der Reihenfolge, in der sie am meisten Unsicherheit pro Kosten
+        klären (Score-Spanne der abhängigen Faktoren / FETCH_COST). Für gestaffeltes Laden im Scanner.
+        """
+        deps = [d for d in self.deps if d != DEP_BARS]
+        spread = {d: key_spread([k for f in self.factors if d in f.deps for k in f.keys], w) for d in deps}
+        return sorted(deps, key=lambda d: spread[d] / FETCH_COST[d], reverse=True)
+
+
+def plan_factors(w, factors=None):
+    """Nur Faktoren mit Gewicht != 0 – und nur die Datenquellen, die diese brauchen."""
+    factors = FACTORS if factors is None else factors
+    active = [f for f in factors if f.active(w)]
+    return FactorPlan(active, [f for f in factors if not f.active(w)])
+
+
+def compute_signals(info_dict, hist_df, news_list, ind=None, plan=None):
+    """
+    Roh-Signale eines Symbols, unabhängig von den Gewichten:
+    'states' = Multiplikator je Gewicht (FACTOR_KEYS), 'values' = Rohwerte für Texte/Details,
+    'computed' = berechnete Faktoren. Faktoren, deren Daten fehlen (info/news = None) oder die
+    nicht im `plan` stehen, werden übersprungen und zählen 0.
+    """
+    if len(hist_df) < MIN_BARS: return {'insufficient': True}
+    ctx = _Context(hist_df, info_dict, news_list, ind)
+    available = {DEP_BARS} | ({DEP_INFO} if info_dict is not None else set()) | ({DEP_NEWS} if news_list is not None else set())
+    wanted = FACTORS if plan is None else plan.factors
+    states = dict.fromkeys(FACTOR_KEYS, 0)
+    values = {'curr_p': ctx.curr_p}
+    computed = []
+    for f in wanted:
+        if not f.deps <= available: continue
+        f_states, f_values = f.compute(ctx)
+        states.update(f_states)
+        values.update(f_values)
+        computed.append(f.name)
+    return {'insufficient': False, 'states': states, 'values': values, 'computed': frozenset(computed)}
+
+
+def signals_cover(signals, plan):
+    """Reichen vorhandene Signale für einen (neuen) Plan? Sonst müssen Daten nachgeladen werden."""
+    if signals is None: return False
+    if 'error' in signals or signals.get('insufficient'): return True
+    return all(f.name in signals['computed'] for f in plan.factors)
+
+
+def signal_vector(signals):
+    return np.array([signals['states'][k] for k in FACTOR_KEYS], dtype=float)
+
+
+def score_signals(signals, w):
+    """Gewichtung der Roh-Signale -> (verdict, reasons, vola_ratio, s200, score, details, radar_scores)."""
+    if 'error' in signals: return "⚠️ Error", signals['error'], 0, 0, 50, {}, {}
+    if signals.get('insufficient'): return "➡️ Neutral", "Zu wenig Daten (unter 50 Tage).", 0, 0, 50, {}, {}
+    s, v, computed = signals['states'], signals['values'], signals['computed']
+    n_score = _news_score(s, v, w) if 'News' in computed else 0
+    score = BASE_SCORE + sum(s[k] * w[k] for k in FACTOR_KEYS if k not in NEWS_FACTORS) + n_score
+    score = min(100, max(0, score))
+
+    reasons, radar = [], {}
+    for f in FACTORS:
+        if f.name not in computed:
+            reasons.append(f"⏭️ {f.name}: nicht geladen (Gewicht 0)")
+            continue
+        reasons.append(f.reason(s, v, w))
+        if f.radar:
+            axis, up, mid, down = f.radar
+            state = s[f.keys[0]]
+            radar[axis] = up if state > 0 else down if state < 0 else mid
+    details = {k: v[k] for k in ('sma200', 'sma50', 'curr_p', 'rsi', 'atr_pct', 'margin', 'kgv') if k in v}
+    return verdict_for_score(score), "\n".join(reasons), v.get('atr_pct', 0), v.get('sma200', 0), score, details, radar
+
+
+def get_ki_verdict(symbol, info_dict, hist_df, news_list, w, ind=None):
+    """Signale + Scoring in einem Schritt (Peer-Vergleich, Einzelabfragen)."""
+    try:
+        return score_signals(compute_signals(info_dict, hist_df, news_list, ind), w)
+    except Exception as e:
+        return "⚠️ Error", str(e), 0, 0, 50, {}, {}
+
+
+# =========================================================
+# INDIKATOREN (letzter Bar, alle Symbole auf einmal)
+# =========================================================
+
+def _tail_mean(x, n):
+    """Mittel der letzten n Zeilen; NaN, wenn das Fenster nicht voll ist (wie rolling(n))."""
+    if x.shape[0] < n: return np.full(x.shape[1], np.nan)
+    return x[-n:].mean(axis=0)
+
+
+def _first_valid(x):
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=0)
+    out = x[first, np.arange(x.shape[1])]
+    out[~valid.any(axis=0)] = np.nan
+    return out
+
+
+EWM_PANDAS_MAX_COLS = 64   # wenige lange Spalten: pandas (C-Schleife über Bars) ist schneller
+
+
+def ewm_panel(x, span):
+    """
+    EWM (adjust=False) spaltenweise; startet je Spalte beim ersten gültigen Wert. NaN mitten in der Reihe
+    wie pandas (ignore_na=False): der letzte Wert bleibt stehen, sein Gewicht zerfällt aber pro Lücken-Bar weiter.
+    """
+    if x.shape[1] <= EWM_PANDAS_MAX_COLS:
+        return pd.DataFrame(x).ewm(span=span, adjust=False).mean().to_numpy()
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1], np.nan)
+    old_wt = np.ones(x.shape[1])
+    for t in range(x.shape[0]):
+        row = x[t]
+        obs, started = ~np.isnan(row), ~np.isnan(prev)
+        old_wt = np.where(started, old_wt * (1 - alpha), old_wt)
+        prev = np.where(started & obs, (old_wt * prev + alpha * row) / (old_wt + alpha), np.where(started, prev, row))
+        old_wt = np.where(obs, 1.0, old_wt)
+        out[t] = prev
+    return out
+
+
+def compute_panel_indicators(panel):
+    """Alle Indikatoren aus get_ki_verdict für den letzten Bar, als Arrays über alle Symbole."""
+    c, h, l, v = panel.close, panel.high, panel.low, panel.volume
+    curr_p = c[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # wie delta.where(delta > 0, 0): der erste Bar jedes Symbols und NaN-Bars zählen mit 0,
+        # nur das Padding vor dem ersten Bar (kürzere Historie) bleibt NaN
+        delta = np.vstack([np.full((1, c.shape[1]), np.nan), np.diff(c, axis=0)])
+        pad = np.where(np.cumsum(~np.isnan(c), axis=0) > 0, 0.0, np.nan)
+        gain = _tail_mean(np.where(delta > 0, delta, 0.0) + pad, 14)
+        loss = _tail_mean(np.where(delta < 0, -delta, 0.0) + pad, 14)
+        rsi = 100 - (100 / (1 + gain / loss))
+        atr = _tail_mean(h - l, 14)
+        macd_line = ewm_panel(c, 12) - ewm_panel(c, 26)
+        signal = ewm_panel(macd_line, 9)
+        vol_avg = np.nanmean(v[-20:], axis=0) if len(v) else np.full(c.shape[1], np.nan)
+        return {
+            'curr_p': curr_p,
+            'sma50': _tail_mean(c, 50),
+            'sma200': _tail_mean(c, 200),
+            'rsi': rsi,
+            'atr_pct': atr / curr_p * 100,
+            'macd': macd_line[-1] if len(c) else curr_p * np.nan,
+            'macd_signal': signal[-1] if len(c) else curr_p * np.nan,
+            'volume': v[-1] if len(v) else curr_p * np.nan,
+            'vol_avg20': vol_avg,
+            'perf': curr_p / _first_valid(c) - 1,
+            'n_bars': panel.n_bars(),
+        }
+
+
+def technical_states(ind):
+    """Indikatoren -> Faktor-Multiplikatoren (Symbole × TECH_FACTORS, bzw. Bars × Symbole × TECH_FACTORS)."""
+    p, s50, s200 = ind['curr_p'], ind['sma50'], ind['sma200']
+    with np.errstate(invalid='ignore'):
+        sma_ok = ~np.isnan(s50) & ~np.isnan(s200)
+        trend = np.where(sma_ok & (p > s50) & (s50 > s200), 1.0, np.where(sma_ok & (p < s200), -1.0, 0.0))
+        rsi = np.where(ind['rsi'] > RSI_OVERBOUGHT, -1.0, np.where(ind['rsi'] < RSI_OVERSOLD, 1.0, 0.0))
+        vola = np.where(ind['atr_pct'] > VOLA_MAX_PCT, -1.0, 0.0)
+        volume = np.where(ind['volume'] > ind['vol_avg20'] * VOLUME_SPIKE, 1.0, 0.0)
+        sector = np.where(ind['perf'] > SECTOR_OUTPERF, 1.0, 0.0)
+        macd = np.where(ind['macd'] > ind['macd_signal'], 1.0, 0.0)
+    return np.stack([trend, rsi, vola, volume, sector, macd], axis=-1)
+
+
+def _num(info, key, default=None):
+    val = info.get(key, default)
+    return default if val is None else val
+
+
+def fundamental_states(infos):
+    """Liste von info-Dicts -> Faktor-Multiplikatoren (Symbole × FUNDAMENTAL_FACTORS)."""
+    rows = []
+    for info in infos:
+        info = info or {}
+        margin = _num(info, 'operatingMargins', 0)
+        cash, debt = _num(info, 'totalCash', 0), _num(info, 'totalDebt', 0)
+        kgv = info.get('forwardPE', info.get('trailingPE'))
+        peg = info.get('pegRatio')
+        rows.append([
+            1.0 if margin > MARGIN_MIN else 0.0,
+            1.0 if cash > debt else 0.0,
+            1.0 if kgv and 0 < kgv < KGV_MAX else 0.0,
+            1.0 if peg and PEG_MIN < peg < PEG_MAX else 0.0,
+        ])
+    return np.array(rows, dtype=float).reshape(len(rows), len(FUNDAMENTAL_FACTORS))
+
+
+def news_states(news_lists):
+    """Liste von News-Listen -> Faktor-Multiplikatoren (Symbole × NEWS_FACTORS) wie im News-Plugin."""
+    rows = [news_hits(news)[:2] for news in news_lists]
+    return np.array([[pos, -neg] for pos, neg in rows], dtype=float).reshape(len(rows), len(NEWS_FACTORS))
+
+
+def score_bounds(factors, known, w):
+    """
+    (min, max) des Scores je Symbol, wenn nur die Faktoren in `known` (Keys) feststehen. Die übrigen
+    Spalten von `factors` werden ignoriert und über FACTOR_RANGES abgeschätzt.
+    """
+    wv = weight_vector(w)
+    fixed = np.array([k in known for k in FACTOR_KEYS])
+    lo = np.array([FACTOR_RANGES[k][0] for k in FACTOR_KEYS]) * wv
+    hi = np.array([FACTOR_RANGES[k][1] for k in FACTOR_KEYS]) * wv
+    base = BASE_SCORE + factors[:, fixed] @ wv[fixed]
+    free_lo = np.minimum(lo, hi)[~fixed].sum()
+    free_hi = np.maximum(lo, hi)[~fixed].sum()
+    return np.clip(base + free_lo, 0, 100), np.clip(base + free_hi, 0, 100)
+
+
+def factor_matrix(tech, fund=None, news=None):
+    """Teil-Matrizen zur vollen Faktor-Matrix (Symbole × FACTOR_KEYS) zusammensetzen."""
+    n = tech.shape[0]
+    out = np.zeros((n, len(FACTOR_KEYS)))
+    for block, keys in ((tech, TECH_FACTORS), (fund, FUNDAMENTAL_FACTORS), (news, NEWS_FACTORS)):
+        if block is None: continue
+        out[:, [FACTOR_KEYS.index(k) for k in keys]] = block
+    return out
+
+
+def score_matrix(factors, w):
+    """Scores für alle Symbole mit einer Matrix-Vektor-Multiplikation."""
+    return np.clip(BASE_SCORE + factors @ weight_vector(w), 0, 100)
+
+
+def panel_indicators(frames, symbols=None):
+    """Panel bauen und Indikatoren rechnen -> (Symbole, Indikator-Dict). Memoisierbar."""
+    panel = build_panel(frames, symbols)
+    return panel.symbols, compute_panel_indicators(panel)
+
+
+def score_panel(frames, infos, w, symbols=None, indicators=None):
+    """
+    Komplettes Scoring eines Universums: {Symbol: Historie}, {Symbol: info} -> DataFrame
+    mit Score, Verdict und allen Faktoren. Symbole mit < MIN_BARS Bars fallen heraus.
+    `indicators`: Ergebnis von panel_indicators (z.B. aus dem Indikator-Memo).
+    `infos=None`: Fundamentaldaten wurden nicht geladen (Plan ohne info), die Faktoren zählen 0.
+    """
+    panel_syms, ind = indicators if indicators is not None else panel_indicators(frames, symbols)
+    keep = ind['n_bars'] >= MIN_BARS
+    syms = [s for s, k in zip(panel_syms, keep) if k]
+    tech = technical_states({k: v[keep] for k, v in ind.items()})
+    fund = fundamental_states([infos.get(s, {}) for s in syms]) if infos is not None else None
+    factors = factor_matrix(tech, fund)
+    scores = score_matrix(factors, w)
+    out = pd.DataFrame(factors, index=syms, columns=FACTOR_KEYS)
+    out.insert(0, 'score', scores)
+    out.insert(1, 'verdict', [verdict_for_score(x) for x in scores])
+    out['curr_p'] = ind['curr_p'][keep]
+    return out
+
+
+# =========================================================
+# SCORE-ZEITREIHE (alle Bars, alle Symbole)
+# =========================================================
+# Score für jeden Tag der Historie, als wäre get_ki_verdict an diesem Tag mit den Daten bis
+# dahin gelaufen. Fundamentaldaten gibt es nur als aktuellen Stand (konstant über die Zeit),
+# News fehlen historisch und zählen 0.
+
+def _rolling_mean(x, n, min_periods=None):
+    """rolling(n).mean() spaltenweise über (Bars, Symbole) per Cumsum; NaN-Padding zählt nicht mit."""
+    min_periods = n if min_periods is None else min_periods
+    valid = ~np.isnan(x)
+    zero = np.zeros((1, x.shape[1]))
+    cs = np.vstack([zero, np.cumsum(np.where(valid, x, 0.0), axis=0)])
+    cnt = np.vstack([zero, np.cumsum(valid, axis=0)])
+    lo = np.maximum(np.arange(1, x.shape[0] + 1) - n, 0)
+    total, count = cs[1:] - cs[lo], cnt[1:] - cnt[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = total / count
+    out[count < min_periods] = np.nan
+    return out
+
+
+def compute_indicator_series(panel, perf_lookback=None):
+    """
+    Indikatoren für jeden Bar (Arrays Bars × Symbole). `perf_lookback=None`: Performance seit dem
+    ersten Bar (wie get_ki_verdict auf der abgeschnittenen Historie), sonst über N Bars.
+    """
+    c, h, l, v = panel.close, panel.high, panel.low, panel.volume
+    T, S = c.shape
+    valid = ~np.isnan(c)
+    first = np.argmax(valid, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.vstack([np.full((1, S), np.nan), np.diff(c, axis=0)])
+        pad = np.where(np.cumsum(valid, axis=0) > 0, 0.0, np.nan)   # wie in compute_panel_indicators
+        gain = _rolling_mean(np.where(delta > 0, delta, 0.0) + pad, 14)
+        loss = _rolling_mean(np.where(delta < 0, -delta, 0.0) + pad, 14)
+        macd_line = ewm_panel(c, 12) - ewm_panel(c, 26)
+        if perf_lookback is None:
+            ref = c[first, np.arange(S)][None, :]
+        else:
+            rows = np.maximum(np.arange(T)[:, None] - perf_lookback, first[None, :])
+            ref = c[rows, np.arange(S)[None, :]]
+        return {
+            'curr_p': c,
+            'sma50': _rolling_mean(c, 50),
+            'sma200': _rolling_mean(c, 200),
+            'rsi': 100 - (100 / (1 + gain / loss)),
+            'atr_pct': _rolling_mean(h - l, 14) / c * 100,
+            'macd': macd_line,
+            'macd_signal': ewm_panel(macd_line, 9),
+            'volume': v,
+            'vol_avg20': _rolling_mean(v, 20, min_periods=1),
+            'perf': c / ref - 1,
+            'n_bars': np.cumsum(valid, axis=0),
+        }
+
+
+def score_series_panel(panel, w, infos=None, perf_lookback=None):
+    """Scores (Bars × Symbole); NaN, solange ein Symbol weniger als MIN_BARS Bars hat."""
+    ind = compute_indicator_series(panel, perf_lookback)
+    tech = technical_states(ind)
+    w_tech = weight_vector(w, TECH_FACTORS)
+    scores = BASE_SCORE + tech @ w_tech
+    if infos is not None:
+        fund = fundamental_states([infos.get(s, {}) for s in panel.symbols]) if isinstance(infos, dict) else fundamental_states(infos)
+        scores = scores + (fund @ weight_vector(w, FUNDAMENTAL_FACTORS))[None, :]
+    scores = np.clip(scores, 0, 100)
+    scores[ind['n_bars'] < MIN_BARS] = np.nan
+    return scores
+
+
+def verdict_series(scores):
+    """Verdict-Labels für ein Score-Array (NaN -> None)."""
+    scores = np.asarray(scores, dtype=float)
+    conds = [scores >= t for t, _ in VERDICT_LEVELS] + [~np.isnan(scores)]
+    labels = [label for _, label in VERDICT_LEVELS] + [VERDICT_FLOOR]
+    return np.select(conds, labels, default=None)
+
+
+def score_series(hist_df, w, info=None, perf_lookback=None):
+    """Score/Verdict-Zeitreihe eines Symbols (für den Chart)."""
+    panel = build_panel({'_': hist_df})
+    scores = score_series_panel(panel, w, None if info is None else [info], perf_lookback)[:, 0]
+    return pd.DataFrame({'score': scores, 'verdict': verdict_series(scores)}, index=hist_df.index)
+
+
+# =========================================================
+# GEWICHTS-SENSITIVITÄT (alle Symbole, alle Gewichte)
+# =========================================================
+# Aus den gecachten Roh-Signalen (Faktor-Matrix) folgt jeder Score linear aus den Gewichten.
+# ±N Punkte auf jedem Gewicht sind daher ein einziger Broadcast (Gewichte × Deltas × Symbole),
+# ohne Daten neu zu laden oder get_ki_verdict erneut zu rechnen.
+
+def verdict_level(scores):
+    """0 = VERDICT_FLOOR, 1 = niedrigste Stufe aus VERDICT_LEVELS, ... (funktioniert auf Arrays)."""
+    thresholds = np.array([t for t, _ in VERDICT_LEVELS])
+    return (np.asarray(scores, dtype=float)[..., None] >= thresholds).sum(axis=-1)
+
+
+def _verdict_label(level):
+    return VERDICT_FLOOR if level == 0 else VERDICT_LEVELS[len(VERDICT_LEVELS) - level][1]
+
+
+def weight_sensitivity(factors, w, deltas, limits=None):
+    """
+    Scores (Gewichte × Deltas × Symbole) für jedes Gewicht aus FACTOR_KEYS um jeden Wert aus `deltas`
+    verschoben. `limits`: {Key: (min, max)} wie die Slider (Default: nur ≥ 0); Deltas jenseits der
+    Grenzen wirken nur bis zur Grenze.
+    """
+    wv, deltas = weight_vector(w), np.asarray(deltas, dtype=float)
+    lo = np.array([(limits or {}).get(k, (0, np.inf))[0] for k in FACTOR_KEYS], dtype=float)
+    hi = np.array([(limits or {}).get(k, (0, np.inf))[1] for k in FACTOR_KEYS], dtype=float)
+    eff = np.clip(wv[:, None] + deltas[None, :], lo[:, None], hi[:, None]) - wv[:, None]
+    base = BASE_SCORE + factors @ wv
+    return np.clip(base[None, None, :] + eff[:, :, None] * factors.T[:, None, :], 0, 100)
+
+
+def sensitivity_table(factors, w, symbols, deltas, limits=None):
+    """
+    Zusammenfassung pro (Gewicht, Delta): Ø Score-Änderung, Anzahl Verdict-Wechsel nach oben/unten
+    und die betroffenen Symbole ("SYM: alt → neu").
+    """
+    base = np.clip(BASE_SCORE + factors @ weight_vector(w), 0, 100)
+    scores = weight_sensitivity(factors, w, deltas, limits)
+    lvl_base, lvl = verdict_level(base), verdict_level(scores)
+    rows = []
+    for i, key in enumerate(FACTOR_KEYS):
+        for j, d in enumerate(deltas):
+            moved = np.nonzero(lvl[i, j] != lvl_base)[0]
+            rows.append({
+                'key': key, 'delta': int(d),
+                'mean_delta': float(np.mean(scores[i, j] - base)) if len(base) else 0.0,
+                'up': int(np.sum(lvl[i, j] > lvl_base)), 'down': int(np.sum(lvl[i, j] < lvl_base)),
+                'crossed': [f"{symbols[s]}: {_verdict_label(lvl_base[s])} → {_verdict_label(lvl[i, j, s])}" for s in moved],
+            })
+    return pd.DataFrame(rows)
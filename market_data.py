@@ -0,0 +1,387 @@
+"""
+Zentrale Datenschicht: alle Marktdaten laufen über einen MarketDataProvider.
+
+- YFinanceProvider: Live-Daten über yfinance.
+- ReplayProvider:   liefert aufgezeichnete Fixtures von Disk (mit einstellbarer Latenz),
+                    für deterministische Benchmarks ohne Netzwerk.
+- RecordingProvider: schreibt alle Antworten eines anderen Providers als Fixtures mit.
+- CoalescingProvider: fasst identische, gleichzeitige Requests prozessweit zusammen (SingleFlight).
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import random
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from caching import SingleFlight
+from fetch_pool import YAHOO_API_HOST
+from ohlcv_store import period_start
+
+BATCH_CHUNK_SIZE = 200
+
+
+class MarketDataProvider(ABC):
+    """
+    Schnittstelle für alle Datenquellen (abstrakt: Unterklassen müssen alle @abstractmethod implementieren).
+    `host` ist der Rate-Limit-Schlüssel für den FetchExecutor (None = kein Netzwerk, kein Limit).
+    """
+    name = "base"
+    host = None
+
+    @abstractmethod
+    def history(self, symbol, period=None, start=None):
+        """Tages-Bars (OHLCV). Entweder `period` (yfinance-Syntax) oder `start` (YYYY-MM-DD)."""
+        raise NotImplementedError
+
+    def history_batch(self, symbols, period=None, start=None):
+        """{Symbol: DataFrame} für viele Symbole. Default: Einzel-Calls, Provider können bündeln."""
+        frames = {}
+        for sym in symbols:
+            try:
+                df = self.history(sym, period=period, start=start)
+            except Exception:
+                continue
+            if df is not None and not df.empty: frames[sym] = df
+        return frames
+
+    @abstractmethod
+    def intraday(self, symbol, period="1d", interval="1m"):
+        raise NotImplementedError
+
+    @abstractmethod
+    def info(self, symbol):
+        raise NotImplementedError
+
+    @abstractmethod
+    def news(self, symbol):
+        raise NotImplementedError
+
+    @abstractmethod
+    def fx_rate(self, base, quote):
+        """Wie viele Einheiten `quote` kostet eine Einheit `base` (z.B. EUR->USD ~ 1.08)."""
+        raise NotImplementedError
+
+    def fx_rates(self, currencies, quote="USD"):
+        """{Währung: Kurs gegen `quote`} für viele Währungen. Fehlende Paare werden ausgelassen."""
+        rates = {}
+        for c in currencies:
+            try: rates[c] = self.fx_rate(c, quote)
+            except Exception: continue
+        return rates
+
+    @abstractmethod
+    def search(self, query):
+        """Bestes Symbol für einen Firmennamen oder None."""
+        raise NotImplementedError
+
+    def search_quote(self, query):
+        """Wie search, aber als {'symbol', 'name', 'exchange'} (Name leer, wenn die Quelle keinen liefert)."""
+        symbol = self.search(query)
+        return {'symbol': symbol, 'name': "", 'exchange': ""} if symbol else None
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+    host = YAHOO_API_HOST
+
+    def __init__(self, chunk_size=BATCH_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def history(self, symbol, period=None, start=None):
+        if start is not None: return yf.Ticker(symbol).history(start=start)
+        return yf.Ticker(symbol).history(period=period or "1y")
+
+    def history_batch(self, symbols, period=None, start=None):
+        """
+        Lädt die Historie für viele Symbole in wenigen gebündelten Requests.
+        Große Universen werden in Chunks geteilt, damit ein Fehler nicht alles abbricht.
+        """
+        kwargs = {"start": start} if start is not None else {"period": period or "1y"}
+        symbols = list(dict.fromkeys(symbols))
+        frames = {}
+        for i in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[i:i + self.chunk_size]
+            try:
+                raw = yf.download(chunk, group_by="ticker", auto_adjust=True, threads=True, progress=False, **kwargs)
+            except Exception:
+                continue
+            if raw is None or raw.empty: continue
+            for sym in chunk:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if sym not in raw.columns.get_level_values(0): continue
+                    df = raw[sym]
+                else:
+                    df = raw
+                df = df.dropna(how="all")
+                if not df.empty: frames[sym] = df
+        return frames
+
+    def intraday(self, symbol, period="1d", interval="1m"):
+        return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    def info(self, symbol):
+        return yf.Ticker(symbol).info or {}
+
+    def news(self, symbol):
+        return yf.Ticker(symbol).news or []
+
+    def fx_rate(self, base, quote):
+        if base == quote: return 1.0
+        hist = yf.Ticker(f"{base}{quote}=X").history(period="1d")
+        if hist.empty: raise ValueError(f"Kein Kurs für {base}/{quote}")
+        return float(hist['Close'].iloc[-1])
+
+    def fx_rates(self, currencies, quote="USD"):
+        # Alle Paare in einem yf.download-Batch statt einem Call pro Währung
+        pairs = {c: f"{c}{quote}=X" for c in currencies if c != quote}
+        frames = self.history_batch(list(pairs.values()), period="5d")
+        rates = {quote: 1.0} if quote in currencies else {}
+        for c, sym in pairs.items():
+            closes = frames[sym]['Close'].dropna() if sym in frames else []
+            if len(closes): rates[c] = float(closes.iloc[-1])
+        return rates
+
+    def search(self, query):
+        quote = self.search_quote(query)
+        return quote['symbol'] if quote else None
+
+    def search_quote(self, query):
+        quotes = yf.Search(query, max_results=1).quotes
+        if not quotes: return None
+        q = quotes[0]
+        return {'symbol': q['symbol'], 'name': q.get('longname') or q.get('shortname') or "", 'exchange': q.get('exchange', "")}
+
+
+def _fixture_name(symbol):
+    return symbol.replace("/", "_").replace("\\", "_")
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Spielt Fixtures ab. Layout unter `fixture_dir`:
+      <SYM>/history.parquet, <SYM>/intraday.parquet, <SYM>/info.json, <SYM>/news.json,
+      fx.json ({"EURUSD": 1.08, ...}), search.json ({"nvidia": "NVDA", ...})
+    `latency` (Sekunden) simuliert pro Call die Netzwerk-Wartezeit, `jitter` streut sie zufällig.
+    Fehlende Fixtures verhalten sich wie leere Antworten von Yahoo.
+    """
+    name = "replay"
+    host = None
+
+    def __init__(self, fixture_dir, latency=0.0, jitter=0.0, seed=0):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _wait(self):
+        if not self.latency and not self.jitter: return
+        with self._rng_lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        time.sleep(delay)
+
+    def _path(self, symbol, name):
+        return os.path.join(self.fixture_dir, _fixture_name(symbol), name)
+
+    def _read_json(self, path, default):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _read_frame(self, path):
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return pd.DataFrame()
+
+    def history(self, symbol, period=None, start=None):
+        self._wait()
+        df = self._read_frame(self._path(symbol, "history.parquet"))
+        if df.empty: return df
+        idx = pd.DatetimeIndex(df.index)
+        if start is not None:
+            cut = pd.Timestamp(start)
+        else:
+            # Perioden relativ zum letzten aufgezeichneten Bar, damit Replays reproduzierbar bleiben
+            ps = period_start(period or "1y", now=idx[-1].tz_localize(None).to_pydatetime())
+            if ps is None: return df
+            cut = pd.Timestamp(ps)
+        if idx.tz is not None: cut = cut.tz_localize(idx.tz)
+        return df[idx >= cut]
+
+    def intraday(self, symbol, period="1d", interval="1m"):
+        self._wait()
+        return self._read_frame(self._path(symbol, "intraday.parquet"))
+
+    def info(self, symbol):
+        self._wait()
+        return self._read_json(self._path(symbol, "info.json"), {})
+
+    def news(self, symbol):
+        self._wait()
+        return self._read_json(self._path(symbol, "news.json"), [])
+
+    def fx_rate(self, base, quote):
+        if base == quote: return 1.0
+        self._wait()
+        rates = self._read_json(os.path.join(self.fixture_dir, "fx.json"), {})
+        if f"{base}{quote}" in rates: return float(rates[f"{base}{quote}"])
+        if f"{quote}{base}" in rates: return 1 / float(rates[f"{quote}{base}"])
+        if f"{base}USD" in rates and f"{quote}USD" in rates:
+            return float(rates[f"{base}USD"]) / float(rates[f"{quote}USD"])
+        raise ValueError(f"Kein Fixture-Kurs für {base}/{quote}")
+
+    def search(self, query):
+        self._wait()
+        return self._read_json(os.path.join(self.fixture_dir, "search.json"), {}).get(query.strip().lower())
+
+
+class RecordingProvider(MarketDataProvider):
+    """Reicht alle Calls an `inner` durch und speichert die Antworten im ReplayProvider-Layout."""
+    name = "recording"
+
+    def __init__(self, inner, fixture_dir):
+        self.inner = inner
+        self.host = inner.host
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, name):
+        d = os.path.join(self.fixture_dir, _fixture_name(symbol))
+        os.makedirs(d, exist_ok=True)
+        return os.path.join(d, name)
+
+    def _write_json(self, path, data):
+        with open(path, "w") as f:
+            json.dump(data, f, default=str)
+
+    def _update_json(self, path, key, value):
+        with self._lock:
+            os.makedirs(self.fixture_dir, exist_ok=True)
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            data[key] = value
+            self._write_json(path, data)
+
+    def _record_history(self, symbol, df):
+        if df is None or df.empty: return
+        path = self._path(symbol, "history.parquet")
+        try:
+            old = pd.read_parquet(path)
+            df = pd.concat([old, df])
+            df = df[~df.index.duplicated(keep="last")].sort_index()
+        except Exception:
+            pass
+        df.to_parquet(path)
+
+    def history(self, symbol, period=None, start=None):
+        df = self.inner.history(symbol, period=period, start=start)
+        self._record_history(symbol, df)
+        return df
+
+    def history_batch(self, symbols, period=None, start=None):
+        frames = self.inner.history_batch(symbols, period=period, start=start)
+        for sym, df in frames.items(): self._record_history(sym, df)
+        return frames
+
+    def intraday(self, symbol, period="1d", interval="1m"):
+        df = self.inner.intraday(symbol, period=period, interval=interval)
+        if df is not None and not df.empty: df.to_parquet(self._path(symbol, "intraday.parquet"))
+        return df
+
+    def info(self, symbol):
+        data = self.inner.info(symbol)
+        self._write_json(self._path(symbol, "info.json"), data)
+        return data
+
+    def news(self, symbol):
+        data = self.inner.news(symbol)
+        self._write_json(self._path(symbol, "news.json"), data)
+        return data
+
+    def fx_rate(self, base, quote):
+        rate = self.inner.fx_rate(base, quote)
+        self._update_json(os.path.join(self.fixture_dir, "fx.json"), f"{base}{quote}", rate)
+        return rate
+
+    def search(self, query):
+        sym = self.inner.search(query)
+        if sym: self._update_json(os.path.join(self.fixture_dir, "search.json"), query.strip().lower(), sym)
+        return sym
+
+
+# Zeit-Bucket (Sekunden) pro Endpoint: so lange teilen sich Sessions ein Ergebnis
+COALESCE_BUCKETS = {
+    "history": 60, "history_batch": 60, "intraday": 15, "info": 60,
+    "news": 120, "fx_rate": 300, "search": 3600, "search_quote": 3600,
+}
+
+
+class CoalescingProvider(MarketDataProvider):
+    """
+    Legt einen SingleFlight-Layer über einen anderen Provider.
+    Zehn Sessions, die gleichzeitig NVDA öffnen, lösen pro Endpoint nur einen Call aus.
+    """
+    name = "coalescing"
+
+    def __init__(self, inner, flight=None, buckets=None):
+        self.inner = inner
+        self.host = inner.host
+        self.flight = flight or SingleFlight()
+        self.buckets = dict(COALESCE_BUCKETS, **(buckets or {}))
+
+    def _do(self, endpoint, key, fn, *args, **kwargs):
+        return self.flight.do((endpoint,) + key, self.buckets.get(endpoint, 0), fn, *args, **kwargs)
+
+    def history(self, symbol, period=None, start=None):
+        return self._do("history", (symbol, period, start), self.inner.history, symbol, period=period, start=start)
+
+    def history_batch(self, symbols, period=None, start=None):
+        return self._do("history_batch", (tuple(symbols), period, start),
+                        self.inner.history_batch, symbols, period=period, start=start)
+
+    def intraday(self, symbol, period="1d", interval="1m"):
+        return self._do("intraday", (symbol, period, interval), self.inner.intraday, symbol, period=period, interval=interval)
+
+    def info(self, symbol):
+        return self._do("info", (symbol,), self.inner.info, symbol)
+
+    def news(self, symbol):
+        return self._do("news", (symbol,), self.inner.news, symbol)
+
+    def fx_rate(self, base, quote):
+        return self._do("fx_rate", (base, quote), self.inner.fx_rate, base, quote)
+
+    def fx_rates(self, currencies, quote="USD"):
+        return self._do("fx_rate", (tuple(currencies), quote), self.inner.fx_rates, currencies, quote)
+
+    def search(self, query):
+        return self._do("search", (query.strip().lower(),), self.inner.search, query)
+
+    def search_quote(self, query):
+        return self._do("search_quote", (query.strip().lower(),), self.inner.search_quote, query)
+
+    def stats(self):
+        return self.flight.stats()
+
+
+def make_provider(name=None, fixture_dir=None, latency=None):
+    """
+    Provider aus Name bzw. Umgebungsvariablen:
+    MARKET_DATA_PROVIDER (yfinance | replay | record), REPLAY_FIXTURE_DIR, REPLAY_LATENCY.
+    """
+    name = name or os.environ.get("MARKET_DATA_PROVIDER", "yfinance")
+    fixture_dir = fixture_dir or os.environ.get("REPLAY_FIXTURE_DIR", "fixtures")
+    if latency is None: latency = float(os.environ.get("REPLAY_LATENCY", "0"))
+    if name == "replay": return ReplayProvider(fixture_dir, latency=latency)
+    if name == "record": return RecordingProvider(YFinanceProvider(), fixture_dir)
+    return YFinanceProvider()
@@ -0,0 +1,170 @@
+"""
+RSS-News über eine gemeinsame, gepoolte HTTP-Session.
+
+- Keep-Alive: eine Session mit Connection-Pool statt einer neuen TLS-Verbindung pro Call.
+- Conditional GET: ETag/Last-Modified werden pro URL gemerkt. Antwortet der Server mit 304,
+  verwenden wir die bereits geparsten Items weiter (kein Download, kein XML-Parsing).
+- Mehrere Quellen laufen parallel unter einer gemeinsamen Deadline (gather_news).
+"""
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from contextlib import nullcontext
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_pool import host_of
+
+YAHOO_RSS_URL = "https://finance.yahoo.com/rss/headline?s={ticker}"
+GOOGLE_NEWS_URL = "https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+
+
+class FeedError(Exception):
+    """Feed nicht erreichbar oder nicht lesbar (nur bei fetch_items(strict=True))."""
+
+
+class NewsItems(list):
+    """
+    Ergebnis von gather_news: Liste der Items plus `complete` – False, wenn eine Quelle fehlgeschlagen
+    ist oder die Deadline verpasst hat. Unvollständige Ergebnisse nicht cachen bzw. nicht als "keine News" werten.
+    """
+
+    def __init__(self, items=(), complete=True):
+        super().__init__(items)
+        self.complete = complete
+
+
+class RSSSource:
+    """Eine News-Quelle: Name + URL-Template mit {ticker}. Weitere Feeds einfach in die Liste hängen."""
+
+    def __init__(self, name, url_template, limit=5):
+        self.name = name
+        self.url_template = url_template
+        self.limit = limit
+
+    def url(self, ticker):
+        return self.url_template.format(ticker=ticker)
+
+
+DEFAULT_SOURCES = [
+    RSSSource("Yahoo", YAHOO_RSS_URL),
+    RSSSource("Google News", GOOGLE_NEWS_URL),
+]
+
+
+def parse_rss_items(content, limit=5):
+    root = ET.fromstring(content)
+    items = []
+    for item in root.findall('./channel/item')[:limit]:
+        title = item.findtext('title')
+        if title: items.append({'title': title, 'providerPublishTime': datetime.now().timestamp()})
+    return items
+
+
+class FeedClient:
+    """
+    Gepoolte Session + Validator-Cache für RSS-Feeds.
+    `throttle(host)` ist optional ein Context-Manager für das Rate-Limit (FetchExecutor.throttle).
+    """
+
+    def __init__(self, pool_size=16, throttle=None, max_feeds=1024, user_agent="Mozilla/5.0"):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+        self.throttle = throttle
+        self.max_feeds = max_feeds
+        self._lock = threading.Lock()
+        self._feeds = OrderedDict()   # url -> {'etag', 'last_modified', 'items'}
+        self._stats = {"requests": 0, "not_modified": 0, "parsed": 0, "errors": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def fetch_items(self, url, limit=5, timeout=3, strict=False):
+        """Items eines Feeds; bei 304 die zuletzt geparsten. Fehler -> leere Liste (strict: FeedError)."""
+        with self._lock:
+            cached = self._feeds.get(url)
+        headers = {}
+        if cached:
+            if cached.get('etag'): headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'): headers['If-Modified-Since'] = cached['last_modified']
+
+        self._count("requests")
+        try:
+            with self.throttle(host_of(url)) if self.throttle else nullcontext():
+                response = self.session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            self._count("errors")
+            if strict: raise FeedError(url) from e
+            return []
+
+        if response.status_code == 304 and cached:
+            self._count("not_modified")
+            with self._lock:
+                self._feeds.move_to_end(url)
+            return cached['items'][:limit]
+        if response.status_code != 200:
+            self._count("errors")
+            if strict: raise FeedError(f"{url}: HTTP {response.status_code}")
+            return []
+        try:
+            items = parse_rss_items(response.content, limit)
+        except ET.ParseError as e:
+            self._count("errors")
+            if strict: raise FeedError(url) from e
+            return []
+        self._count("parsed")
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._lock:
+                self._feeds[url] = {'etag': etag, 'last_modified': last_modified, 'items': items}
+                self._feeds.move_to_end(url)
+                while len(self._feeds) > self.max_feeds:
+                    self._feeds.popitem(last=False)
+        return items
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+def gather_news(feeds, ticker, sources=None, submit=None, deadline=2.5):
+    """
+    Fragt alle Quellen gleichzeitig ab und sammelt ein, was innerhalb von `deadline` Sekunden
+    ankommt. Langsame Quellen verlängern den kritischen Pfad also nicht mehr.
+    Ergebnis (NewsItems) in Quellen-Reihenfolge, doppelte Schlagzeilen werden entfernt;
+    `complete` ist False, wenn eine Quelle fehlgeschlagen oder nicht rechtzeitig angekommen ist.
+    """
+    sources = DEFAULT_SOURCES if sources is None else sources
+    pool = None
+    if submit is None:
+        pool = ThreadPoolExecutor(max_workers=max(1, len(sources)))
+        submit = pool.submit
+    futures = {submit(feeds.fetch_items, src.url(ticker), src.limit, deadline, True): i for i, src in enumerate(sources)}
+    arrived, failed = {}, False
+    try:
+        for fut in as_completed(futures, timeout=deadline):
+            try:
+                arrived[futures[fut]] = fut.result()
+            except Exception:
+                arrived[futures[fut]], failed = [], True
+    except FuturesTimeout:
+        pass  # Deadline erreicht: wir nehmen, was bis hierhin da ist
+    if pool is not None: pool.shutdown(wait=False)
+
+    news_items, seen = NewsItems(complete=not failed and len(arrived) == len(futures)), set()
+    for i in sorted(arrived):
+        for item in arrived[i]:
+            key = item['title'].strip().lower()
+            if key in seen: continue
+            seen.add(key)
+            news_items.append(item)
+    return news_items
@@ -0,0 +1,228 @@
+"""
+Lokaler OHLCV-Speicher (Parquet, eine Partition pro Symbol).
+
+Statt bei jedem Rerun ein volles Jahr zu laden, holen wir nur die Bars ab dem letzten
+gespeicherten Timestamp nach. Die letzten beiden Bars werden dabei immer neu geladen:
+der letzte ist während der Handelszeit noch unvollständig, der vorletzte dient als Anker. Weicht dessen Close ab,
+hat Yahoo die Historie rückwirkend adjustiert (Split/Dividende) und wir laden komplett neu.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.environ.get("OHLCV_STORE_DIR", ".ohlcv_store")
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Relative Abweichung am Anker-Bar, ab der die gespeicherte Historie als veraltet gilt
+ADJUSTMENT_TOLERANCE = 1e-3
+
+# Wochenenden/Feiertage: so viele Tage darf der erste Bar nach dem Periodenstart liegen
+COVERAGE_SLACK_DAYS = 7
+
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653,
+}
+
+
+def period_start(period, now=None):
+    """Ältestes Datum, das eine yfinance-Periode abdeckt (None = unbegrenzt, z.B. 'max')."""
+    now = now or datetime.now()
+    if period == "ytd": return datetime(now.year, 1, 1)
+    days = PERIOD_DAYS.get(period)
+    return None if days is None else now - timedelta(days=days)
+
+
+def normalize_daily(df):
+    """Einheitliches Format: tz-naive Tagesindex, nur OHLCV-Spalten, sortiert, ohne Duplikate."""
+    if df is None or df.empty: return pd.DataFrame(columns=OHLCV_COLUMNS)
+    out = df[[c for c in OHLCV_COLUMNS if c in df.columns]].copy()
+    idx = pd.DatetimeIndex(out.index)
+    if idx.tz is not None: idx = idx.tz_localize(None)
+    out.index = idx.normalize()
+    out.index.name = "Date"
+    out = out[~out.index.duplicated(keep="last")].sort_index()
+    return out.dropna(how="all")
+
+
+class OHLCVStore:
+    """
+    Partitionen liegen unter `<root>/<interval>/symbol=<SYM>/` mit `bars.parquet` und `meta.json`.
+    meta.json merkt sich, ab wann die Historie vollständig ist und wann zuletzt aktualisiert wurde.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, interval="1d"):
+        self.root = root
+        self.interval = interval
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _dir(self, symbol):
+        safe = symbol.replace("/", "_").replace("\\", "_")
+        return os.path.join(self.root, self.interval, f"symbol={safe}")
+
+    def _read_meta(self, symbol):
+        try:
+            with open(os.path.join(self._dir(symbol), "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, symbol):
+        try:
+            return pd.read_parquet(os.path.join(self._dir(symbol), "bars.parquet"))
+        except Exception:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def last_timestamp(self, symbol):
+        df = self.load(symbol)
+        return None if df.empty else df.index[-1]
+
+    def _write_meta(self, symbol, meta):
+        with open(os.path.join(self._dir(symbol), "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def write(self, symbol, df, covered_from=None):
+        """Schreibt die Partition atomar (tmp-Datei + os.replace), damit Leser nie halbe Dateien sehen."""
+        d = self._dir(symbol)
+        os.makedirs(d, exist_ok=True)
+        tmp = os.path.join(d, f"bars.parquet.{os.getpid()}.{threading.get_ident()}.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, os.path.join(d, "bars.parquet"))
+        meta = self._read_meta(symbol)
+        if covered_from is not None:
+            prev = meta.get("covered_from")
+            if "max" in (prev, covered_from): meta["covered_from"] = "max"
+            else: meta["covered_from"] = min(prev, covered_from) if prev else covered_from
+        meta["updated_at"] = time.time()
+        self._write_meta(symbol, meta)
+
+    def clear(self, symbol):
+        for name in ("bars.parquet", "meta.json"):
+            try: os.remove(os.path.join(self._dir(symbol), name))
+            except OSError: pass
+
+    def append(self, symbol, new_bars, covered_from=None):
+        """Hängt neue Bars an; überlappende Timestamps werden durch die neuen Werte ersetzt."""
+        new_bars = normalize_daily(new_bars)
+        old = self.load(symbol)
+        merged = new_bars if old.empty else pd.concat([old, new_bars])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.write(symbol, merged, covered_from)
+        return merged
+
+    def plan(self, symbol, period, max_age=0):
+        """
+        Was muss nachgeladen werden?
+        ('fresh', None) -> Disk reicht, ('tail', start) -> nur ab `start`, ('full', None) -> komplette Periode.
+        """
+        meta = self._read_meta(symbol)
+        stored = self.load(symbol)
+        if stored.empty: return "full", None
+        start = period_start(period)
+        covered_from = meta.get("covered_from")
+        if start is None:
+            if covered_from != "max": return "full", None
+        elif covered_from != "max":
+            if not covered_from or pd.Timestamp(covered_from) > pd.Timestamp(start) + timedelta(days=COVERAGE_SLACK_DAYS):
+                return "full", None
+        if max_age and time.time() - meta.get("updated_at", 0) < max_age: return "fresh", None
+        return "tail", stored.index[max(0, len(stored) - 2)]
+
+    def _merge_tail(self, symbol, new_bars):
+        """
+        Tail an die Partition anhängen. Gibt None zurück, wenn der Anker-Bar nicht mehr passt
+        (rückwirkende Adjustierung) – dann muss der Aufrufer komplett neu laden.
+        Ein leerer Tail kommt hier nicht an: er enthält mindestens den Anker-Bar, leer heißt
+        also Fetch fehlgeschlagen (Aufrufer liefert _stale, updated_at bleibt unverändert).
+        """
+        old = self.load(symbol)
+        new_bars = normalize_daily(new_bars)
+        if len(old) >= 2:
+            anchor = old.index[-2]
+            if anchor in new_bars.index:
+                ref = float(old.at[anchor, "Close"])
+                if ref and abs(float(new_bars.at[anchor, "Close"]) / ref - 1) > ADJUSTMENT_TOLERANCE:
+                    self.clear(symbol)
+                    return None
+        return self.append(symbol, new_bars)
+
+    def _slice(self, df, period):
+        start = period_start(period)
+        return df if start is None else df[df.index >= pd.Timestamp(start).normalize()]
+
+    def _coverage_tag(self, period):
+        start = period_start(period)
+        return "max" if start is None else pd.Timestamp(start).strftime("%Y-%m-%d")
+
+    def _stale(self, symbol, period):
+        """Gespeicherte Bars, wenn der Tail-Fetch fehlschlägt; df.attrs['stale'] markiert den veralteten Stand."""
+        df = self._slice(self.load(symbol), period)
+        df.attrs['stale'] = True
+        return df
+
+    def get_history(self, symbol, period, fetch_fn, max_age=0):
+        """
+        Historie für `period` aus dem Store, fehlende Bars per `fetch_fn(period=...)` bzw.
+        `fetch_fn(start=...)` (Signatur wie yf.Ticker.history) nachgeladen.
+        Schlägt nur der Tail-Fetch fehl, kommt der Stand von Disk zurück (attrs['stale'] = True).
+        """
+        with self._lock(symbol):
+            mode, since = self.plan(symbol, period, max_age)
+            if mode == "fresh":
+                return self._slice(self.load(symbol), period)
+            if mode == "tail":
+                try:
+                    tail = fetch_fn(start=since.strftime("%Y-%m-%d"))
+                except Exception:
+                    return self._stale(symbol, period)
+                if tail is None or tail.empty: return self._stale(symbol, period)
+                merged = self._merge_tail(symbol, tail)
+                if merged is not None: return self._slice(merged, period)
+            full = fetch_fn(period=period)
+            if full is None or full.empty: return normalize_daily(full)
+            return self._slice(self.append(symbol, full, self._coverage_tag(period)), period)
+
+    def get_history_batch(self, symbols, period, fetch_batch_fn, max_age=0):
+        """
+        Wie get_history, aber für viele Symbole: `fetch_batch_fn(symbols, period=... | start=...)`
+        liefert {Symbol: DataFrame}. Symbole ohne Historie werden gemeinsam voll geladen,
+        alle anderen pro Startdatum gemeinsam nachgeladen – ein einzelner lange nicht
+        aktualisierter Titel zieht so nicht den Tail aller anderen mit zurück.
+        """
+        full, tails, out = [], {}, {}
+        for sym in symbols:
+            mode, since = self.plan(sym, period, max_age)
+            if mode == "full": full.append(sym)
+            elif mode == "tail": tails.setdefault(since.strftime("%Y-%m-%d"), []).append(sym)
+            else: out[sym] = self._slice(self.load(sym), period)
+
+        for start, group in sorted(tails.items()):
+            try:
+                fetched = fetch_batch_fn(group, start=start) or {}
+            except Exception:
+                fetched = {}
+            for sym in group:
+                bars = fetched.get(sym)
+                if bars is None or bars.empty:
+                    out[sym] = self._stale(sym, period)
+                    continue
+                with self._lock(sym):
+                    merged = self._merge_tail(sym, bars)
+                if merged is None: full.append(sym)
+                else: out[sym] = self._slice(merged, period)
+        if full:
+            fetched = fetch_batch_fn(full, period=period)
+            tag = self._coverage_tag(period)
+            for sym, df in fetched.items():
+                with self._lock(sym):
+                    out[sym] = self._slice(self.append(sym, df, tag), period)
+        return {s: df for s, df in out.items() if not df.empty}
@@ -0,0 +1,173 @@
+"""
+Gewichts-Optimierer: welche Gewichtung hätte historisch die besten "🚀 BUY"-Signale geliefert?
+
+1. Für jeden Bar jedes Symbols die Faktor-Multiplikatoren (wie in score_series_panel) und die
+   Vorwärts-Rendite über `horizon` Bars. Die Multiplikatoren sind diskret (-1/0/+1), d.h. es gibt
+   nur wenige hundert verschiedene Zustände: wir verdichten auf (Zustand, Anzahl, Σ Rendite, Σ Treffer).
+2. Kandidaten: alle Gewichte im Raster `step` innerhalb der Slider-Grenzen, die das Budget einhalten
+   (bei zu vielen Kombinationen eine Zufallsauswahl aus dem Raster).
+3. Bewertung per Matrixprodukt Zustände × Kandidaten: Signal = 50 + Zustand @ Gewichte ≥ Schwelle,
+   daraus Anzahl, Ø Rendite und Trefferquote je Kandidat. Große Raster laufen in Chunks im Prozess-Pool.
+Die letzten `holdout` der Bars werden nicht zum Auswählen benutzt, sondern nur zum Gegenprüfen; zwischen
+Fit-Zeitraum und Holdout liegen `horizon` Bars Abstand, damit keine Vorwärts-Rendite in den Holdout reicht.
+Ohne `infos` zählen nur die Technik-Faktoren: Fundamental- und News-Punkte sind im historischen Score 0.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from backtest import forward_returns
+from ki_engine import (BASE_SCORE, MIN_BARS, PERF_LOOKBACK, TECH_FACTORS, FUNDAMENTAL_FACTORS, build_panel,
+                       compute_indicator_series, technical_states, fundamental_states)
+
+OPT_OBJECTIVES = {'ret': "Ø Rendite", 'hit': "Trefferquote"}
+OPT_MIN_SIGNALS = 30        # weniger Signal-Tage: Kandidat zählt nicht (Zufallstreffer)
+OPT_MAX_CANDIDATES = 25000
+OPT_HOLDOUT = 0.25
+OPT_CHUNK = 4096            # Kandidaten pro Pool-Aufgabe
+# Zustände × Kandidaten, ab denen sich der Prozess-Pool lohnt: seriell ~3-4 ns pro Zelle, das volle Raster der
+# Technik-Faktoren (144 Zustände × ~21.000 Kandidaten ≈ 3 Mio.) braucht ~10 ms, ein Chunk (~200 KB) hin und
+# zurück ~1 ms. Darunter ist der Pool nur Overhead.
+POOL_MIN_CELLS = 2_000_000
+
+
+class SignalStates:
+    """Verdichtete historische Signale: eindeutige Faktor-Zustände mit Anzahl, Σ Rendite, Σ Treffer."""
+
+    def __init__(self, keys, states, count, sum_ret, sum_hit):
+        self.keys = keys
+        self.states = states
+        self.count = count
+        self.sum_ret = sum_ret
+        self.sum_hit = sum_hit
+
+    @classmethod
+    def from_rows(cls, keys, X, y):
+        if not len(X): return cls(keys, np.zeros((0, len(keys))), *(np.zeros(0) for _ in range(3)))
+        states, inv = np.unique(X, axis=0, return_inverse=True)
+        inv = inv.ravel()
+        return cls(keys, states, np.bincount(inv).astype(float),
+                   np.bincount(inv, weights=y), np.bincount(inv, weights=(y > 0).astype(float)))
+
+    def __len__(self):
+        return int(self.count.sum())
+
+
+def signal_states(panel, horizon, infos=None, holdout=OPT_HOLDOUT):
+    """
+    Panel -> (Zustände Fit-Zeitraum, Zustände Holdout). Mit `infos` auch die Fundamental-Faktoren.
+    Performance-Faktor über PERF_LOOKBACK wie im Backtest und in der Einzel-Analyse.
+    """
+    ind = compute_indicator_series(panel, PERF_LOOKBACK)
+    F, keys = technical_states(ind), list(TECH_FACTORS)
+    if infos is not None:
+        fund = fundamental_states(infos)
+        F = np.concatenate([F, np.broadcast_to(fund[None], (F.shape[0],) + fund.shape)], axis=-1)
+        keys += FUNDAMENTAL_FACTORS
+    fwd = forward_returns(panel.close, horizon)
+    valid = (ind['n_bars'] >= MIN_BARS) & ~np.isnan(fwd)
+    split = int(len(fwd) * (1 - holdout))
+    fit, test = valid.copy(), valid.copy()
+    # die Rendite eines Fit-Bars läuft `horizon` Bars weit: die letzten vor dem Split überlappen den Holdout
+    fit[max(0, split - horizon):], test[:split] = False, False
+    return SignalStates.from_rows(keys, F[fit], fwd[fit]), SignalStates.from_rows(keys, F[test], fwd[test])
+
+
+def weight_grid(bounds, budget, step=5, max_candidates=OPT_MAX_CANDIDATES, seed=0):
+    """
+    Kandidaten (N × Keys) im Raster `step`, Summe ≤ budget. Passt das volle Raster nicht in
+    max_candidates, wird gleichverteilt daraus gezogen.
+    """
+    axes = [np.arange(lo, hi + 1, step) for lo, hi in bounds.values()]
+    size = int(np.prod([len(a) for a in axes], dtype=float))
+    if size <= max_candidates:
+        grid = np.array(list(product(*axes)), dtype=float).reshape(-1, len(axes))
+    else:
+        rng = np.random.default_rng(seed)
+        grid = np.column_stack([a[rng.integers(0, len(a), 4 * max_candidates)] for a in axes]).astype(float)
+        grid = np.unique(grid, axis=0)
+    grid = grid[grid.sum(axis=1) <= budget]
+    return grid[:max_candidates]
+
+
+def evaluate_weights(states, W, threshold):
+    """Matrixprodukt Zustände × Kandidaten -> (Signal-Tage, Σ Rendite, Σ Treffer) je Kandidat."""
+    buy = (BASE_SCORE + states.states @ W.T >= threshold).astype(float)
+    return states.count @ buy, states.sum_ret @ buy, states.sum_hit @ buy
+
+
+def _evaluate_chunk(args):
+    states, W, threshold = args
+    return evaluate_weights(states, W, threshold)
+
+
+def make_process_pool(workers=None):
+    """
+    Prozess-Pool für große Raster. spawn statt fork: der Aufrufer (Streamlit) hat laufende Threads.
+    Mit nur einem Prozess None – der Pool würde nur Daten kopieren, gerechnet wird dann im Aufrufer.
+    """
+    workers = workers or min(4, os.cpu_count() or 1)
+    if workers < 2: return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+
+def _evaluate_all(states, W, threshold, pool):
+    if pool is None or len(states.states) * len(W) < POOL_MIN_CELLS:
+        return evaluate_weights(states, W, threshold)
+    chunks = [(states, W[i:i + OPT_CHUNK], threshold) for i in range(0, len(W), OPT_CHUNK)]
+    parts = list(pool.map(_evaluate_chunk, chunks))
+    return tuple(np.concatenate(p) for p in zip(*parts))
+
+
+def _summarize(n, s_ret, s_hit, min_signals):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret, hit = s_ret / n, s_hit / n
+    ret[n < min_signals], hit[n < min_signals] = np.nan, np.nan
+    return ret, hit
+
+
+def optimize_weights(panel, base_w, bounds, budget, horizon=20, objective='ret', threshold=60, infos=None,
+                     step=5, max_candidates=OPT_MAX_CANDIDATES, min_signals=OPT_MIN_SIGNALS,
+                     holdout=OPT_HOLDOUT, pool=None):
+    """
+    Gewichte für die Keys in `bounds` ({Key: (min, max)}) so wählen, dass die Signale (Score ≥ threshold)
+    im Fit-Zeitraum die beste Ø Rendite ('ret') bzw. Trefferquote ('hit') über `horizon` Bars hatten.
+    Rückgabe: DataFrame aller gültigen Kandidaten, bestes zuerst, mit Zeile "aktuell" (= base_w) vorne.
+    Spalten: Gewichte, signals/ret/hit (Fit-Zeitraum), signals_test/ret_test/hit_test (Holdout).
+    `pool`: Executor (make_process_pool) für große Raster, None = alles im aufrufenden Prozess.
+    Ohne `infos` bewertet der Backtest nur die Technik-Faktoren (Score = 50 + Technik-Punkte).
+    """
+    fit, test = signal_states(panel, horizon, infos, holdout)
+    keys = [k for k in fit.keys if k in bounds]
+    bounds = {k: bounds[k] for k in keys}
+    # nicht optimierte Faktoren (z.B. Fundamentaldaten ohne infos) zählen historisch 0
+    cols = [fit.keys.index(k) for k in keys]
+    fit.states, test.states = fit.states[:, cols], test.states[:, cols]
+    current = np.array([[base_w.get(k, 0) for k in keys]], dtype=float)
+    W = np.vstack([current, weight_grid(bounds, budget, step, max_candidates)])
+
+    n, s_ret, s_hit = _evaluate_all(fit, W, threshold, pool)
+    ret, hit = _summarize(n, s_ret, s_hit, min_signals)
+    n_t, t_ret, t_hit = _evaluate_all(test, W, threshold, pool)
+    ret_t, hit_t = _summarize(n_t, t_ret, t_hit, 1)
+
+    out = pd.DataFrame(W.astype(int), columns=keys)
+    out['signals'], out['ret'], out['hit'] = n.astype(int), ret, hit
+    out['signals_test'], out['ret_test'], out['hit_test'] = n_t.astype(int), ret_t, hit_t
+    out.index = ['aktuell'] + list(range(1, len(W)))
+    # Kandidaten mit identischen Signalen: nur den mit den wenigsten Punkten behalten
+    best = out.iloc[1:].assign(_points=W[1:].sum(axis=1)).dropna(subset=[objective])
+    best = best.sort_values([objective, 'signals', '_points'], ascending=[False, False, True])
+    best = best.drop_duplicates(subset=['signals', 'ret', 'hit']).drop(columns='_points')
+    return pd.concat([out.iloc[:1], best])
+
+
+def optimize(frames, base_w, bounds, budget, symbols=None, infos=None, **kwargs):
+    """{Symbol: OHLCV-DataFrame} -> optimize_weights."""
+    panel = build_panel(frames, symbols)
+    if isinstance(infos, dict): infos = [infos.get(s, {}) for s in panel.symbols]
+    return optimize_weights(panel, base_w, bounds, budget, infos=infos, **kwargs)
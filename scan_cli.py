@@ -0,0 +1,152 @@
+"""
+Headless-Scanner: derselbe Scan wie im Scanner-Tab, ohne Streamlit (z.B. alle paar Minuten per Cron).
+
+    python scan_cli.py universe.txt -o scan.parquet [-o scan.csv] [--weights gewichte.json | -w trend=20 -w rsi=5]
+                       [--workers 8] [--cutoff 90] [--all] [--period 6mo] [--cache PFAD | --no-cache] [--no-reuse]
+
+Universum: ein Symbol pro Zeile (# = Kommentar) oder CSV mit Spalte "symbol".
+Gewichte: JSON-Datei ({"trend": 20, ...}) und/oder einzelne `-w key=wert`, Rest = ki_engine.DEFAULT_WEIGHTS.
+Ausgabe-Format nach Endung (.parquet, .json, .csv); ohne --all nur Treffer. Score ohne News (wie im Scanner-Tab).
+Datenquelle wie in der App: MARKET_DATA_PROVIDER, OHLCV_STORE_DIR, SCAN_CACHE_PATH.
+Exit-Code: 0 = ok, 1 = für kein Symbol Kurse, 2 = ungültige Argumente/Gewichtung.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from fetch_pool import FetchExecutor, result_or
+from ki_engine import DEFAULT_WEIGHTS, FACTOR_KEYS, MAX_BUDGET, verdict_for_score, weight_budget
+from market_data import make_provider
+from ohlcv_store import DEFAULT_STORE_DIR, OHLCVStore
+from scanner import (BELOW, DEFAULT_SCAN_CACHE_PATH, HIT, LOAD_FAILED, NO_DATA, SCAN_BARS_MAX_AGE, SCAN_CUTOFF,
+                     ScanCache, scan)
+from symbol_index import SymbolIndex
+
+OUTPUT_FORMATS = ('.parquet', '.json', '.csv')
+
+
+def read_universe(path):
+    """Symbole aus Textdatei (eins pro Zeile) oder CSV mit Spalte "symbol", Reihenfolge bleibt, ohne Duplikate."""
+    with open(path, newline="", encoding="utf-8") as f:
+        text = f.read()
+    lines = [l.split('#', 1)[0].strip() for l in text.splitlines()]
+    header = [c.strip().lower() for c in lines[0].split(',')] if lines else []
+    if 'symbol' in header:
+        col = header.index('symbol')
+        symbols = [row[col] for row in csv.reader(lines[1:]) if len(row) > col]
+    else:
+        symbols = lines
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+def parse_weights(path=None, overrides=()):
+    """DEFAULT_WEIGHTS, überschrieben aus JSON-Datei und `key=wert`-Paaren. ValueError bei unbekannten Keys."""
+    w = dict(DEFAULT_WEIGHTS)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            w.update(json.load(f))
+    for pair in overrides:
+        key, sep, value = pair.partition('=')
+        if not sep: raise ValueError(f"Gewicht '{pair}' nicht im Format key=wert")
+        w[key.strip()] = float(value)
+    unknown = set(w) - set(FACTOR_KEYS)
+    if unknown: raise ValueError(f"Unbekannte Faktoren: {', '.join(sorted(unknown))}")
+    return w
+
+
+def result_rows(items, index):
+    """ScanItems -> DataFrame (bester Score zuerst). Bei 'pruned' ist `score` der höchste noch erreichbare."""
+    rows = []
+    for item in items:
+        currency = item.info.get('currency') if item.info else None
+        if not currency:
+            rid = index.by_symbol.get(item.symbol)
+            currency = (index.records[rid]['currency'] if rid is not None else None) or "USD"
+        row = {'symbol': item.symbol, 'status': item.status, 'score': item.score,
+               'verdict': verdict_for_score(item.score) if item.status in (HIT, BELOW) else None,
+               'price': item.price, 'currency': currency,
+               'last_bar': pd.Timestamp(item.last_bar) if item.last_bar is not None else pd.NaT,
+               'changed': item.changed, 'fetched': ",".join(item.fetched), 'reused': ",".join(item.reused)}
+        factors = item.factors if item.factors is not None else [None] * len(FACTOR_KEYS)
+        row.update(zip(FACTOR_KEYS, factors))
+        rows.append(row)
+    df = pd.DataFrame(rows, columns=['symbol', 'status', 'score', 'verdict', 'price', 'currency', 'last_bar',
+                                     'changed', 'fetched', 'reused'] + FACTOR_KEYS)
+    return df.sort_values('score', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def write_results(df, path):
+    """Atomar schreiben (tmp-Datei + os.replace), Format nach Endung."""
+    ext = os.path.splitext(path)[1].lower()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if ext == '.parquet':
+        df.to_parquet(tmp, index=False)
+    elif ext == '.json':
+        df.to_json(tmp, orient='records', date_format='iso', force_ascii=False, indent=1)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless-Scanner (ohne Streamlit)")
+    parser.add_argument('universe', help="Symbol-Liste (eins pro Zeile) oder CSV mit Spalte 'symbol'")
+    parser.add_argument('-o', '--out', action='append', default=[], help="Ausgabe (.parquet/.json/.csv), mehrfach möglich")
+    parser.add_argument('--weights', help="JSON-Datei mit Gewichten {Faktor: Punkte}")
+    parser.add_argument('-w', dest='weight', action='append', default=[], metavar='KEY=WERT', help="einzelnes Gewicht")
+    parser.add_argument('--workers', type=int, default=8, help="gleichzeitige Netzwerk-Requests (Fetch-Pool)")
+    parser.add_argument('--cutoff', type=float, default=SCAN_CUTOFF)
+    parser.add_argument('--period', default="6mo")
+    parser.add_argument('--all', action='store_true', help="alle Symbole ausgeben, nicht nur Treffer")
+    parser.add_argument('--cache', default=DEFAULT_SCAN_CACHE_PATH, help="ScanCache (JSON) für Re-Scans")
+    parser.add_argument('--no-cache', action='store_true', help="ohne ScanCache")
+    parser.add_argument('--no-reuse', action='store_true', help="alles neu laden, ScanCache aber aktualisieren")
+    args = parser.parse_args(argv)
+
+    bad = [p for p in args.out if os.path.splitext(p)[1].lower() not in OUTPUT_FORMATS]
+    if bad: parser.error(f"Unbekanntes Ausgabe-Format: {', '.join(bad)} (erlaubt: {', '.join(OUTPUT_FORMATS)})")
+    if args.workers < 1: parser.error("--workers muss ≥ 1 sein")
+    try:
+        w = parse_weights(args.weights, args.weight)
+        symbols = read_universe(args.universe)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if weight_budget(w) > MAX_BUDGET: parser.error(f"Budget überschritten: {weight_budget(w):g} / {MAX_BUDGET}")
+
+    provider = make_provider()
+    store = OHLCVStore(DEFAULT_STORE_DIR)
+    fetcher = FetchExecutor(max_workers=args.workers)
+    items = scan(
+        symbols, w, cutoff=args.cutoff,
+        load_bars=lambda syms: store.get_history_batch(syms, args.period, provider.history_batch, max_age=SCAN_BARS_MAX_AGE),
+        fetch_info=lambda s: result_or(fetcher.submit(provider.host, provider.info, s), None),
+        workers=args.workers * 4,   # Scan-Threads warten nur, das Limit setzt der Fetch-Pool
+        cache=None if args.no_cache else ScanCache(args.cache), reuse=not args.no_reuse)
+
+    t0 = time.time()
+    try:
+        done = list(items)
+    finally:
+        fetcher.shutdown(wait=False)
+    counts = {}
+    for item in done: counts[item.status] = counts.get(item.status, 0) + 1
+
+    df = result_rows(done, SymbolIndex.from_csv())
+    if not args.all: df = df[df['status'] == HIT]
+    for path in args.out: write_results(df, path)
+
+    print(f"{len(symbols)} Symbole in {time.time() - t0:.1f}s · " +
+          " · ".join(f"{k}: {v}" for k, v in sorted(counts.items())) +
+          f" · info neu geladen für {sum(bool(i.fetched) for i in done)}")
+    if not args.out and len(df):
+        print(df[['symbol', 'status', 'score', 'verdict', 'price', 'currency']].to_string(index=False))
+    return 1 if symbols and counts.get(NO_DATA, 0) + counts.get(LOAD_FAILED, 0) == len(symbols) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Scan-Jobs im Hintergrund: ein Scan läuft in einem eigenen Thread statt im Streamlit-Skript, übersteht also
+Reruns und Browser-Reloads. Fertige Symbole landen regelmäßig als Checkpoint (JSON) auf Disk; nach einem
+Abbruch oder Neustart des Prozesses geht es dort weiter.
+
+- Job-ID = Hash aus Symbolliste, Gewichten und Cutoff: derselbe Scan findet seinen Checkpoint wieder.
+- Symbole, deren Kurs-Batch fehlschlug oder denen info fehlt (z.B. Yahoo-Throttle), kommen in eine
+  Retry-Queue und werden mit exponentiellem Backoff erneut gescannt; nach JOB_MAX_ATTEMPTS Versuchen bleibt der
+  letzte Status stehen. Zu kurze oder fehlende Historie (NO_DATA) ist sofort fertig.
+- progress()/records() sind thread-sicher, jede Session (auch nach einem Reload) liest denselben Job.
+Keine Abhängigkeit zu Streamlit: Datenquellen kommen als scan-Argumente (load_bars, fetch_info, ...) vom Manager.
+"""
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+
+from scanner import FAILED, HIT, LOAD_FAILED, NO_DATA, SCAN_CUTOFF, scan
+
+DEFAULT_JOB_DIR = os.environ.get("SCAN_JOB_DIR", ".scan_jobs")
+JOB_CHECKPOINT_SECONDS = 2.0   # höchstens so viel Arbeit geht bei einem harten Abbruch verloren
+JOB_MAX_ATTEMPTS = 4
+JOB_RETRY_BASE = 30            # Sekunden bis zum ersten Retry, danach jeweils doppelt so lang
+JOB_RETRY_MAX = 600
+JOB_KEEP = 20                  # so viele Checkpoints bleiben liegen (älteste fertige Jobs werden gelöscht)
+RETRY_STATUSES = (LOAD_FAILED, FAILED)
+
+# Zustand eines Jobs
+RUNNING, WAITING, DONE, CANCELLED, ERROR, INTERRUPTED = 'running', 'waiting', 'done', 'cancelled', 'error', 'interrupted'
+ACTIVE = (RUNNING, WAITING)
+
+
+def job_id(symbols, w, cutoff):
+    key = json.dumps([list(symbols), sorted(w.items()), cutoff], default=float)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def retry_delay(attempt):
+    """Backoff vor Versuch `attempt + 1` (Sekunden)."""
+    return min(JOB_RETRY_MAX, JOB_RETRY_BASE * 2 ** (attempt - 1))
+
+
+def item_record(item, attempts=1):
+    """ScanItem -> JSON-fähiger Eintrag für den Checkpoint."""
+    return {'symbol': item.symbol, 'status': item.status, 'score': item.score, 'price': item.price,
+            'currency': item.info.get('currency') if item.info else None,
+            'factors': [float(x) for x in item.factors] if item.factors is not None else None,
+            'last_bar': str(item.last_bar) if item.last_bar is not None else None,
+            'fetched': list(item.fetched), 'changed': bool(item.changed), 'attempts': attempts}
+
+
+class ScanJob:
+    """
+    Ein Scan über `symbols` mit Checkpoint-Datei `path`. `results`: fertige Symbole, `retry`: Symbole in der
+    Retry-Queue ({Symbol: {attempts, next_at, status}}). Läuft über start(); cancel() hält nach dem nächsten Symbol an.
+    """
+
+    def __init__(self, path, symbols, w, cutoff=SCAN_CUTOFF, reuse=True):
+        self.path = path
+        self.id = job_id(symbols, w, cutoff)
+        self.symbols = list(dict.fromkeys(symbols))
+        self.w = dict(w)
+        self.cutoff = cutoff
+        self.reuse = reuse
+        self.status = RUNNING
+        self.error = None
+        self.results = {}
+        self.retry = {}
+        self.created_at = self.updated_at = time.time()
+        self.first_hit = None    # Sekunden bis zum ersten Treffer (erster Lauf)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._run_started = self._run_done = None
+        self._last_checkpoint = 0.0
+
+    # --- Checkpoint ---
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        job = cls(path, data['symbols'], data['w'], data['cutoff'], data.get('reuse', True))
+        job.status = data['status']
+        job.error = data.get('error')
+        job.results = data['results']
+        job.retry = data['retry']
+        job.created_at, job.updated_at = data['created_at'], data['updated_at']
+        job.first_hit = data.get('first_hit')
+        # Lief beim Speichern noch, hat aber keinen Thread mehr: der Prozess wurde beendet
+        if job.status in ACTIVE: job.status = INTERRUPTED
+        return job
+
+    def checkpoint(self):
+        """Atomar schreiben (tmp-Datei + os.replace)."""
+        with self._lock:
+            self.updated_at = time.time()
+            data = json.dumps({'id': self.id, 'symbols': self.symbols, 'w': self.w, 'cutoff': self.cutoff,
+                               'reuse': self.reuse, 'status': self.status, 'error': self.error,
+                               'results': self.results, 'retry': self.retry, 'first_hit': self.first_hit,
+                               'created_at': self.created_at, 'updated_at': self.updated_at})
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self._last_checkpoint = time.time()
+
+    # --- Ablauf ---
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, scan_kwargs):
+        """Im Hintergrund-Thread (weiter)laufen lassen; fertige Symbole aus dem Checkpoint werden übersprungen."""
+        if self.running: return self
+        self._stop.clear()
+        with self._lock:
+            self.status, self.error = RUNNING, None
+        self._thread = threading.Thread(target=self._run, args=(scan_kwargs,), name=f"scan-job-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None: self._thread.join(timeout)
+
+    def _todo(self, now):
+        with self._lock:
+            return [s for s in self.symbols if s not in self.results and
+                    (s not in self.retry or self.retry[s]['next_at'] <= now)]
+
+    def _record(self, item):
+        now = time.time()
+        with self._lock:
+            attempts = self.retry.get(item.symbol, {}).get('attempts', 0) + 1
+            if item.status in RETRY_STATUSES and attempts < JOB_MAX_ATTEMPTS:
+                self.retry[item.symbol] = {'attempts': attempts, 'next_at': now + retry_delay(attempts), 'status': item.status}
+                return
+            self.retry.pop(item.symbol, None)
+            self.results[item.symbol] = item_record(item, attempts)
+            self._run_done += 1
+            if item.hit and self.first_hit is None: self.first_hit = now - self.created_at
+        if now - self._last_checkpoint > JOB_CHECKPOINT_SECONDS: self.checkpoint()
+
+    def _run(self, scan_kwargs):
+        self._run_started, self._run_done = time.time(), 0
+        try:
+            while not self._stop.is_set():
+                todo = self._todo(time.time())
+                if todo:
+                    with self._lock: self.status = RUNNING
+                    items = scan(todo, self.w, cutoff=self.cutoff, reuse=self.reuse, **scan_kwargs)
+                    n = 0
+                    try:
+                        for n, item in enumerate(items, 1):
+                            self._record(item)
+                            if self._stop.is_set(): break
+                    finally:
+                        items.close()
+                    self.checkpoint()
+                    if n: continue
+                with self._lock:
+                    if not self.retry: break
+                    self.status = WAITING
+                    wake = min(r['next_at'] for r in self.retry.values())
+                self.checkpoint()
+                self._stop.wait(max(0.0, wake - time.time()))
+            with self._lock: self.status = CANCELLED if self._stop.is_set() else DONE
+        except Exception as e:
+            with self._lock: self.status, self.error = ERROR, f"{type(e).__name__}: {e}"
+        finally:
+            self.checkpoint()
+
+    # --- Abfragen (thread-sicher) ---
+    def records(self):
+        with self._lock:
+            return list(self.results.values())
+
+    def progress(self):
+        """Stand für die Anzeige: fertig/gesamt, Status-Zähler, Retry-Queue, Restzeit-Schätzung."""
+        now = time.time()
+        with self._lock:
+            counts = {}
+            for rec in self.results.values(): counts[rec['status']] = counts.get(rec['status'], 0) + 1
+            done, total = len(self.results), len(self.symbols)
+            eta = None
+            if self.status == RUNNING and self._run_done:
+                rate = self._run_done / max(now - self._run_started, 1e-9)
+                eta = (total - done) / rate
+            return {'status': self.status, 'done': done, 'total': total, 'counts': counts,
+                    'hits': counts.get(HIT, 0), 'retry': len(self.retry),
+                    'next_retry': max(0.0, min(r['next_at'] for r in self.retry.values()) - now) if self.retry else None,
+                    'elapsed': self.updated_at - self.created_at if self.status not in ACTIVE else now - self.created_at,
+                    'eta': eta, 'first_hit': self.first_hit, 'error': self.error,
+                    'fetched': sum(bool(r['fetched']) for r in self.results.values()),
+                    'changed': sum(r['changed'] and r['status'] not in (NO_DATA, LOAD_FAILED) for r in self.results.values())}
+
+
+class ScanJobManager:
+    """
+    Alle Scan-Jobs eines Prozesses (in der App per cache_resource geteilt). `scan_kwargs` gehen an scanner.scan
+    (load_bars, fetch_info, indicators, cache). Beim Start werden unterbrochene Jobs aus
+    `job_dir` fortgesetzt (resume=True).
+    """
+
+    def __init__(self, job_dir=DEFAULT_JOB_DIR, resume=True, **scan_kwargs):
+        self.job_dir = job_dir
+        self.scan_kwargs = scan_kwargs
+        self._lock = threading.Lock()
+        self.jobs = {}
+        os.makedirs(job_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(job_dir, "*.json")):
+            try:
+                job = ScanJob.load(path)
+            except (OSError, ValueError, KeyError):
+                continue
+            self.jobs[job.id] = job
+            if resume and job.status == INTERRUPTED: job.start(self.scan_kwargs)
+
+    def get(self, jid):
+        with self._lock:
+            return self.jobs.get(jid)
+
+    def latest(self):
+        """Zuletzt gestarteter Job (für Sessions ohne eigenen Job, z.B. nach einem Reload)."""
+        with self._lock:
+            return max(self.jobs.values(), key=lambda j: j.created_at, default=None)
+
+    def start(self, symbols, w, cutoff=SCAN_CUTOFF, reuse=True):
+        """
+        Scan starten. Läuft derselbe Scan schon, wird er zurückgegeben; ist er abgebrochen/unterbrochen,
+        geht es am Checkpoint weiter. Ein fertiger Scan beginnt neu. `reuse` gilt auch für die Fortsetzung
+        (bei einem laufenden Scan ab der nächsten Runde).
+        """
+        jid = job_id(symbols, w, cutoff)
+        with self._lock:
+            job = self.jobs.get(jid)
+            if job is None or job.status == DONE:
+                job = ScanJob(os.path.join(self.job_dir, f"{jid}.json"), symbols, w, cutoff, reuse)
+                self.jobs[jid] = job
+            else:
+                with job._lock: job.reuse = reuse
+            self._prune()
+        job.start(self.scan_kwargs)
+        return job
+
+    def _prune(self):
+        done = sorted((j for j in self.jobs.values() if not j.running and j.status not in ACTIVE),
+                      key=lambda j: j.created_at)
+        for job in done[:max(0, len(self.jobs) - JOB_KEEP)]:
+            del self.jobs[job.id]
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
@@ -0,0 +1,265 @@
+"""
+Scanner als Generator: liefert jedes Symbol, sobald sein Ergebnis feststeht (in Fertigstellungs-Reihenfolge).
+
+Ablauf pro Symbol:
+1. Kurse in Chunks (nacheinander, yf.download ist nicht thread-sicher), pro Chunk ein vektorisiertes
+   Panel-Scoring der Technik-Faktoren.
+2. Höchster noch erreichbarer Score (ki_engine.score_bounds). Liegt er unter dem Cutoff: fertig ("pruned").
+3. Sonst info laden (Netzwerk) und neu prüfen.
+News gehen – wie im ursprünglichen Scanner – nicht in den Scan ein: sie zählen 0, der Scan-Score ist der Score
+ohne News (die Einzel-Analyse rechnet sie dazu). Mit News im Score könnte kein Symbol vorgefiltert werden
+(bis zu NEWS_MAX_ITEMS Treffer × Gewicht), jeder Scan kostete dann zwei RSS-Abrufe pro Symbol.
+Alle Symbole laufen dabei gleichzeitig; der Aufrufer kann Treffer sofort anzeigen und jederzeit abbrechen.
+Mit einem ScanCache wird info aus dem letzten Lauf wiederverwendet, solange sie nicht abgelaufen ist –
+ein Re-Scan lädt dann nur, was sich geändert hat bzw. abgelaufen ist.
+Keine Abhängigkeit zu Streamlit: Daten kommen über Funktionen (load_bars, fetch_info).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from ki_engine import (BASE_SCORE, DEP_INFO, FACTORS, FACTOR_KEYS, FUNDAMENTAL_FACTORS, MIN_BARS,
+                       fundamental_states, plan_factors, score_bounds, score_panel, weight_vector)
+
+SCAN_CUTOFF = 90
+SCAN_CHUNK = 50       # Symbole pro Kurs-Batch: erster Treffer nach ~einem Batch-Request
+SCAN_WORKERS = 32     # Threads, die auf info warten (Rate-Limits regelt der Fetch-Pool)
+# Kurse für den Scan dürfen so alt sein (wie der TTL des Batch-Caches), sonst wird der Tail nachgeladen
+SCAN_BARS_MAX_AGE = 900
+
+# Status eines fertigen Symbols. NO_DATA: keine oder zu kurze Historie (endgültig), LOAD_FAILED: der Kurs-Batch
+# schlug fehl, FAILED: info konnte nicht geladen werden
+HIT, BELOW, PRUNED, NO_DATA, LOAD_FAILED, FAILED = 'hit', 'below', 'pruned', 'no_data', 'load_failed', 'failed'
+
+DEP_FACTORS = {DEP_INFO: FUNDAMENTAL_FACTORS}
+
+DEFAULT_SCAN_CACHE_PATH = os.environ.get("SCAN_CACHE_PATH", ".scan_cache.json")
+# So lange gilt info aus dem letzten Scan (Sekunden)
+SCAN_TTL = {DEP_INFO: 24 * 3600}
+# Nur diese info-Felder gehen in den Score ein (plus Währung für die Anzeige)
+INFO_HASH_FIELDS = sorted({f for fac in FACTORS for f in fac.info_fields} | {'currency'})
+
+
+def info_hash(info):
+    """Fingerabdruck der score-relevanten info-Felder."""
+    snap = json.dumps({f: info.get(f) for f in INFO_HASH_FIELDS}, sort_keys=True, default=str)
+    return hashlib.sha1(snap.encode()).hexdigest()[:16]
+
+
+class ScanCache:
+    """
+    Letzter Scan pro Symbol als JSON: letzter Bar (Timestamp + Close), Score/Status und je Datenquelle
+    die Faktor-Zustände mit Abrufzeit (bei info zusätzlich Hash und Währung). Prozessweit teilbar.
+    """
+
+    def __init__(self, path=DEFAULT_SCAN_CACHE_PATH, ttl=None):
+        self.path = path
+        self.ttl = dict(SCAN_TTL, **(ttl or {}))
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.records = json.load(f)
+        except (OSError, ValueError):
+            self.records = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def dep(self, symbol, dep, now=None):
+        """Gespeicherte Quelle eines Symbols, wenn noch nicht abgelaufen (sonst None)."""
+        with self._lock:
+            entry = self.records.get(symbol, {}).get('deps', {}).get(dep)
+        if entry is None or (now or time.time()) - entry['fetched_at'] > self.ttl[dep]: return None
+        return entry
+
+    def same_bars(self, symbol, last_bar, close):
+        with self._lock:
+            rec = self.records.get(symbol)
+        return rec is not None and rec.get('last_bar') == str(last_bar) and rec.get('close') == close
+
+    def put_dep(self, symbol, dep, states, info=None):
+        """Neu geladene Quelle ablegen. True, wenn sie sich gegenüber dem letzten Stand geändert hat (Hash)."""
+        entry = {'states': [float(x) for x in states], 'fetched_at': time.time(),
+                 'hash': info_hash(info) if info is not None else json.dumps([float(x) for x in states])}
+        if info is not None: entry['currency'] = info.get('currency')
+        with self._lock:
+            deps = self.records.setdefault(symbol, {}).setdefault('deps', {})
+            changed = deps.get(dep, {}).get('hash') != entry.get('hash')
+            deps[dep] = entry
+        return changed
+
+    def put_result(self, item):
+        with self._lock:
+            rec = self.records.setdefault(item.symbol, {})
+            rec.update(status=item.status, score=item.score, price=item.price, scanned_at=time.time())
+            if item.last_bar is not None: rec.update(last_bar=str(item.last_bar), close=item.price)
+
+    def save(self):
+        """Atomar schreiben (tmp-Datei + os.replace)."""
+        with self._lock:
+            data = json.dumps(self.records)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+class ScanItem:
+    """
+    Ergebnis eines Symbols. `score` ist der endgültige Score (HIT/BELOW) bzw. bei PRUNED der höchste
+    noch erreichbare. `factors`: Multiplikatoren in FACTOR_KEYS-Reihenfolge (nicht geladene Quellen = 0).
+    `fetched`/`reused`: Quellen, die neu geladen bzw. aus dem ScanCache genommen wurden.
+    `changed`: neuer letzter Bar oder eine neu geladene Quelle weicht vom letzten Scan ab.
+    """
+
+    def __init__(self, symbol, status, score=None, price=None, factors=None, info=None, last_bar=None,
+                 fetched=(), reused=(), changed=True):
+        self.symbol = symbol
+        self.status = status
+        self.score = score
+        self.price = price
+        self.factors = factors
+        self.info = info
+        self.last_bar = last_bar
+        self.fetched = tuple(fetched)
+        self.reused = tuple(reused)
+        self.changed = changed
+
+    @property
+    def hit(self):
+        return self.status == HIT
+
+    def __repr__(self):
+        return f"ScanItem({self.symbol!r}, {self.status!r}, score={self.score})"
+
+
+class _Pending:
+    """Zwischenstand eines Symbols in Stufe 2."""
+
+    def __init__(self, symbol, factors, known, todo, price, last_bar, changed):
+        self.symbol = symbol
+        self.factors = factors
+        self.known = known
+        self.todo = todo
+        self.price = price
+        self.last_bar = last_bar
+        self.changed = changed
+        self.info = None
+        self.fetched, self.reused = [], []
+
+    def set_dep(self, dep, states):
+        self.factors[[FACTOR_KEYS.index(k) for k in DEP_FACTORS[dep]]] = states
+        self.known |= set(DEP_FACTORS[dep])
+
+    def item(self, status, score=None):
+        return ScanItem(self.symbol, status, score, self.price, self.factors, self.info, self.last_bar,
+                        self.fetched, self.reused, self.changed)
+
+
+def scan(symbols, w, load_bars, fetch_info=None, cutoff=SCAN_CUTOFF, plan=None,
+         chunk=SCAN_CHUNK, workers=SCAN_WORKERS, indicators=None, cache=None, reuse=True):
+    """
+    Generator über ScanItems, sobald sie fertig sind.
+    - `load_bars(symbols)` -> {Symbol: OHLCV-DataFrame}
+    - `fetch_info(symbol)` -> info-Dict oder None (Fehler)
+    - `indicators(frames, symbols)` -> Ergebnis von panel_indicators (z.B. über das Indikator-Memo)
+    - `cache`: ScanCache; mit `reuse=False` wird alles neu geladen, der Cache aber aktualisiert
+    Fehlt fetch_info, zählen die Fundamental-Faktoren 0; News zählen im Scan immer 0.
+    """
+    plan = plan_factors(w) if plan is None else plan
+    fetchers = {DEP_INFO: fetch_info}
+    order = [d for d in plan.fetch_order(w) if fetchers.get(d) is not None]
+    known0 = set(FACTOR_KEYS) - {k for d in order for k in DEP_FACTORS[d]}
+    wv = weight_vector(w)
+    symbols = list(dict.fromkeys(symbols))
+    chunks = [symbols[i:i + chunk] for i in range(0, len(symbols), chunk)]
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = {}
+
+    def load_next_chunk():
+        if chunks:
+            part = chunks.pop(0)
+            pending[pool.submit(load_bars, part)] = (None, part)
+
+    def finish(item):
+        if cache is not None: cache.put_result(item)
+        return item
+
+    def advance(p):
+        """Nächste Quelle anstoßen oder fertiges ScanItem zurückgeben."""
+        # alles geladen: endgültiger Score, auch unter dem Cutoff (BELOW, nicht "vorgefiltert")
+        if not p.todo:
+            score = float(np.clip(BASE_SCORE + p.factors @ wv, 0, 100))
+            return finish(p.item(HIT if score >= cutoff else BELOW, score))
+        hi = float(score_bounds(p.factors[None, :], p.known, w)[1][0])
+        if hi < cutoff: return finish(p.item(PRUNED, hi))
+        dep = p.todo.pop(0)
+        pending[pool.submit(fetchers[dep], p.symbol)] = (dep, p)
+        return None
+
+    def start(s, row, frame, price):
+        last_bar = frame.index[-1]
+        new_bars = cache is None or not cache.same_bars(s, last_bar, price)
+        p = _Pending(s, row.copy(), set(known0), list(order), price, last_bar, changed=new_bars)
+        # Noch gültige Quellen aus dem letzten Scan: kosten nichts, also vor allem anderen einsetzen
+        for dep in list(p.todo) if cache is not None and reuse else ():
+            entry = cache.dep(s, dep)
+            if entry is None: continue
+            p.set_dep(dep, entry['states'])
+            p.todo.remove(dep)
+            p.reused.append(dep)
+            if dep == DEP_INFO: p.info = {'currency': entry.get('currency')}
+        return advance(p)
+
+    load_next_chunk()
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dep, arg = pending.pop(fut)
+                if dep is None:
+                    # Kurs-Chunk fertig: gleich den nächsten laden, dann Technik für den ganzen Chunk
+                    load_next_chunk()
+                    try:
+                        frames = fut.result() or {}
+                    except Exception:
+                        for s in arg: yield ScanItem(s, LOAD_FAILED)
+                        continue
+                    # gleiches Kriterium wie score_panel (n_bars = gültige Closes >= MIN_BARS)
+                    ok = [s for s in arg if s in frames and frames[s]['Close'].count() >= MIN_BARS]
+                    for s in arg:
+                        if s not in ok: yield ScanItem(s, NO_DATA)
+                    if not ok: continue
+                    scored = score_panel(frames, None, w, symbols=ok,
+                                         indicators=indicators(frames, ok) if indicators else None)
+                    for s in ok:
+                        if s not in scored.index: yield ScanItem(s, NO_DATA)
+                    for s, row in zip(scored.index, scored[FACTOR_KEYS].to_numpy(dtype=float)):
+                        item = start(s, row, frames[s], float(scored.at[s, 'curr_p']))
+                        if item is not None: yield item
+                    continue
+                p = arg
+                try:
+                    result = fut.result()
+                except Exception:
+                    result = None
+                p.fetched.append(dep)
+                if result is None:
+                    yield p.item(FAILED)
+                    continue
+                p.info = result
+                states = fundamental_states([result])[0]
+                if cache is not None and cache.put_dep(p.symbol, dep, states, info=result): p.changed = True
+                p.set_dep(dep, states)
+                item = advance(p)
+                if item is not None: yield item
+    finally:
+        # Abbruch (z.B. neuer Rerun): offene Requests verwerfen, Erreichtes trotzdem sichern
+        pool.shutdown(wait=False, cancel_futures=True)
+        if cache is not None: cache.save()
@@ -0,0 +1,297 @@
+"""
+Inkrementelle Indikatoren mit O(1)-Update pro Bar.
+
+Statt bei jedem Rerun rolling(200), ewm(26) und den RSI über ein Jahr neu zu rechnen, hält jedes
+Objekt nur seinen laufenden Zustand (Fenster-Summe, letzter EMA-Wert, ...).
+- `update(x)`: neuer Bar
+- `revise(x)`: der letzte Bar hat sich geändert (laufender Tages-/Minutenbar), ebenfalls O(1)
+Die Werte entsprechen den pandas-Formeln in get_ki_verdict (rolling-Mittel, ewm adjust=False),
+auch bei NaN-Bars mitten in der Historie.
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+
+NAN = float("nan")
+
+
+class RollingMean:
+    """
+    Gleitendes Mittel; NaN bis `min_periods` gültige Werte im Fenster sind (Default: volles Fenster wie
+    rolling(n)). NaN-Werte belegen wie in pandas einen Platz im Fenster, zählen aber nicht mit.
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.buf = deque(maxlen=window)
+        self.total = 0.0
+        self.nans = 0
+        self._since_resum = 0
+
+    def _add(self, x, sign):
+        if math.isnan(x): self.nans += sign
+        else: self.total += sign * x
+
+    def update(self, x):
+        if len(self.buf) == self.window: self._add(self.buf[0], -1)
+        self.buf.append(x)
+        self._add(x, 1)
+        # Rundungsfehler der laufenden Summe regelmäßig verwerfen (amortisiert O(1))
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self.total = math.fsum(v for v in self.buf if not math.isnan(v))
+            self._since_resum = 0
+        return self.value
+
+    def revise(self, x):
+        if not self.buf: return self.update(x)
+        self._add(self.buf[-1], -1)
+        self._add(x, 1)
+        self.buf[-1] = x
+        return self.value
+
+    @property
+    def value(self):
+        n = len(self.buf) - self.nans
+        return self.total / n if n and n >= self.min_periods else NAN
+
+
+class EMA:
+    """
+    ewm(span, adjust=False).mean(): startet beim ersten gültigen Wert. NaN wie pandas (ignore_na=False):
+    der Wert bleibt stehen, sein Gewicht zerfällt pro Lücken-Bar weiter.
+    """
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN
+        self._wt = 1.0               # Gewicht des bisherigen Werts (wie old_wt in pandas)
+        self._prev = (NAN, 1.0)      # Zustand vor dem letzten Bar (Basis für revise)
+
+    def _step(self, prev, wt, x):
+        if math.isnan(prev): return x, 1.0
+        wt *= 1 - self.alpha
+        if math.isnan(x): return prev, wt
+        return (wt * prev + self.alpha * x) / (wt + self.alpha), 1.0
+
+    def update(self, x):
+        self._prev = (self.value, self._wt)
+        self.value, self._wt = self._step(*self._prev, x)
+        return self.value
+
+    def revise(self, x):
+        self.value, self._wt = self._step(*self._prev, x)
+        return self.value
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast, self.slow, self.signal_ema = EMA(fast), EMA(slow), EMA(signal)
+        self.macd = self.signal = NAN
+
+    def update(self, close):
+        self.macd = self.fast.update(close) - self.slow.update(close)
+        self.signal = self.signal_ema.update(self.macd)
+        return self.macd, self.signal
+
+    def revise(self, close):
+        self.macd = self.fast.revise(close) - self.slow.revise(close)
+        self.signal = self.signal_ema.revise(self.macd)
+        return self.macd, self.signal
+
+
+class RSI:
+    """
+    RSI über `period` Bars. Standard wie in der App: einfaches Mittel der Gewinne/Verluste
+    (der erste Bar zählt mit 0). `wilder=True`: klassische Wilder-Glättung (alpha = 1/period).
+    """
+
+    def __init__(self, period=14, wilder=False):
+        self.period = period
+        self.wilder = wilder
+        if wilder:
+            self.seed_gain, self.seed_loss = RollingMean(period), RollingMean(period)
+            self.avg_gain = self.avg_loss = NAN
+            self._prev_avg = (NAN, NAN)
+        else:
+            self.gain, self.loss = RollingMean(period), RollingMean(period)
+        self.n = 0
+        self._last_close = NAN   # Close des vorletzten Bars (Basis für revise)
+        self._close = NAN
+
+    @staticmethod
+    def _split(delta):
+        if math.isnan(delta): return 0.0, 0.0
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    def _wilder_step(self, g, l, revise):
+        if self.n <= self.period + 1:
+            # Startwert: einfaches Mittel der ersten `period` Änderungen
+            if self.n > 1:
+                for mean, x in ((self.seed_gain, g), (self.seed_loss, l)):
+                    mean.revise(x) if revise else mean.update(x)
+            return (self.seed_gain.value, self.seed_loss.value) if self.n == self.period + 1 else (NAN, NAN)
+        a = 1.0 / self.period
+        pg, pl = self._prev_avg
+        return pg + a * (g - pg), pl + a * (l - pl)
+
+    def update(self, close):
+        self._last_close, self._close = self._close, close
+        self.n += 1
+        g, l = self._split(close - self._last_close)
+        if self.wilder:
+            self._prev_avg = (self.avg_gain, self.avg_loss)
+            self.avg_gain, self.avg_loss = self._wilder_step(g, l, revise=False)
+        else:
+            self.gain.update(g); self.loss.update(l)
+        return self.value
+
+    def revise(self, close):
+        if self.n == 0: return self.update(close)
+        self._close = close
+        g, l = self._split(close - self._last_close)
+        if self.wilder:
+            self.avg_gain, self.avg_loss = self._wilder_step(g, l, revise=True)
+        else:
+            self.gain.revise(g); self.loss.revise(l)
+        return self.value
+
+    @property
+    def value(self):
+        gain, loss = (self.avg_gain, self.avg_loss) if self.wilder else (self.gain.value, self.loss.value)
+        if math.isnan(gain) or math.isnan(loss): return NAN
+        if loss == 0: return NAN if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+
+class ATR:
+    """Mittlere Spanne über `period` Bars. Standard High-Low wie in der App, optional True Range."""
+
+    def __init__(self, period=14, true_range=False):
+        self.mean = RollingMean(period)
+        self.true_range = true_range
+        self._prev_close = NAN   # Close vor dem letzten Bar
+        self._close = NAN
+
+    def _range(self, high, low):
+        if not self.true_range or math.isnan(self._prev_close): return high - low
+        return max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+    def update(self, high, low, close):
+        self._prev_close, self._close = self._close, close
+        return self.mean.update(self._range(high, low))
+
+    def revise(self, high, low, close):
+        self._close = close
+        return self.mean.revise(self._range(high, low))
+
+    @property
+    def value(self):
+        return self.mean.value
+
+
+class TechnicalState:
+    """
+    Alle laufenden Indikatoren von get_ki_verdict für ein Symbol/Intervall.
+    `sync(df)` schiebt nur Bars nach, die seit dem letzten Aufruf dazugekommen sind.
+    """
+
+    def __init__(self):
+        self.sma50, self.sma200 = RollingMean(50), RollingMean(200)
+        self.rsi = RSI(14)
+        self.atr = ATR(14)
+        self.macd = MACD(12, 26, 9)
+        self.vol20 = RollingMean(20, min_periods=1)
+        self.n = 0
+        self.last_ts = None
+        self.last_bar = None
+        self.prev_ts = None
+        self.prev_close = None
+
+    def update(self, ts, high, low, close, volume):
+        self.sma50.update(close); self.sma200.update(close)
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        self.macd.update(close)
+        self.vol20.update(volume)
+        self.n += 1
+        if self.last_bar is not None: self.prev_ts, self.prev_close = self.last_ts, self.last_bar[2]
+        self.last_ts, self.last_bar = ts, (high, low, close, volume)
+
+    def revise(self, high, low, close, volume):
+        self.sma50.revise(close); self.sma200.revise(close)
+        self.rsi.revise(close)
+        self.atr.revise(high, low, close)
+        self.macd.revise(close)
+        self.vol20.revise(volume)
+        self.last_bar = (high, low, close, volume)
+
+    def _consistent(self, idx, closes):
+        """Passt die bekannte Vorgeschichte noch? (Nach Split/Dividende wird die Historie neu adjustiert.)"""
+        if self.last_ts is None: return False
+        pos = idx.searchsorted(self.last_ts)
+        if pos >= len(idx) or idx[pos] != self.last_ts: return False
+        if self.prev_ts is not None:
+            if pos == 0 or idx[pos - 1] != self.prev_ts: return False
+            prev = closes[pos - 1]
+            if prev != self.prev_close and not (math.isnan(prev) and math.isnan(self.prev_close)): return False
+        return True
+
+    def sync(self, df):
+        """O(neue Bars) statt O(Historie). Gibt True zurück, wenn komplett neu aufgebaut wurde."""
+        names = list(df.columns)
+        vals = df.to_numpy(dtype=float)[:, [names.index(c) for c in ('High', 'Low', 'Close', 'Volume')]]
+        idx = df.index
+        rebuilt = not self._consistent(idx, vals[:, 2])
+        if rebuilt:
+            self.__init__()
+            pos = 0
+        else:
+            pos = idx.searchsorted(self.last_ts)
+        for ts, (h, l, c, v) in zip(idx[pos:], vals[pos:].tolist()):
+            if ts == self.last_ts:
+                if (h, l, c, v) != self.last_bar: self.revise(h, l, c, v)
+            else:
+                self.update(ts, h, l, c, v)
+        return rebuilt
+
+    def indicators(self):
+        h, l, c, v = self.last_bar if self.last_bar else (NAN,) * 4
+        atr = self.atr.value
+        return {
+            'curr_p': c, 'sma50': self.sma50.value, 'sma200': self.sma200.value,
+            'rsi': self.rsi.value, 'atr_pct': atr / c * 100 if c else NAN,
+            'macd': self.macd.macd, 'macd_signal': self.macd.signal,
+            'volume': v, 'vol_avg20': self.vol20.value, 'n_bars': self.n,
+        }
+
+
+class IndicatorStreams:
+    """Prozessweites Register (Symbol, Intervall) -> TechnicalState, LRU-begrenzt."""
+
+    def __init__(self, max_symbols=512):
+        self.max_symbols = max_symbols
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+        self._locks = {}
+
+    def sync(self, symbol, interval, df):
+        """Zustand mit `df` abgleichen und die aktuellen Indikatoren zurückgeben."""
+        key = (symbol, interval)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = TechnicalState()
+                self._locks[key] = threading.Lock()
+            self._states.move_to_end(key)
+            lock = self._locks[key]
+            while len(self._states) > self.max_symbols:
+                old, _ = self._states.popitem(last=False)
+                self._locks.pop(old, None)
+        with lock:
+            if len(df): state.sync(df)
+            return state.indicators()
+
+    def __len__(self):
+        return len(self._states)
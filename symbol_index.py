@@ -0,0 +1,124 @@
+"""
+Lokaler Symbol-Master (Symbol, Name, Börse, Währung) mit In-Memory-Index.
+
+Firmennamen und Autocomplete lösen wir lokal auf (Dict-Lookup bzw. Binärsuche über
+sortierte Schlüssel), die Netzwerk-Suche von Yahoo ist nur noch Fallback für Treffer,
+die der Master nicht kennt.
+"""
+import bisect
+import csv
+import difflib
+import os
+import re
+import threading
+
+DEFAULT_MASTER_PATH = os.environ.get(
+    "SYMBOL_MASTER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbol_master.csv"))
+
+# Rechtsform-Zusätze zählen beim Namensvergleich nicht ("Nvidia" == "NVIDIA Corporation")
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc",
+    "ag", "se", "sa", "nv", "holding", "holdings", "group", "the",
+}
+FUZZY_CUTOFF = 0.85
+
+
+def normalize_name(text):
+    words = re.sub(r"[^0-9a-z]+", " ", text.lower()).split()
+    core = [w for w in words if w not in LEGAL_SUFFIXES]
+    return " ".join(core or words)
+
+
+class SymbolIndex:
+    """
+    - `by_symbol`: exakter Ticker
+    - `by_name`: normalisierter Firmenname
+    - `_keys`: sortierte Präfix-Schlüssel (voller Name, einzelne Wörter, Ticker) für Autocomplete
+    """
+
+    def __init__(self, records=()):
+        self._lock = threading.Lock()
+        self.records = []
+        self.by_symbol = {}
+        self.by_name = {}
+        self._key_ids = {}
+        self._keys = []
+        for rec in records: self._insert(rec)
+        self._keys = sorted(self._key_ids)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_MASTER_PATH):
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                return cls(list(csv.DictReader(f)))
+        except OSError:
+            return cls()
+
+    def __len__(self):
+        return len(self.records)
+
+    def _insert(self, rec):
+        rec = {
+            "symbol": rec["symbol"].strip().upper(), "name": rec.get("name", "").strip(),
+            "exchange": rec.get("exchange", ""), "currency": rec.get("currency", ""),
+        }
+        if rec["symbol"] in self.by_symbol: return None
+        rid = len(self.records)
+        self.records.append(rec)
+        self.by_symbol[rec["symbol"]] = rid
+        norm = normalize_name(rec["name"]) if rec["name"] else ""
+        if norm: self.by_name.setdefault(norm, rid)
+        keys = {rec["symbol"].lower(), norm} | set(norm.split())
+        for k in keys:
+            if k: self._key_ids.setdefault(k, []).append(rid)
+        return keys
+
+    def add(self, symbol, name, exchange="", currency=""):
+        """Nachlernen, z.B. Treffer der Netzwerk-Suche, damit die nächste Anfrage lokal bleibt."""
+        with self._lock:
+            keys = self._insert({"symbol": symbol, "name": name, "exchange": exchange, "currency": currency})
+            for k in keys or ():
+                i = bisect.bisect_left(self._keys, k)
+                if i == len(self._keys) or self._keys[i] != k: self._keys.insert(i, k)
+
+    def complete(self, prefix, limit=10):
+        """Autocomplete: Datensätze, deren Name, Namenswort oder Ticker mit `prefix` beginnt."""
+        raw = prefix.strip().lower()
+        if not raw: return []
+        p = normalize_name(raw)
+        exact, name_prefix, other = [], [], []
+        with self._lock:
+            # Normalisierter Name ("deutsche tel") und roher Ticker ("hive.de") als Präfix
+            for key in dict.fromkeys(k for k in (p, raw) if k):
+                i = bisect.bisect_left(self._keys, key)
+                while i < len(self._keys) and self._keys[i].startswith(key):
+                    for rid in self._key_ids[self._keys[i]]:
+                        rec = self.records[rid]
+                        norm = normalize_name(rec["name"])
+                        if norm == p or rec["symbol"].lower() == raw: exact.append(rid)
+                        elif norm.startswith(p): name_prefix.append(rid)
+                        else: other.append(rid)
+                    i += 1
+        out, seen = [], set()
+        for rid in exact + name_prefix + other:
+            if rid in seen: continue
+            seen.add(rid)
+            out.append(self.records[rid])
+            if len(out) >= limit: break
+        return out
+
+    def resolve(self, query, allow_prefix=True, allow_fuzzy=True):
+        """Bestes Symbol für Ticker oder Firmennamen, sonst None."""
+        q = query.strip()
+        if not q: return None
+        if q.upper() in self.by_symbol: return q.upper()
+        norm = normalize_name(q)
+        rid = self.by_name.get(norm)
+        if rid is not None: return self.records[rid]["symbol"]
+        if allow_prefix:
+            hits = self.complete(q, limit=1)
+            if hits: return hits[0]["symbol"]
+        if allow_fuzzy:
+            close = difflib.get_close_matches(norm, list(self.by_name), n=1, cutoff=FUZZY_CUTOFF)
+            if close: return self.records[self.by_name[close[0]]]["symbol"]
+        return None
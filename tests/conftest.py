@@ -0,0 +1,21 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Module liegen flach im Repo-Root (kein Paket)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_frame():
+    """Synthetische Tageskurse (OHLCV) bis heute: `drift` > 0 steigt, < 0 fällt."""
+    def make(n=250, drift=0.002, seed=0):
+        rng = np.random.default_rng(seed)
+        c = 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, n)))
+        return pd.DataFrame({'Open': c, 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                             'Volume': rng.integers(100_000, 1_000_000, n).astype(float)},
+                            index=pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n))
+    return make
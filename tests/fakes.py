@@ -0,0 +1,25 @@
+"""Fakes für Scanner-Tests: Fetcher ohne Netzwerk und ein scan()-Aufruf über feste Frames."""
+from ki_engine import DEFAULT_WEIGHTS
+from scanner import scan
+
+TECH_ONLY = {k: 0 for k in DEFAULT_WEIGHTS} | {'trend': 30, 'rsi': 20, 'margin': 10}
+INFO = {'currency': 'USD', 'operatingMargins': 0.3}
+
+
+def fail(symbol):
+    raise AssertionError(f"Abruf für {symbol} nicht erwartet")
+
+
+class Fetcher:
+    """Fake-Fetcher: zählt Aufrufe pro Symbol, liefert `result` (oder das Ergebnis einer Funktion)."""
+
+    def __init__(self, result):
+        self.result, self.calls = result, []
+
+    def __call__(self, symbol):
+        self.calls.append(symbol)
+        return self.result(symbol) if callable(self.result) else self.result
+
+
+def run(frames, w=DEFAULT_WEIGHTS, **kwargs):
+    return {i.symbol: i for i in scan(list(frames), w, lambda syms: {s: frames[s] for s in syms if s in frames}, **kwargs)}
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtest_panel
+from ki_engine import DEFAULT_WEIGHTS, PERF_LOOKBACK, build_panel, get_ki_verdict, score_series_panel
+
+
+@pytest.fixture
+def rise_then_fall():
+    # erst steil hoch, dann langsam runter: Performance seit Panel-Beginn und über ein Jahr gehen auseinander
+    rng = np.random.default_rng(3)
+    n = 700
+    c = 100 * np.exp(np.cumsum(np.where(np.arange(n) < 300, 0.004, -0.0005) + rng.normal(0, 0.01, n)))
+    return pd.DataFrame({'Open': c, 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                         'Volume': rng.integers(100_000, 1_000_000, n).astype(float)},
+                        index=pd.bdate_range(end='2026-10-15', periods=n))
+
+
+def test_series_matches_live_verdict_on_trailing_year(rise_then_fall):
+    hist = rise_then_fall
+    scores = score_series_panel(build_panel({'X': hist}), DEFAULT_WEIGHTS, None, PERF_LOOKBACK)[:, 0]
+    for t in range(PERF_LOOKBACK, len(hist), 7):
+        live = get_ki_verdict('X', {}, hist.iloc[t - PERF_LOOKBACK:t + 1], [], DEFAULT_WEIGHTS)[4]
+        assert scores[t] == live, hist.index[t]
+
+
+def test_backtest_scores_with_trailing_year(rise_then_fall):
+    panel = build_panel({'X': rise_then_fall})
+    summary, _ = backtest_panel(panel, DEFAULT_WEIGHTS)
+    same, _ = backtest_panel(panel, DEFAULT_WEIGHTS, scores=score_series_panel(panel, DEFAULT_WEIGHTS, None, PERF_LOOKBACK))
+    since_start, _ = backtest_panel(panel, DEFAULT_WEIGHTS, scores=score_series_panel(panel, DEFAULT_WEIGHTS))
+    pd.testing.assert_frame_equal(summary, same)
+    assert not summary['signals'].equals(since_start['signals'])
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fx_service import FXService
+
+
+class Provider:
+    """Fake-Provider mit festen Kursen gegen USD; zählt Einzelabfragen."""
+
+    def __init__(self, rates):
+        self.rates, self.calls = rates, []
+
+    def fx_rates(self, currencies, quote="USD"):
+        return {c: self.rates[c] for c in currencies if c in self.rates}
+
+    def fx_rate(self, base, quote):
+        self.calls.append(base)
+        if base not in self.rates: raise ValueError(f"Kein Kurs für {base}/{quote}")
+        return self.rates[base]
+
+
+def test_missing_currency_is_remembered():
+    provider = Provider({'EUR': 1.1})
+    fx = FXService(provider, currencies=('USD', 'EUR'))
+    assert fx.rate('EUR', 'USD') == pytest.approx(1.1)
+    assert fx.rate('XYZ', 'EUR', default=-1) == fx.rate('XYZ', 'EUR', default=-1) == -1
+    assert provider.calls == ['XYZ']
+
+
+@pytest.mark.parametrize('currency', [None, np.nan, ''])
+def test_unknown_currency_is_not_looked_up(currency):
+    provider = Provider({'EUR': 1.1})
+    fx = FXService(provider, currencies=('USD', 'EUR'))
+    assert fx.rate(currency, 'EUR', default=0.5) == 0.5
+    with pytest.raises(ValueError):
+        fx.rate(currency, 'EUR')
+    assert not provider.calls and not fx._missing
+
+
+def test_convert_column_with_missing_currency():
+    fx = FXService(Provider({'EUR': 1.25}), currencies=('USD', 'EUR'))
+    df = pd.DataFrame({'Preis': [10.0, 10.0, 10.0], 'Währung': ['USD', None, 'EUR']})
+    out = fx.convert_column(df, 'Preis', 'Währung', 'EUR')
+    assert out[0] == pytest.approx(8.0) and np.isnan(out[1]) and out[2] == 10.0
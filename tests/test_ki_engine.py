@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ki_engine import (EWM_PANDAS_MAX_COLS, _rolling_mean, build_panel, compute_indicator_series,
+                       compute_indicators, compute_indicators_pandas, compute_panel_indicators, ewm_panel)
+
+# n_bars zählt im Panel nur gültige Closes (für MIN_BARS), die pandas-Referenz alle Zeilen
+PARITY_FIELDS = ['curr_p', 'sma50', 'sma200', 'rsi', 'atr_pct', 'macd', 'macd_signal', 'volume', 'vol_avg20']
+
+
+def with_nans(x, rng, frac=0.05, lead=0):
+    """Zufällige NaN-Lücken plus `lead` NaN am Anfang (wie Padding kürzerer Historien im Panel)."""
+    x = x.copy()
+    x[rng.random(x.shape) < frac] = np.nan
+    x[:lead] = np.nan
+    return x
+
+
+def random_frames(n_symbols, seed, nan_frac=0.03):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n_symbols):
+        n = int(rng.integers(30, 400))
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        df = pd.DataFrame({'Open': c, 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                           'Volume': rng.integers(100_000, 1_000_000, n).astype(float)},
+                          index=pd.bdate_range(end='2026-10-15', periods=n))
+        for col in ('Close', 'High', 'Low', 'Volume'):
+            df[col] = with_nans(df[col].to_numpy(), rng, nan_frac)
+        frames[f"S{i}"] = df
+    return frames
+
+
+def assert_same(a, b):
+    np.testing.assert_allclose(a, b, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('cols', [5, EWM_PANDAS_MAX_COLS + 6])   # pandas-Pfad und eigene Schleife
+@pytest.mark.parametrize('span', [9, 12, 26])
+def test_ewm_panel_matches_pandas_with_nans(cols, span):
+    rng = np.random.default_rng(cols + span)
+    x = np.column_stack([with_nans(rng.normal(100, 5, 300), rng, 0.1, lead=int(rng.integers(0, 40)))
+                         for _ in range(cols)])
+    x[:, 0] = np.nan                                     # Spalte ganz ohne Werte
+    expected = pd.DataFrame(x).ewm(span=span, adjust=False).mean().to_numpy()
+    assert_same(ewm_panel(x, span), expected)
+
+
+@pytest.mark.parametrize('window,min_periods', [(14, None), (50, None), (20, 1)])
+def test_rolling_mean_matches_pandas_with_nans(window, min_periods):
+    rng = np.random.default_rng(window)
+    x = np.column_stack([with_nans(rng.normal(100, 5, 300), rng, 0.05, lead=int(rng.integers(0, 60))) for _ in range(8)])
+    expected = pd.DataFrame(x).rolling(window, min_periods=min_periods).mean().to_numpy()
+    assert_same(_rolling_mean(x, window, min_periods), expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_panel_indicators_match_pandas_reference(seed):
+    frames = random_frames(25, seed)
+    panel = build_panel(frames)
+    ind = compute_panel_indicators(panel)
+    for j, s in enumerate(panel.symbols):
+        ref = compute_indicators_pandas(frames[s])
+        for k in PARITY_FIELDS:
+            assert_same(ind[k][j], ref[k])
+
+
+def test_indicator_series_rsi_matches_pandas():
+    frames = random_frames(10, 7, nan_frac=0.05)
+    panel = build_panel(frames)
+    rsi = compute_indicator_series(panel)['rsi']
+    for j, s in enumerate(panel.symbols):
+        close = frames[s]['Close']
+        delta = close.diff()
+        rs = delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean()
+        assert_same(rsi[-len(close):, j], (100 - 100 / (1 + rs)).to_numpy())
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_kernel_matches_pandas_reference(seed):
+    frames = random_frames(20, seed + 100, nan_frac=0.05)
+    rng = np.random.default_rng(seed)
+    for df in list(frames.values())[:5]:                 # führende NaN-Closes (Listing-Lücke)
+        df.iloc[:int(rng.integers(1, 20)), df.columns.get_loc('Close')] = np.nan
+    for df in frames.values():
+        got, ref = compute_indicators(df), compute_indicators_pandas(df)
+        for k in PARITY_FIELDS:
+            assert_same(got[k], ref[k])
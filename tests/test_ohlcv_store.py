@@ -0,0 +1,39 @@
+from ohlcv_store import OHLCVStore
+
+
+class BatchFetcher:
+    """Fake für provider.history_batch: liefert Ausschnitte aus festen Frames, merkt sich die Aufrufe."""
+
+    def __init__(self, frames, missing=()):
+        self.frames, self.missing, self.calls = frames, set(missing), []
+
+    def __call__(self, symbols, period=None, start=None):
+        self.calls.append((tuple(symbols), start))
+        return {s: self.frames[s] if start is None else self.frames[s][start:]
+                for s in symbols if s not in self.missing}
+
+
+def test_batch_tails_grouped_by_start(tmp_path, make_frame):
+    frames = {s: make_frame(seed=i) for i, s in enumerate(['A', 'B', 'OLD'])}
+    store = OHLCVStore(str(tmp_path))
+    for s, df in frames.items():
+        store.write(s, df.iloc[:-30] if s == 'OLD' else df.iloc[:-2], covered_from='max')
+    fetch = BatchFetcher(frames)
+    out = store.get_history_batch(list(frames), 'max', fetch)
+    starts = {syms: start for syms, start in fetch.calls}
+    assert starts[('A', 'B')] == frames['A'].index[-4].strftime('%Y-%m-%d')
+    assert starts[('OLD',)] == frames['OLD'].index[-32].strftime('%Y-%m-%d')
+    for s, df in frames.items():
+        assert out[s].index.equals(df.index)
+
+
+def test_missing_tail_keeps_partition_stale(tmp_path, make_frame):
+    df = make_frame()
+    store = OHLCVStore(str(tmp_path))
+    store.write('A', df.iloc[:-5], covered_from='max')
+    updated = store._read_meta('A')['updated_at']
+    out = store.get_history_batch(['A'], 'max', BatchFetcher({'A': df}, missing={'A'}))
+    assert out['A'].attrs.get('stale') and len(out['A']) == len(df) - 5
+    assert store._read_meta('A')['updated_at'] == updated
+    assert store.get_history('A', 'max', lambda **kw: df.iloc[:0]).attrs.get('stale')
+    assert store._read_meta('A')['updated_at'] == updated
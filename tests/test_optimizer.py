@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+import optimizer
+from ki_engine import MAX_BUDGET, MIN_BARS, PERF_LOOKBACK, TECH_FACTORS, build_panel, score_series_panel
+from backtest import forward_returns
+from optimizer import (SignalStates, _evaluate_all, evaluate_weights, make_process_pool, optimize_weights, signal_states,
+                       weight_grid)
+
+APP_BOUNDS = {k: (0, 30) if k == 'trend' else (0, 20) for k in TECH_FACTORS}
+
+
+class CountingPool:
+    """Wrapper um einen echten Pool, zählt die verteilten Chunks."""
+
+    def __init__(self, pool):
+        self.pool, self.chunks = pool, 0
+
+    def map(self, fn, chunks):
+        chunks = list(chunks)
+        self.chunks += len(chunks)
+        return self.pool.map(fn, chunks)
+
+
+def frames(n_symbols=3, n_bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    out = {}
+    for i in range(n_symbols):
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        out[f"S{i}"] = pd.DataFrame({'Open': c, 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                                     'Volume': rng.integers(100_000, 1_000_000, n_bars).astype(float)},
+                                    index=pd.bdate_range('2020-01-01', periods=n_bars))
+    return out
+
+
+def test_full_app_grid_runs_in_pool():
+    # volles Raster der Technik-Faktoren mit allen 144 Zuständen: liegt über POOL_MIN_CELLS
+    rng = np.random.default_rng(1)
+    states = SignalStates(list(TECH_FACTORS), rng.integers(-1, 2, (144, len(TECH_FACTORS))).astype(float),
+                          rng.integers(1, 50, 144).astype(float), rng.normal(0, 0.05, 144), rng.integers(0, 20, 144).astype(float))
+    W = weight_grid(APP_BOUNDS, MAX_BUDGET)
+    assert len(states.states) * len(W) >= optimizer.POOL_MIN_CELLS
+    pool = CountingPool(make_process_pool(2))
+    try:
+        got = _evaluate_all(states, W, 60, pool)
+    finally:
+        pool.pool.shutdown()
+    assert pool.chunks == -(-len(W) // optimizer.OPT_CHUNK)
+    for a, b in zip(got, evaluate_weights(states, W, 60)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_small_grid_stays_in_process():
+    states = SignalStates(['trend'], np.array([[1.0], [-1.0]]), np.ones(2), np.zeros(2), np.zeros(2))
+    pool = CountingPool(None)
+    _evaluate_all(states, np.array([[10.0], [20.0]]), 60, pool)
+    assert pool.chunks == 0
+
+
+def test_single_worker_has_no_pool():
+    assert make_process_pool(1) is None
+
+
+def test_holdout_gap_keeps_forward_returns_apart():
+    panel = build_panel(frames(n_bars=400), None)
+    horizon, holdout = 20, 0.25
+    fit, test = signal_states(panel, horizon, holdout=holdout)
+    split, first = int(400 * (1 - holdout)), MIN_BARS - 1
+    # Fit endet `horizon` Bars vor dem Split, der Holdout beginnt am Split und endet vor den letzten `horizon` Bars
+    assert len(fit) == len(panel.symbols) * (split - horizon - first)
+    assert len(test) == len(panel.symbols) * (400 - horizon - split)
+
+
+def test_current_weights_count_the_backtest_signals():
+    # "aktuell" im Optimierer = Signal-Tage der Score-Zeitreihe (gleiches Performance-Fenster wie im Backtest)
+    panel = build_panel(frames(n_bars=700, seed=4), None)
+    w = {k: 10 for k in TECH_FACTORS}
+    horizon, threshold = 20, 60
+    out = optimize_weights(panel, w, APP_BOUNDS, MAX_BUDGET, horizon=horizon, threshold=threshold, holdout=0.0,
+                           max_candidates=10, min_signals=1)
+    scores = score_series_panel(panel, w, None, PERF_LOOKBACK)
+    fwd = forward_returns(panel.close, horizon)
+    assert out.at['aktuell', 'signals'] == int(((scores >= threshold) & ~np.isnan(fwd)).sum())
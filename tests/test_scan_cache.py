@@ -0,0 +1,45 @@
+from fakes import INFO, Fetcher, fail, run
+from ki_engine import DEP_INFO
+from scanner import FAILED, ScanCache
+
+
+def test_cache_reuses_fresh_sources(make_frame, tmp_path):
+    frames = {'UP': make_frame()}
+    cache = ScanCache(str(tmp_path / "scan.json"))
+    info = Fetcher(INFO)
+    first = run(frames, fetch_info=info, cutoff=0, cache=cache)['UP']
+    assert first.fetched == (DEP_INFO,)
+
+    # neuer Prozess, gleiche Datei: nichts wird neu geladen, Ergebnis unverändert
+    cache = ScanCache(str(tmp_path / "scan.json"))
+    second = run(frames, fetch_info=fail, cutoff=0, cache=cache)['UP']
+    assert second.fetched == () and second.reused == (DEP_INFO,)
+    assert second.score == first.score and not second.changed
+
+    # reuse=False lädt trotz gültigem Cache neu
+    run(frames, fetch_info=info, cutoff=0, cache=cache, reuse=False)
+    assert info.calls == ['UP', 'UP']
+
+
+def test_cache_expiry(make_frame, tmp_path):
+    frames = {'UP': make_frame()}
+    path = str(tmp_path / "scan.json")
+    run(frames, fetch_info=Fetcher(INFO), cutoff=0, cache=ScanCache(path))
+    info = Fetcher(INFO)
+    item = run(frames, fetch_info=info, cutoff=0, cache=ScanCache(path, ttl={DEP_INFO: -1}))['UP']
+    assert item.reused == () and item.fetched == (DEP_INFO,) and info.calls == ['UP']
+
+
+def test_changed_info_marks_item_changed(make_frame, tmp_path):
+    frames = {'UP': make_frame()}
+    cache = ScanCache(str(tmp_path / "scan.json"))
+    run(frames, fetch_info=Fetcher(INFO), cutoff=0, cache=cache)
+    same = run(frames, fetch_info=Fetcher(INFO), cutoff=0, cache=cache, reuse=False)['UP']
+    other = run(frames, fetch_info=Fetcher(INFO | {'operatingMargins': 0.0}), cutoff=0, cache=cache, reuse=False)['UP']
+    assert not same.changed and other.changed
+
+
+def test_failed_info_is_not_cached(make_frame, tmp_path):
+    cache = ScanCache(str(tmp_path / "scan.json"))
+    item = run({'UP': make_frame()}, fetch_info=Fetcher(None), cutoff=0, cache=cache)['UP']
+    assert item.status == FAILED and cache.dep('UP', DEP_INFO) is None
@@ -0,0 +1,102 @@
+import json
+
+import pandas as pd
+import pytest
+
+import scan_cli
+from ki_engine import DEFAULT_WEIGHTS
+from scan_cli import main, parse_weights, read_universe, write_results
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_read_universe_text(tmp_path):
+    path = write(tmp_path / "u.txt", "# Tech\nnvda\nMSFT  # Kommentar\n\n  aapl\nNVDA\n")
+    assert read_universe(path) == ['NVDA', 'MSFT', 'AAPL']
+
+
+def test_read_universe_csv(tmp_path):
+    path = write(tmp_path / "u.csv", "Name,Symbol\nNvidia,nvda\nSAP,SAP.DE\nDoppelt,NVDA\n")
+    assert read_universe(path) == ['NVDA', 'SAP.DE']
+
+
+def test_read_universe_empty(tmp_path):
+    assert read_universe(write(tmp_path / "u.txt", "")) == []
+
+
+def test_parse_weights(tmp_path):
+    path = write(tmp_path / "w.json", json.dumps({'trend': 20, 'rsi': 0}))
+    w = parse_weights(path, ['vola=2.5', ' macd = 0'])
+    assert w == DEFAULT_WEIGHTS | {'trend': 20, 'rsi': 0, 'vola': 2.5, 'macd': 0}
+
+
+@pytest.mark.parametrize('overrides', [['foo=3'], ['trend'], ['trend=x']])
+def test_parse_weights_errors(overrides):
+    with pytest.raises(ValueError):
+        parse_weights(None, overrides)
+
+
+@pytest.mark.parametrize('argv', [
+    ['-o', 'out.xlsx'],
+    ['--workers', '0'],
+    ['-w', 'foo=1'],
+    ['-w', 'trend=100'],          # Budget überschritten
+    ['--weights', 'fehlt.json'],
+])
+def test_main_rejects_bad_arguments(tmp_path, argv):
+    with pytest.raises(SystemExit) as exc:
+        main([write(tmp_path / "u.txt", "AAPL\n")] + argv)
+    assert exc.value.code == 2
+
+
+def test_main_missing_universe():
+    with pytest.raises(SystemExit) as exc:
+        main(['gibt-es-nicht.txt'])
+    assert exc.value.code == 2
+
+
+@pytest.mark.parametrize('ext', ['.csv', '.json', '.parquet'])
+def test_write_results_roundtrip(tmp_path, ext):
+    if ext == '.parquet': pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'symbol': ['A', 'B'], 'score': [91.5, 40.25]})
+    path = str(tmp_path / f"out{ext}")
+    write_results(df, path)
+    back = {'.csv': pd.read_csv, '.json': pd.read_json, '.parquet': pd.read_parquet}[ext](path)
+    pd.testing.assert_frame_equal(back, df)
+    assert [p.name for p in tmp_path.iterdir()] == [f"out{ext}"]   # keine tmp-Datei übrig
+
+
+class FakeProvider:
+    host = "fake"
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def history_batch(self, symbols, period=None, start=None):
+        return {s: self.frames[s] for s in symbols if s in self.frames}
+
+    def info(self, symbol):
+        return {'currency': 'EUR', 'operatingMargins': 0.3}
+
+
+def test_main_end_to_end(tmp_path, monkeypatch, make_frame, capsys):
+    frames = {'UP': make_frame(), 'DOWN': make_frame(drift=-0.004, seed=1)}
+    monkeypatch.setattr(scan_cli, 'make_provider', lambda: FakeProvider(frames))
+    monkeypatch.setattr(scan_cli, 'DEFAULT_STORE_DIR', str(tmp_path / "store"))
+    universe = write(tmp_path / "u.txt", "UP\nDOWN\nSHORT\n")
+    out = str(tmp_path / "scan.csv")
+    code = main([universe, '-o', out, '--all', '--cutoff', '60', '--no-cache'])
+    assert code == 0
+    df = pd.read_csv(out).set_index('symbol')
+    assert df.at['SHORT', 'status'] == 'no_data'
+    assert df.at['UP', 'currency'] == 'EUR' and df.at['UP', 'status'] in ('hit', 'below')
+    assert "3 Symbole" in capsys.readouterr().out
+
+
+def test_main_exit_1_without_any_bars(tmp_path, monkeypatch):
+    monkeypatch.setattr(scan_cli, 'make_provider', lambda: FakeProvider({}))
+    monkeypatch.setattr(scan_cli, 'DEFAULT_STORE_DIR', str(tmp_path / "store"))
+    assert main([write(tmp_path / "u.txt", "A\nB\n"), '--no-cache']) == 1
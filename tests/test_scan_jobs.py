@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+import scan_jobs
+from ki_engine import DEFAULT_WEIGHTS
+from scan_jobs import DONE, INTERRUPTED, RUNNING, ScanJob, ScanJobManager, item_record, job_id, retry_delay
+from scanner import FAILED, HIT, LOAD_FAILED, NO_DATA, ScanItem, scan
+
+W = {k: 0 for k in DEFAULT_WEIGHTS} | {'trend': 10, 'margin': 10}
+INFO = {'currency': 'USD', 'operatingMargins': 0.3}
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(scan_jobs, 'JOB_RETRY_BASE', 0.01)
+    monkeypatch.setattr(scan_jobs, 'JOB_CHECKPOINT_SECONDS', 0.0)
+
+
+class Bars:
+    """Fake load_bars: liefert `frames`, die ersten `fail` Aufrufe werfen (z.B. Throttle)."""
+
+    def __init__(self, frames, fail=0):
+        self.frames, self.fail, self.calls = frames, fail, []
+
+    def __call__(self, symbols):
+        self.calls.append(list(symbols))
+        if len(self.calls) <= self.fail: raise OSError("throttled")
+        return {s: self.frames[s] for s in symbols if s in self.frames}
+
+
+def run_job(tmp_path, symbols, **scan_kwargs):
+    job = ScanJob(str(tmp_path / "job.json"), symbols, W, cutoff=0).start(scan_kwargs)
+    job.join(10)
+    assert not job.running
+    return job
+
+
+def test_retry_delay_doubles_up_to_max(monkeypatch):
+    monkeypatch.setattr(scan_jobs, 'JOB_RETRY_BASE', 30)
+    assert [retry_delay(a) for a in (1, 2, 3)] == [30, 60, 120]
+    assert retry_delay(20) == scan_jobs.JOB_RETRY_MAX
+
+
+def test_job_id_depends_on_symbols_weights_cutoff():
+    assert job_id(['A', 'B'], W, 90) == job_id(['A', 'B'], dict(reversed(W.items())), 90)
+    assert job_id(['A', 'B'], W, 90) != job_id(['B', 'A'], W, 90)
+    assert job_id(['A'], W, 90) != job_id(['A'], W, 80)
+
+
+def test_scanner_marks_raising_load_as_load_failed():
+    items = list(scan(['A', 'B'], W, Bars({}, fail=1)))
+    assert {i.status for i in items} == {LOAD_FAILED}
+
+
+def test_load_failure_is_retried(tmp_path, make_frame):
+    bars = Bars({'A': make_frame()}, fail=1)
+    job = run_job(tmp_path, ['A'], load_bars=bars, fetch_info=lambda s: INFO)
+    assert job.status == DONE and len(bars.calls) == 2
+    assert job.results['A']['status'] == HIT and job.results['A']['attempts'] == 2
+
+
+def test_short_history_is_final(tmp_path, make_frame):
+    bars = Bars({'SHORT': make_frame(n=20)})
+    job = run_job(tmp_path, ['SHORT', 'MISSING'], load_bars=bars)
+    assert len(bars.calls) == 1 and not job.retry
+    assert {r['status'] for r in job.results.values()} == {NO_DATA}
+    assert {r['attempts'] for r in job.results.values()} == {1}
+
+
+def test_failed_source_gives_up_after_max_attempts(tmp_path, make_frame):
+    calls = []
+    job = run_job(tmp_path, ['A'], load_bars=Bars({'A': make_frame()}), fetch_info=lambda s: calls.append(s))
+    assert job.results['A']['status'] == FAILED
+    assert job.results['A']['attempts'] == len(calls) == scan_jobs.JOB_MAX_ATTEMPTS
+
+
+def test_load_failed_stays_after_max_attempts(tmp_path):
+    bars = Bars({}, fail=99)
+    job = run_job(tmp_path, ['A'], load_bars=bars)
+    assert job.results['A']['status'] == LOAD_FAILED and len(bars.calls) == scan_jobs.JOB_MAX_ATTEMPTS
+
+
+def test_checkpoint_resume(tmp_path, make_frame):
+    frames = {'A': make_frame(seed=1), 'B': make_frame(seed=2), 'C': make_frame(seed=3)}
+    # Prozess wurde mitten im Scan beendet: A fertig, B in der Retry-Queue, Status noch "running"
+    job = ScanJob(os.path.join(tmp_path, f"{job_id(list(frames), W, 0)}.json"), list(frames), W, cutoff=0)
+    job.results['A'] = item_record(ScanItem('A', HIT, score=70.0, price=1.0))
+    job.retry['B'] = {'attempts': 1, 'next_at': 0, 'status': FAILED}
+    job.status = RUNNING
+    job.checkpoint()
+
+    loaded = ScanJob.load(job.path)
+    assert loaded.status == INTERRUPTED and set(loaded.results) == {'A'} and 'B' in loaded.retry
+
+    bars = Bars(frames)
+    manager = ScanJobManager(job_dir=str(tmp_path), load_bars=bars, fetch_info=lambda s: INFO)
+    resumed = manager.get(job.id)
+    resumed.join(10)
+    assert resumed.status == DONE and sorted(s for call in bars.calls for s in call) == ['B', 'C']
+    assert resumed.results['A']['score'] == 70.0 and resumed.results['B']['attempts'] == 2
+    # Checkpoint auf Disk ist fertig; ein erneuter Start beginnt von vorn
+    assert ScanJob.load(job.path).status == DONE
+    again = manager.start(list(frames), W, cutoff=0)
+    again.join(10)
+    assert again is not resumed and len(again.results) == 3
+
+
+def test_manager_without_resume_keeps_job_interrupted(tmp_path):
+    job = ScanJob(str(tmp_path / "x.json"), ['A'], W)
+    job.status = RUNNING
+    job.checkpoint()
+    manager = ScanJobManager(job_dir=str(tmp_path), resume=False, load_bars=Bars({}))
+    assert manager.get(job.id).status == INTERRUPTED and not manager.get(job.id).running
+
+
+def test_resumed_job_uses_callers_reuse(tmp_path, make_frame, monkeypatch):
+    job = ScanJob(os.path.join(tmp_path, f"{job_id(['A'], W, 0)}.json"), ['A'], W, cutoff=0, reuse=True)
+    job.status = RUNNING
+    job.checkpoint()
+    seen = []
+
+    def recording_scan(*args, reuse, **kwargs):
+        seen.append(reuse)
+        return scan(*args, reuse=reuse, **kwargs)
+    monkeypatch.setattr(scan_jobs, 'scan', recording_scan)
+    manager = ScanJobManager(job_dir=str(tmp_path), resume=False, load_bars=Bars({'A': make_frame()}),
+                             fetch_info=lambda s: INFO)
+    resumed = manager.start(['A'], W, cutoff=0, reuse=False)
+    resumed.join(10)
+    assert resumed.id == job.id and resumed.status == DONE and seen == [False]
+    assert ScanJob.load(job.path).reuse is False
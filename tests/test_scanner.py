@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from fakes import INFO, TECH_ONLY, Fetcher, fail, run
+from ki_engine import BASE_SCORE, DEP_INFO, FACTOR_KEYS, FACTOR_RANGES, DEFAULT_WEIGHTS, NEWS_FACTORS, score_bounds
+from scanner import BELOW, HIT, NO_DATA, PRUNED, scan
+
+
+def test_bounds_contain_every_completion():
+    rng = np.random.default_rng(0)
+    w = dict(DEFAULT_WEIGHTS)
+    wv = np.array([w[k] for k in FACTOR_KEYS], dtype=float)
+    known = {'trend', 'rsi', 'vola', 'volume', 'sector', 'macd'}
+    factors = rng.integers(-1, 2, (50, len(FACTOR_KEYS))).astype(float)
+    lo, hi = score_bounds(factors, known, w)
+    for _ in range(200):
+        full = factors.copy()
+        for j, k in enumerate(FACTOR_KEYS):
+            if k not in known: full[:, j] = rng.uniform(*FACTOR_RANGES[k], size=len(full))
+        score = np.clip(BASE_SCORE + full @ wv, 0, 100)
+        assert np.all(lo <= score + 1e-9) and np.all(score <= hi + 1e-9)
+
+
+def test_prune_skips_network(make_frame):
+    # fallender Kurs: Trend -30, höchstens 50 Punkte erreichbar -> ohne info-Abruf vorgefiltert
+    items = run({'DOWN': make_frame(drift=-0.004)}, TECH_ONLY, fetch_info=fail, cutoff=90)
+    item = items['DOWN']
+    assert item.status == PRUNED and item.score < 90 and item.fetched == ()
+
+
+def test_default_weights_prune_weak_symbol_without_fetches(make_frame):
+    # Standard-Gewichte und -Cutoff: fallender Kurs kann auch mit voller Fundamental-Punktzahl nicht mehr treffen
+    item = run({'DOWN': make_frame(drift=-0.004)}, DEFAULT_WEIGHTS, fetch_info=fail)['DOWN']
+    assert item.status == PRUNED and item.score < 90 and item.fetched == ()
+
+
+def test_scan_score_excludes_news(make_frame):
+    item = run({'UP': make_frame()}, DEFAULT_WEIGHTS, fetch_info=Fetcher(INFO), cutoff=0)['UP']
+    wv = np.array([DEFAULT_WEIGHTS[k] for k in FACTOR_KEYS], dtype=float)
+    assert item.fetched == (DEP_INFO,)
+    assert all(item.factors[FACTOR_KEYS.index(k)] == 0 for k in NEWS_FACTORS)
+    assert item.score == pytest.approx(np.clip(BASE_SCORE + item.factors @ wv, 0, 100))
+
+
+def test_hit_score_matches_factors(make_frame):
+    info = Fetcher(INFO)
+    items = run({'UP': make_frame()}, TECH_ONLY, fetch_info=info, cutoff=0)
+    item = items['UP']
+    wv = np.array([TECH_ONLY[k] for k in FACTOR_KEYS], dtype=float)
+    assert item.status == HIT and item.fetched == (DEP_INFO,) and info.calls == ['UP']
+    assert item.factors[FACTOR_KEYS.index('margin')] == 1
+    assert item.score == pytest.approx(np.clip(BASE_SCORE + item.factors @ wv, 0, 100))
+
+
+def test_below_cutoff_after_fetch(make_frame):
+    # steigender Kurs: 50 + 20 (Trend) + bis zu 10 (Marge) erreichbar; ohne Marge bleibt es bei 70 < 75
+    w = {k: 0 for k in DEFAULT_WEIGHTS} | {'trend': 20, 'margin': 10}
+    no_margin = {'currency': 'USD', 'operatingMargins': 0.0}
+    item = run({'UP': make_frame()}, w, fetch_info=Fetcher(no_margin), cutoff=75)['UP']
+    assert item.status == BELOW and item.score == 70 and item.fetched == (DEP_INFO,)
+
+
+def test_no_data(make_frame):
+    short = make_frame(n=20)
+    items = {i.symbol: i for i in scan(['SHORT', 'MISSING'], TECH_ONLY, lambda syms: {'SHORT': short})}
+    assert items['SHORT'].status == items['MISSING'].status == NO_DATA
+
+
+def test_no_data_when_valid_closes_below_min_bars(make_frame):
+    gappy = make_frame(n=120)
+    gappy.iloc[:80, gappy.columns.get_loc('Close')] = np.nan    # 120 Zeilen, aber nur 40 gültige Closes
+    items = run({'GAPPY': gappy, 'OK': make_frame()}, TECH_ONLY, cutoff=0, fetch_info=Fetcher(INFO))
+    assert items['GAPPY'].status == NO_DATA and items['OK'].status != NO_DATA
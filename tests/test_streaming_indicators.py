@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ki_engine import compute_indicators_pandas
+from streaming_indicators import EMA, RollingMean, TechnicalState
+
+FIELDS = ['curr_p', 'sma50', 'sma200', 'rsi', 'atr_pct', 'macd', 'macd_signal', 'volume', 'vol_avg20', 'n_bars']
+
+
+def series_with_nans(rng, n=300, frac=0.08, lead=5):
+    x = rng.normal(100, 5, n)
+    x[rng.random(n) < frac] = np.nan
+    x[:lead] = np.nan
+    return x
+
+
+def stream(ind, x, rng):
+    """Werte einspeisen; zwischendurch den letzten Wert revidieren (laufender Bar). -> (Werte, Endreihe)."""
+    out, final = [], []
+    for v in x:
+        ind.update(v if rng.random() > 0.3 else rng.normal(100, 5))
+        ind.revise(v)                                    # der endgültige Wert des Bars
+        out.append(ind.value)
+        final.append(v)
+    return np.array(out), np.array(final)
+
+
+@pytest.mark.parametrize('window,min_periods', [(14, None), (50, None), (20, 1)])
+def test_rolling_mean_matches_pandas(window, min_periods):
+    rng = np.random.default_rng(window)
+    got, x = stream(RollingMean(window, min_periods), series_with_nans(rng), rng)
+    expected = pd.Series(x).rolling(window, min_periods=min_periods).mean().to_numpy()
+    np.testing.assert_allclose(got, expected, rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('span', [9, 12, 26])
+def test_ema_matches_pandas(span):
+    rng = np.random.default_rng(span)
+    got, x = stream(EMA(span), series_with_nans(rng), rng)
+    expected = pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(got, expected, rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_technical_state_matches_pandas_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = 320
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({'Open': c, 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                       'Volume': rng.integers(100_000, 1_000_000, n).astype(float)},
+                      index=pd.bdate_range(end='2026-10-15', periods=n))
+    for col in ('Close', 'High', 'Low', 'Volume'):
+        df.loc[df.index[rng.random(n) < 0.04], col] = np.nan
+
+    state = TechnicalState()
+    end = 220
+    while end <= n:
+        part = df.iloc[:end].copy()
+        # laufender Bar: erst ein Zwischenstand, dann der endgültige Bar (revise)
+        part.iloc[-1, part.columns.get_loc('Close')] *= 1.01
+        state.sync(part)
+        assert not state.sync(df.iloc[:end])
+        got, ref = state.indicators(), compute_indicators_pandas(df.iloc[:end])
+        for k in FIELDS:
+            np.testing.assert_allclose(got[k], ref[k], rtol=1e-9, equal_nan=True, err_msg=k)
+        end += int(rng.integers(1, 7))